@@ -0,0 +1,77 @@
+"""Per-call overhead of SwiftLang functions.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_calls [--n 100000]
+
+Compares a loop that calls a two-argument function with the same loop
+doing the work inline, and checks that a tail-recursive function runs in
+constant stack space far beyond Python's recursion limit.
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from src.pipeline import compile_source
+from src.interpreter import Interpreter
+
+INLINE = """\
+let i = 0;
+let total = 0;
+while (i < {n}) {{
+    total = total + i;
+    i = i + 1;
+}}
+"""
+
+CALL = """\
+fun add(a, b) {{
+    return a + b;
+}}
+let i = 0;
+let total = 0;
+while (i < {n}) {{
+    total = add(total, i);
+    i = i + 1;
+}}
+"""
+
+TAIL = """\
+fun sumto(n, acc) {{
+    if (n == 0) {{ return acc; }}
+    return sumto(n - 1, acc + n);
+}}
+let total = sumto({n}, 0);
+"""
+
+
+def timed(source):
+    ast, symbol_table = compile_source(source)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        Interpreter(symbol_table).interpret(ast)
+    return time.perf_counter() - start, symbol_table['total']['value']
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--n', type=int, default=100_000, help='loop iterations / calls')
+    args = ap.parse_args()
+    n = args.n
+
+    inline, expected = timed(INLINE.format(n=n))
+    called, total = timed(CALL.format(n=n))
+    assert total == expected
+    tail, total = timed(TAIL.format(n=n))
+    assert total == n * (n + 1) // 2
+
+    print(f"{n} iterations")
+    print(f"  inline loop          {inline:8.3f}s")
+    print(f"  loop calling add()   {called:8.3f}s")
+    print(f"  overhead per call    {(called - inline) / n * 1e6:8.2f}us")
+    print(f"  tail-recursive sumto {tail:8.3f}s  ({tail / n * 1e6:.2f}us per call, depth {n})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""Cost of `try`/`catch` on the path that does not throw.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_exceptions [--n 100000] [--runs 5]
+
+Times the same loop with no handler, with a `try` around each iteration's
+body and with a `try` around the whole loop, then the cost of a `throw`
+that is caught.  It also runs the no-handler loop on an interpreter whose
+blocks do not record error lines, the way blocks ran before `try` existed,
+to show that recording them adds nothing when no error is raised.
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from src.pipeline import compile_source
+from src.interpreter import Interpreter
+
+PLAIN = """\
+let i = 0;
+let total = 0;
+while (i < {n}) {{
+    total = total + i % 7;
+    i = i + 1;
+}}
+"""
+
+TRY_EACH = """\
+let i = 0;
+let total = 0;
+while (i < {n}) {{
+    try {{
+        total = total + i % 7;
+    }} catch (err) {{
+        total = -1;
+    }}
+    i = i + 1;
+}}
+"""
+
+TRY_AROUND = """\
+let i = 0;
+let total = 0;
+try {{
+    while (i < {n}) {{
+        total = total + i % 7;
+        i = i + 1;
+    }}
+}} catch (err) {{
+    total = -1;
+}}
+"""
+
+THROWING = """\
+let i = 0;
+let total = 0;
+while (i < {n}) {{
+    try {{
+        throw i % 7;
+    }} catch (err) {{
+        total = total + err;
+    }}
+    i = i + 1;
+}}
+"""
+
+
+class UnlocatedInterpreter(Interpreter):
+    """Blocks without the handler that records error lines."""
+
+    def visit_BlockStmt(self, node):
+        for stmt in node.stmts:
+            signal = self.visit(stmt)
+            if signal is not None:
+                return signal
+
+
+def timed(source, runs, interpreter_class=Interpreter):
+    """Best of `runs` executions (compiling is not timed) and the final `total`."""
+    best = float('inf')
+    for _ in range(runs):
+        ast, symbol_table = compile_source(source)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            interpreter_class(symbol_table).interpret(ast)
+        best = min(best, time.perf_counter() - start)
+    return best, symbol_table['total']['value']
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--n', type=int, default=100_000, help='loop iterations')
+    ap.add_argument('--runs', type=int, default=5, help='best of this many runs')
+    args = ap.parse_args()
+    n, runs = args.n, args.runs
+
+    plain, expected = timed(PLAIN.format(n=n), runs)
+    unlocated, total = timed(PLAIN.format(n=n), runs, UnlocatedInterpreter)
+    assert total == expected
+    each, total = timed(TRY_EACH.format(n=n), runs)
+    assert total == expected
+    around, total = timed(TRY_AROUND.format(n=n), runs)
+    assert total == expected
+    throwing, total = timed(THROWING.format(n=n), runs)
+    assert total == expected
+
+    def row(label, seconds):
+        print(f"  {label:<28} {seconds:8.3f}s  {seconds / plain:6.2f}x")
+
+    print(f"{n} iterations, best of {runs}")
+    row("no handler", plain)
+    row("no handler, no error lines", unlocated)
+    row("try around each iteration", each)
+    row("try around the loop", around)
+    row("throw + catch every time", throwing)
+    print(f"  cost per caught throw        {(throwing - each) / n * 1e6:8.2f}us")
+
+
+if __name__ == '__main__':
+    main()
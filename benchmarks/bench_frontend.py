@@ -0,0 +1,48 @@
+"""Tokenizing and parsing one very large file with 1, 2, 4, ... processes.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_frontend [--scale 1] [--runs 3]
+
+The source is the `large_source` workload (about 4 MB per unit of
+`--scale`).  One process is the ordinary sequential front end; more use the
+parallel front end of `src/frontend.py`, up to the number of CPUs.
+"""
+import argparse
+import os
+import time
+
+from benchmarks.workloads import large_source
+from src.frontend import parse_parallel
+from src.pipeline import parse, tokenize
+
+
+def timed(fn, runs):
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--scale', type=float, default=1, help='source size in units of about 4 MB')
+    ap.add_argument('--runs', type=int, default=3, help='best of this many runs')
+    args = ap.parse_args()
+
+    source = large_source(args.scale)
+    sequential, program = timed(lambda: parse(tokenize(source)), args.runs)
+    print(f"{len(source):,} characters, {len(program.stmts):,} statements, best of {args.runs}")
+    print(f"  {1:>3} process    {sequential:8.3f}s")
+    workers = 2
+    while workers <= (os.cpu_count() or 1):
+        seconds, parallel = timed(lambda: parse_parallel(source, workers), args.runs)
+        assert len(parallel.stmts) == len(program.stmts)
+        print(f"  {workers:>3} processes  {seconds:8.3f}s  {sequential / seconds:5.1f}x")
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
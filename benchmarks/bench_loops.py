@@ -0,0 +1,51 @@
+"""Counting loops: `for i in range(n)` against the equivalent `while` loop.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_loops [--n 200000]
+"""
+import argparse
+import time
+
+from src.pipeline import compile_source
+from src.interpreter import Interpreter
+
+WHILE_LOOP = """\
+let i = 0;
+let total = 0;
+while (i < {n}) {{
+    total = total + i;
+    i = i + 1;
+}}
+"""
+
+FOR_LOOP = """\
+let total = 0;
+for i in range({n}) {{
+    total = total + i;
+}}
+"""
+
+
+def timed(source):
+    ast, symbol_table = compile_source(source)
+    start = time.perf_counter()
+    Interpreter(symbol_table).interpret(ast)
+    return time.perf_counter() - start, symbol_table['total']['value']
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--n', type=int, default=200_000, help='loop iterations')
+    args = ap.parse_args()
+
+    while_time, expected = timed(WHILE_LOOP.format(n=args.n))
+    for_time, total = timed(FOR_LOOP.format(n=args.n))
+    assert total == expected
+    print(f"{args.n} iterations")
+    print(f"  while loop  {while_time:8.3f}s")
+    print(f"  for loop    {for_time:8.3f}s  ({while_time / for_time:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
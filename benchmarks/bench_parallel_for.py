@@ -0,0 +1,55 @@
+"""Speedup of `parallel for` with the number of worker processes.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_parallel_for [--n 200000] [--max-workers 8]
+"""
+import argparse
+import os
+import time
+
+from src.pipeline import compile_source
+from src.interpreter import Interpreter
+
+WORKLOAD = """\
+let total = 0;
+let peak = 0;
+parallel for i in range(0, {n}) reduce(sum: total, max: peak) {{
+    let x = i % 1000;
+    let y = x * x + 3 * x + 7;
+    total = y % 97;
+    peak = y;
+}}
+"""
+
+
+def run_once(source, workers):
+    ast, symbol_table = compile_source(source)
+    interpreter = Interpreter(symbol_table, parallel_workers=workers)
+    interpreter.parallel_threshold = 0
+    start = time.perf_counter()
+    interpreter.interpret(ast)
+    return time.perf_counter() - start, symbol_table['total']['value']
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--n', type=int, default=200_000, help='loop iterations')
+    ap.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    source = WORKLOAD.format(n=args.n)
+    counts = sorted({1, 2, 4, 8, 16, args.max_workers} & set(range(1, args.max_workers + 1)))
+    print(f"parallel for over {args.n} iterations ({os.cpu_count()} CPUs)")
+    print(f"{'workers':>8}  {'time (s)':>10}  {'speedup':>8}")
+    base = expected = None
+    for workers in counts:
+        elapsed, total = run_once(source, workers)
+        if base is None:
+            base, expected = elapsed, total
+        assert total == expected, "reduction result changed with worker count"
+        print(f"{workers:>8}  {elapsed:>10.3f}  {base / elapsed:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Building a long string with `s = s + piece` in a loop.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_string_concat [--n 200000] [--piece 40] [--copy-n 20000]
+
+Appends `n` pieces to one string (8 MB by default) and prints its length.
+String `+` builds ropes, so the loop is linear in the final size.  For
+comparison the same loop is timed with every append copying the whole
+string; that version is quadratic, so it runs only `copy-n` appends.
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from src import values
+from src.pipeline import compile_source
+from src.interpreter import Interpreter
+
+SOURCE = """\
+let s = "";
+let i = 0;
+while (i < {n}) {{
+    s = s + "{piece}";
+    i = i + 1;
+}}
+print(len(s));
+"""
+
+
+def timed(source):
+    ast, symbol_table = compile_source(source)
+    out = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(out):
+        Interpreter(symbol_table).interpret(ast)
+    return time.perf_counter() - start, int(out.getvalue())
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--n', type=int, default=200_000, help='number of appends')
+    ap.add_argument('--piece', type=int, default=40, help='characters per append')
+    ap.add_argument('--copy-n', type=int, default=20_000, help='appends for the copying baseline')
+    args = ap.parse_args()
+    piece = 'x' * args.piece
+
+    copy_rope, _ = timed(SOURCE.format(n=args.copy_n, piece=piece))
+    threshold = values.ROPE_MIN_LENGTH
+    values.ROPE_MIN_LENGTH = float('inf')  # every concat copies
+    try:
+        copying, _ = timed(SOURCE.format(n=args.copy_n, piece=piece))
+    finally:
+        values.ROPE_MIN_LENGTH = threshold
+    rope, length = timed(SOURCE.format(n=args.n, piece=piece))
+
+    print(f"{args.copy_n} appends, final length {args.copy_n * args.piece / 1e6:.1f} MB")
+    print(f"  copying concat {copying:8.3f}s")
+    print(f"  rope concat    {copy_rope:8.3f}s  ({copying / copy_rope:.1f}x faster)")
+    print(f"{args.n} appends, final length {length / 1e6:.1f} MB")
+    print(f"  rope concat    {rope:8.3f}s  ({rope / args.n * 1e6:.2f}us per append)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Symbol-table generator hash table at 10^5 to 10^6 symbols.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_symbol_table [--sizes 100000 1000000] [--chained-limit 100000]
+
+Times inserts, lookups and an ordered dump (`entries()`, as used by
+`print_state`) for the open-addressing `HashTable` against the previous
+fixed 101-bucket chained table.  The chained table's cost grows with the
+square of the symbol count, so it only runs up to `chained-limit`.
+"""
+import argparse
+import time
+
+from src.symbol_table_generator import HashTable
+
+
+class ChainedHashTable:
+    """The previous implementation: 101 buckets, list chaining, no resizing."""
+
+    def __init__(self, size=101):
+        self.size = size
+        self.buckets = [[] for _ in range(size)]
+
+    def insert(self, key, payload):
+        bucket = self.buckets[hash(key) % self.size]
+        for i, (k, _) in enumerate(bucket):
+            if k == key:
+                bucket[i] = (key, payload)
+                return
+        bucket.append((key, payload))
+
+    def get(self, key):
+        for k, p in self.buckets[hash(key) % self.size]:
+            if k == key:
+                return p
+        return None
+
+    def entries(self):
+        all_entries = [item for bucket in self.buckets for item in bucket]
+        return sorted(all_entries, key=lambda x: x[0])
+
+
+def measure(cls, names):
+    table = cls()
+    start = time.perf_counter()
+    for name in names:
+        table.insert(name, {'type': 'integer', 'value': 0})
+    insert = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for name in names:
+        table.get(name)
+    lookup = time.perf_counter() - start
+
+    # Two dumps, as in the generator's initial/updated states.
+    start = time.perf_counter()
+    table.entries()
+    table.insert('zz_late', None)
+    table.entries()
+    dump = time.perf_counter() - start
+    return insert, lookup, dump
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    ap.add_argument('--chained-limit', type=int, default=100_000)
+    args = ap.parse_args()
+
+    print(f"{'symbols':>9} {'table':<14} {'insert':>9} {'lookup':>9} {'2 dumps':>9}")
+    for n in args.sizes:
+        names = [f"var_{i * 7919 % n}" for i in range(n)]
+        rows = [('open-address', HashTable)]
+        if n <= args.chained_limit:
+            rows.append(('chained-101', ChainedHashTable))
+        for label, cls in rows:
+            insert, lookup, dump = measure(cls, names)
+            print(f"{n:>9} {label:<14} {insert:>8.3f}s {lookup:>8.3f}s {dump:>8.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Hot loops in the tree walker against the same loops compiled by tier-up.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_tiering [--n 200000] [--runs 3]
+
+Times a counted loop, a loop with a branch and string building, and a loop
+calling a function, each with tiering off and at the default threshold.
+The time to compile each loop is included in the tiered runs.
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from src.pipeline import compile_source
+from src.interpreter import TIER_THRESHOLD, Interpreter
+
+PROGRAMS = {
+    'counted loop': """\
+let i = 0;
+let total = 0;
+while (i < {n}) {{
+    total = total + i % 7;
+    i = i + 1;
+}}
+""",
+    'branches and strings': """\
+let i = 0;
+let total = 0;
+let text = "";
+while (i < {n}) {{
+    if (i % 3 == 0) {{
+        text = text + "x";
+    }} else {{
+        total = total - i / 2;
+    }}
+    i = i + 1;
+}}
+""",
+    'function calls': """\
+fun step(x) {{ return x * 3 % 11; }}
+let i = 0;
+let total = 0;
+while (i < {n}) {{
+    total = total + step(i);
+    i = i + 1;
+}}
+""",
+}
+
+
+def timed(source, runs, threshold):
+    """Best of `runs` executions and the final `total`."""
+    best = float('inf')
+    for _ in range(runs):
+        ast, symbol_table = compile_source(source)
+        interp = Interpreter(symbol_table)
+        interp.tier_threshold = threshold
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            interp.interpret(ast)
+        best = min(best, time.perf_counter() - start)
+    return best, symbol_table['total']['value']
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--n', type=int, default=200_000, help='loop iterations')
+    ap.add_argument('--runs', type=int, default=3, help='best of this many runs')
+    args = ap.parse_args()
+
+    print(f"{args.n} iterations, best of {args.runs}, tier-up after {TIER_THRESHOLD}")
+    print(f"  {'loop':<22} {'interpreted':>11} {'tiered':>9}")
+    for label, program in PROGRAMS.items():
+        source = program.format(n=args.n)
+        interpreted, expected = timed(source, args.runs, None)
+        tiered, total = timed(source, args.runs, TIER_THRESHOLD)
+        assert total == expected
+        print(f"  {label:<22} {interpreted:10.3f}s {tiered:8.3f}s  {interpreted / tiered:5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+# Make `import src.*` and `import benchmarks.*` work however pytest is invoked.
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+# Timing tests are slow and machine-dependent: they only run when asked for,
+# e.g. `SWIFTLANG_BENCH=1 python -m pytest benchmarks -m benchmark`.
+BENCH_ENABLED = os.environ.get('SWIFTLANG_BENCH') == '1'
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'benchmark: timed regression check (needs SWIFTLANG_BENCH=1)')
+
+
+def pytest_collection_modifyitems(config, items):
+    if BENCH_ENABLED:
+        return
+    skip = pytest.mark.skip(reason='set SWIFTLANG_BENCH=1 to run benchmarks')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
@@ -0,0 +1,194 @@
+"""Benchmark suite runner with JSON baselines and a regression gate.
+
+Run from the repository root:
+
+    python -m benchmarks.runner --save-baseline          # record benchmarks/baseline.json
+    python -m benchmarks.runner                          # compare against it
+    python -m benchmarks.runner --workloads long_loop --runs 5 --threshold 0.1
+    python -m benchmarks.runner --debugger-overhead      # debugger attached vs not
+
+Every workload from `benchmarks.workloads` runs through the tokenize, parse,
+analyze and execute phases `runs` times with its output discarded.  The
+median time of each phase is compared with the baseline; the run fails (exit
+status 1) when any phase is slower than baseline * (1 + threshold).  Phases
+faster than `--min-time` in the baseline are reported but never fail the
+gate, since their timings are mostly noise.  Baselines are machine-specific:
+record one on the machine that runs the comparison.
+
+`--debugger-overhead` needs no baseline: it times the execute phase of each
+workload as a normal run (`compile_source`, optimizer and tiering on) and
+under the debugger with no breakpoints set, and fails when the debugger is
+more than `threshold` slower in the median run.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from src.bench import PHASES, quiet, run_phases
+from benchmarks.workloads import WORKLOADS
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MIN_TIME = 0.005
+
+
+def run_workload(name, runs=3, scale=1):
+    """{phase: median seconds} for one workload."""
+    source = WORKLOADS[name](scale)
+    samples = {phase: [] for phase in PHASES}
+    with quiet():
+        for _ in range(runs):
+            times = run_phases(source)[0]
+            for phase in PHASES:
+                samples[phase].append(times[phase])
+    return {phase: statistics.median(samples[phase]) for phase in PHASES}
+
+
+def run_suite(names=None, runs=3, scale=1):
+    return {name: run_workload(name, runs, scale) for name in names or WORKLOADS}
+
+
+def debugger_overhead(name, runs=3, scale=1):
+    """(plain, debugger) median execute seconds and the slowdown for one workload.
+
+    The slowdown is the median of debugger / plain over each run's pair of
+    back-to-back timings.  Both halves of a pair see the same machine load,
+    so a busy moment cancels out instead of deciding the gate, as it can
+    when two separate medians or minimums are compared.
+    """
+    from src.debugger import DebugInterpreter, Debugger, compile_for_debugging
+    from src.interpreter import Interpreter
+    from src.pipeline import compile_source
+
+    source = WORKLOADS[name](scale)
+    samples = {'plain': [], 'debugger': []}
+    with quiet():
+        for run in range(runs):
+            # Alternate which configuration goes first, and start each from a
+            # clean heap, so neither pays for the other's garbage.
+            for config in sorted(samples, reverse=run % 2 == 1):
+                # The plain side runs the way `main.py` runs a program.
+                if config == 'plain':
+                    ast, symbol_table = compile_source(source)
+                    interp = Interpreter(symbol_table)
+                else:
+                    ast, symbol_table = compile_for_debugging(source)
+                    interp = DebugInterpreter(symbol_table, Debugger(source, ast, symbol_table))
+                gc.collect()
+                start = time.perf_counter()
+                interp.interpret(ast)
+                samples[config].append(time.perf_counter() - start)
+    ratios = [debugged / plain for plain, debugged in zip(samples['plain'], samples['debugger'])]
+    return (statistics.median(samples['plain']), statistics.median(samples['debugger']),
+            statistics.median(ratios))
+
+
+def format_overhead(rows, threshold):
+    lines = [f"  {'workload':<20} {'plain':>10} {'debugger':>10} {'change':>8}"]
+    for name, plain, debugged, slowdown, regressed in rows:
+        flag = f"  OVERHEAD (>{threshold:.0%})" if regressed else ""
+        lines.append(f"  {name:<20} {plain * 1e3:>8.2f}ms {debugged * 1e3:>8.2f}ms "
+                     f"{slowdown - 1:>+8.1%}{flag}")
+    return "\n".join(lines)
+
+
+def save_baseline(results, path, runs, scale):
+    data = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'runs': runs,
+        'scale': scale,
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def load_baseline(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['results']
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, min_time=DEFAULT_MIN_TIME):
+    """Rows (workload, phase, baseline, current, ratio, regressed) for every shared phase."""
+    rows = []
+    for name, phases in results.items():
+        for phase, current in phases.items():
+            base = baseline.get(name, {}).get(phase)
+            if base is None:
+                continue
+            ratio = current / base if base else float('inf')
+            regressed = base >= min_time and current > base * (1 + threshold)
+            rows.append((name, phase, base, current, ratio, regressed))
+    return rows
+
+
+def format_results(results):
+    lines = [f"  {'workload':<20} " + " ".join(f"{phase:>10}" for phase in PHASES)]
+    for name, phases in results.items():
+        lines.append(f"  {name:<20} " + " ".join(f"{phases[p] * 1e3:>8.2f}ms" for p in PHASES))
+    return "\n".join(lines)
+
+
+def format_comparison(rows, threshold):
+    lines = [f"  {'workload':<20} {'phase':<10} {'baseline':>10} {'current':>10} {'change':>8}"]
+    for name, phase, base, current, ratio, regressed in rows:
+        flag = f"  REGRESSION (>{threshold:.0%})" if regressed else ""
+        lines.append(f"  {name:<20} {phase:<10} {base * 1e3:>8.2f}ms {current * 1e3:>8.2f}ms "
+                     f"{ratio - 1:>+8.1%}{flag}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--workloads', nargs='+', choices=sorted(WORKLOADS), help='default: all')
+    ap.add_argument('--runs', type=int, default=3, help='timed runs per workload')
+    ap.add_argument('--scale', type=float, default=1, help='workload size multiplier')
+    ap.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON file')
+    ap.add_argument('--save-baseline', action='store_true',
+                    help='record the results as the new baseline instead of comparing')
+    ap.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                    help='allowed slowdown per phase, as a fraction (default 0.25)')
+    ap.add_argument('--min-time', type=float, default=DEFAULT_MIN_TIME,
+                    help='baseline phases faster than this many seconds never fail the gate')
+    ap.add_argument('--debugger-overhead', action='store_true',
+                    help='compare execution with and without the debugger attached')
+    args = ap.parse_args(argv)
+
+    if args.debugger_overhead:
+        rows = []
+        for name in args.workloads or WORKLOADS:
+            plain, debugged, slowdown = debugger_overhead(name, args.runs, args.scale)
+            regressed = plain >= args.min_time and slowdown > 1 + args.threshold
+            rows.append((name, plain, debugged, slowdown, regressed))
+        print(format_overhead(rows, args.threshold))
+        return 1 if any(row[-1] for row in rows) else 0
+
+    results = run_suite(args.workloads, args.runs, args.scale)
+    print(format_results(results))
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline, args.runs, args.scale)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline first.")
+        return 0
+
+    rows = compare(results, load_baseline(args.baseline), args.threshold, args.min_time)
+    print()
+    print(format_comparison(rows, args.threshold))
+    regressions = [row for row in rows if row[-1]]
+    if regressions:
+        print(f"\n{len(regressions)} phase(s) regressed beyond {args.threshold:.0%}.")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,37 @@
+import os
+
+import pytest
+
+from src.pipeline import compile_source
+from benchmarks import runner
+from benchmarks.workloads import WORKLOADS
+
+
+@pytest.mark.parametrize("name", sorted(WORKLOADS))
+def test_workload_generates_a_valid_program(name):
+    compile_source(WORKLOADS[name](scale=0.01))
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("name", sorted(WORKLOADS))
+def test_workload_has_not_regressed(name):
+    baseline_path = os.environ.get("SWIFTLANG_BENCH_BASELINE", runner.DEFAULT_BASELINE)
+    if not os.path.exists(baseline_path):
+        pytest.skip(f"no baseline at {baseline_path} (python -m benchmarks.runner --save-baseline)")
+    threshold = float(os.environ.get("SWIFTLANG_BENCH_THRESHOLD", runner.DEFAULT_THRESHOLD))
+
+    results = {name: runner.run_workload(name)}
+    rows = runner.compare(results, runner.load_baseline(baseline_path), threshold)
+    regressed = [row for row in rows if row[-1]]
+    assert not regressed, "\n" + runner.format_comparison(regressed, threshold)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("name", sorted(WORKLOADS))
+def test_debugger_without_breakpoints_adds_no_overhead(name):
+    threshold = float(os.environ.get("SWIFTLANG_BENCH_THRESHOLD", runner.DEFAULT_THRESHOLD))
+    plain, debugged, slowdown = runner.debugger_overhead(name, runs=5)
+    if plain < runner.DEFAULT_MIN_TIME:
+        pytest.skip(f"{name} executes too quickly to time reliably")
+    assert slowdown <= 1 + threshold, \
+        f"debugger: {debugged * 1e3:.2f}ms, plain: {plain * 1e3:.2f}ms, {slowdown - 1:+.1%} per run"
@@ -0,0 +1,105 @@
+"""Generated SwiftLang programs for the benchmark suite.
+
+Each generator takes a `scale` (1 is the default size) and returns source
+text.  Sizes are chosen so that one run of every workload at scale 1 takes
+well under a second on a laptop, except `large_source`: the front end is
+only stressed by a file of several megabytes.
+"""
+
+
+def large_source(scale=1):
+    """About 4 MB of straight-line declarations and arithmetic per unit of scale."""
+    lines = []
+    for i in range(int(140_000 * scale)):
+        lines.append(f"let v{i} = {i} * 2 + {i % 7};")
+    return "\n".join(lines) + "\n"
+
+
+def nested_expressions(scale=1, depth=40):
+    """Many statements, each an expression nested `depth` parentheses deep.
+
+    The parser and interpreter recurse once per level, so depth stays well
+    below Python's recursion limit; scale adds statements instead.
+    """
+    expr = "1"
+    for i in range(depth):
+        expr = f"({expr} + {i % 5})" if i % 2 else f"({expr} * 1)"
+    lines = ["let total = 0;"]
+    lines += [f"total = {expr};" for _ in range(int(300 * scale))]
+    return "\n".join(lines) + "\n"
+
+
+def long_loop(scale=1):
+    """A single `while` loop doing integer arithmetic."""
+    return f"""\
+let i = 0;
+let total = 0;
+while (i < {int(50_000 * scale)}) {{
+    total = total + i % 7;
+    i = i + 1;
+}}
+print(total);
+"""
+
+
+def print_heavy(scale=1):
+    """A loop that prints on every iteration."""
+    return f"""\
+let i = 0;
+while (i < {int(20_000 * scale)}) {{
+    print(i);
+    i = i + 1;
+}}
+"""
+
+
+def string_heavy(scale=1):
+    """String building, comparison and indexing in a loop."""
+    return f"""\
+let s = "";
+let i = 0;
+let matches = 0;
+while (i < {int(20_000 * scale)}) {{
+    s = s + "line " + "of text;";
+    if (s[i] == "l") {{ matches = matches + 1; }}
+    i = i + 1;
+}}
+print(len(s));
+print(matches);
+"""
+
+
+def wide_symbol_table(scale=1):
+    """Thousands of globals, each declared, read and reassigned."""
+    n = int(5_000 * scale)
+    lines = [f"let g{i} = {i};" for i in range(n)]
+    lines += [f"g{i} = g{(i * 31) % n} + 1;" for i in range(n)]
+    return "\n".join(lines) + "\n"
+
+
+def switch_dispatch(scale=1, cases=64):
+    """A loop that dispatches on `cases` constant `switch` labels."""
+    arms = "\n".join(f"        case {k}: total = total + {k % 5};" for k in range(cases))
+    return f"""\
+let i = 0;
+let total = 0;
+while (i < {int(20_000 * scale)}) {{
+    switch (i % {cases}) {{
+{arms}
+    }}
+    i = i + 1;
+}}
+print(total);
+"""
+
+
+# name -> generator
+WORKLOADS = {
+    'large_source': large_source,
+    'nested_expressions': nested_expressions,
+    'long_loop': long_loop,
+    'print_heavy': print_heavy,
+    'string_heavy': string_heavy,
+    'wide_symbol_table': wide_symbol_table,
+    'switch_dispatch': switch_dispatch,
+}
@@ -0,0 +1,128 @@
+# src/batch.py
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from . import pipeline
+from .pipeline import PipelineError, run_source
+
+
+def load_manifest(path):
+    """Read program paths from a manifest: one per line, '#' comments allowed.
+
+    Relative entries are resolved against the manifest's directory.
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    paths = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            entry = line.strip()
+            if not entry or entry.startswith('#'):
+                continue
+            paths.append(entry if os.path.isabs(entry) else os.path.join(base, entry))
+    return paths
+
+
+def run_file(path):
+    """Run one program with its output captured; return a picklable result dict."""
+    out = io.StringIO()
+    status, error = 'ok', None
+    start = time.perf_counter()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        with contextlib.redirect_stdout(out):
+            run_source(source, path)
+    except PipelineError as e:
+        status, error = e.label, str(e)
+    except Exception as e:
+        status, error = 'Read Error' if isinstance(e, OSError) else 'Error', str(e)
+    return {
+        'path': path,
+        'status': status,
+        'error': error,
+        'output': out.getvalue(),
+        'elapsed': time.perf_counter() - start,
+    }
+
+
+def _init_worker():
+    # Batch programs never get interactive input; `read` fails instead of blocking.
+    sys.stdin = io.StringIO()
+    # Every worker already has a core of its own: large files parse in-process.
+    pipeline.parse_workers = 1
+
+
+def run_batch(paths, workers=None, chunksize=None):
+    """Run every program in `paths` across a process pool, results in input order."""
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        # A few chunks per worker keeps the pool balanced without paying
+        # one IPC round trip per tiny script.
+        chunksize = max(1, len(paths) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return list(pool.map(run_file, paths, chunksize=chunksize))
+
+
+def format_summary(results, wall_time):
+    lines = []
+    width = max([len(r['path']) for r in results] + [4])
+    lines.append(f"{'FILE':<{width}}  {'STATUS':<24}  TIME (s)")
+    for r in results:
+        lines.append(f"{r['path']:<{width}}  {r['status']:<24}  {r['elapsed']:.4f}")
+    passed = sum(1 for r in results if r['status'] == 'ok')
+    cpu_time = sum(r['elapsed'] for r in results)
+    lines.append("-" * 50)
+    lines.append(f"{len(results)} programs: {passed} ok, {len(results) - passed} failed")
+    lines.append(f"Wall time: {wall_time:.3f}s  (sum of program times: {cpu_time:.3f}s)")
+    return "\n".join(lines)
+
+
+def write_outputs(results, output_dir):
+    """Store each program's captured output as <output_dir>/<name>.out."""
+    os.makedirs(output_dir, exist_ok=True)
+    for i, r in enumerate(results):
+        name = os.path.splitext(os.path.basename(r['path']))[0]
+        # Prefix with the batch index so equally named files never collide.
+        with open(os.path.join(output_dir, f"{i:05d}_{name}.out"), 'w', encoding='utf-8') as f:
+            f.write(r['output'])
+            if r['error'] is not None:
+                f.write(f"{r['status']}:\n{r['error']}\n")
+
+
+def main(argv):
+    ap = argparse.ArgumentParser(prog='main.py --batch',
+                                 description='Run many SwiftLang programs in parallel.')
+    ap.add_argument('files', nargs='*', help='.sl programs to run')
+    ap.add_argument('--manifest', action='append', default=[],
+                    help='file listing one program path per line (repeatable)')
+    ap.add_argument('--workers', type=int, default=None,
+                    help='worker processes (default: CPU count)')
+    ap.add_argument('--output-dir', help='write each program\'s output to this directory')
+    ap.add_argument('--summary-json', help='write the per-file summary as JSON')
+    args = ap.parse_args(argv)
+
+    paths = list(args.files)
+    for manifest in args.manifest:
+        paths.extend(load_manifest(manifest))
+    if not paths:
+        print("Error: No source files provided.")
+        return 1
+
+    start = time.perf_counter()
+    results = run_batch(paths, workers=args.workers)
+    wall_time = time.perf_counter() - start
+
+    if args.output_dir:
+        write_outputs(results, args.output_dir)
+    if args.summary_json:
+        with open(args.summary_json, 'w', encoding='utf-8') as f:
+            json.dump({'wall_time': wall_time, 'results': results}, f, indent=2)
+
+    print(format_summary(results, wall_time))
+    return 0 if all(r['status'] == 'ok' for r in results) else 1
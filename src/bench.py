@@ -0,0 +1,214 @@
+# src/bench.py
+#
+# `main.py --bench N file.sl`: run every phase of the pipeline N times with
+# the program's output discarded, and report per-phase wall time (min,
+# median, p95), allocations and throughput.
+#
+# Timed runs never have tracemalloc enabled, since tracing slows allocation
+# down several times over.  Allocations come from one extra traced run, and
+# the number of statements executed from one extra counting run.
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from .interpreter import Interpreter, describe_error
+from .parser import count_nodes
+from .pipeline import PipelineError, analyze, parse, tokenize
+
+PHASES = ('tokenize', 'parse', 'analyze', 'execute')
+
+
+class CountingInterpreter(Interpreter):
+    """Interpreter that counts the statements it executes."""
+    tier_threshold = None  # compiled loops would run statements uncounted
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.statements = 0
+
+    def visit(self, node):
+        if type(node).__name__.endswith('Stmt'):
+            self.statements += 1
+        return super().visit(node)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Discard program output and give `read` an empty stdin."""
+    with open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+        stdin, sys.stdin = sys.stdin, io.StringIO()
+        try:
+            yield
+        finally:
+            sys.stdin = stdin
+
+
+def run_phases(source, interpreter_class=Interpreter, on_phase=None, base_dir=None):
+    """Run the pipeline once; return ({phase: seconds}, tokens, ast, interpreter).
+
+    `on_phase(phase, start)` is called before (start=True) and after each
+    phase.  Imports are resolved from `base_dir`.
+    """
+    times = {}
+    interp = None
+
+    def timed(phase, fn, *args):
+        if on_phase:
+            on_phase(phase, True)
+        start = time.perf_counter()
+        result = fn(*args)
+        times[phase] = time.perf_counter() - start
+        if on_phase:
+            on_phase(phase, False)
+        return result
+
+    tokens = timed('tokenize', tokenize, source)
+    ast = timed('parse', parse, tokens)
+    symbol_table = timed('analyze', analyze, ast, base_dir)
+
+    def execute():
+        nonlocal interp
+        interp = interpreter_class(symbol_table)
+        try:
+            interp.interpret(ast)
+        except Exception as e:
+            raise PipelineError("Runtime Error", describe_error(e)) from e
+
+    timed('execute', execute)
+    return times, tokens, ast, interp
+
+
+def measure_allocations(source, base_dir=None):
+    """{phase: {'peak_bytes', 'net_bytes'}} from one run under tracemalloc."""
+    allocations = {}
+    started = {}
+
+    def on_phase(phase, start):
+        current, _ = tracemalloc.get_traced_memory()
+        if start:
+            tracemalloc.reset_peak()
+            started[phase] = current
+        else:
+            _, peak = tracemalloc.get_traced_memory()
+            allocations[phase] = {'peak_bytes': peak - started[phase],
+                                  'net_bytes': current - started[phase]}
+
+    tracemalloc.start()
+    try:
+        run_phases(source, on_phase=on_phase, base_dir=base_dir)
+    finally:
+        tracemalloc.stop()
+    return allocations
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def bench_source(source, runs, path=None):
+    """Benchmark `source`, read from `path` if given; return a JSON-serialisable report."""
+    base_dir = os.path.dirname(os.path.abspath(path)) if path else None
+    samples = {phase: [] for phase in PHASES}
+    with quiet():
+        for _ in range(runs):
+            times, _, _, timed_interp = run_phases(source, base_dir=base_dir)
+            for phase in PHASES:
+                samples[phase].append(times[phase])
+        allocations = measure_allocations(source, base_dir)
+        _, tokens, ast, interp = run_phases(source, CountingInterpreter, base_dir=base_dir)
+
+    phases = {}
+    for phase in PHASES:
+        times = samples[phase]
+        phases[phase] = {
+            'min': min(times),
+            'median': statistics.median(times),
+            'p95': percentile(times, 0.95),
+            **allocations[phase],
+        }
+
+    def rate(count, phase):
+        median = phases[phase]['median']
+        return count / median if median else None
+
+    counts = {'tokens': len(tokens), 'nodes': count_nodes(ast), 'statements': interp.statements}
+    return {
+        'runs': runs,
+        'phases': phases,
+        'counts': counts,
+        # loops compiled during the last timed run (the counting run compiles none)
+        'tier_ups': timed_interp.tier_ups,
+        'throughput': {
+            'tokens_per_second': rate(counts['tokens'], 'tokenize'),
+            'nodes_per_second': rate(counts['nodes'], 'parse'),
+            'statements_per_second': rate(counts['statements'], 'execute'),
+        },
+    }
+
+
+def format_report(report, path):
+    lines = [f"Benchmark of {path}: {report['runs']} runs, output suppressed", ""]
+    lines.append(f"  {'phase':<10} {'min':>10} {'median':>10} {'p95':>10} {'peak alloc':>12} {'net alloc':>12}")
+    for phase in PHASES:
+        p = report['phases'][phase]
+        lines.append(f"  {phase:<10} {p['min'] * 1e3:>8.3f}ms {p['median'] * 1e3:>8.3f}ms "
+                     f"{p['p95'] * 1e3:>8.3f}ms {p['peak_bytes'] / 1024:>10.1f}KB "
+                     f"{p['net_bytes'] / 1024:>10.1f}KB")
+    lines.append("")
+    counts, throughput = report['counts'], report['throughput']
+    for label, count, key in (('tokens', counts['tokens'], 'tokens_per_second'),
+                              ('AST nodes', counts['nodes'], 'nodes_per_second'),
+                              ('statements executed', counts['statements'], 'statements_per_second')):
+        rate = throughput[key]
+        rate_text = f"{rate:,.0f}/s" if rate is not None else "n/a"
+        lines.append(f"  {label:<20} {count:>10,}  {rate_text:>14}")
+    if report['tier_ups']:
+        lines.append("")
+    for tier_up in report['tier_ups']:
+        lines.append(f"  loop at line {tier_up['line']} compiled after {tier_up['iterations']:,} "
+                     f"iterations in {tier_up['seconds'] * 1e3:.3f}ms")
+    return "\n".join(lines)
+
+
+def main(argv):
+    ap = argparse.ArgumentParser(prog='main.py --bench',
+                                 description='Time each pipeline phase over repeated runs.')
+    ap.add_argument('runs', type=int, help='number of timed runs')
+    ap.add_argument('file', help='.sl program to benchmark')
+    ap.add_argument('--format', choices=('text', 'json'), default='text')
+    ap.add_argument('--output', help='write the report to this file instead of stdout')
+    args = ap.parse_args(argv)
+    if args.runs < 1:
+        ap.error('runs must be at least 1')
+
+    try:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            source = f.read()
+    except OSError as e:
+        print(f"Error reading file '{args.file}': {e}")
+        return 1
+
+    try:
+        report = bench_source(source, args.runs, args.file)
+    except PipelineError as e:
+        print(f"{e.label}:")
+        print(e)
+        return 1
+
+    if args.format == 'json':
+        text = json.dumps({'file': args.file, **report}, indent=2)
+    else:
+        text = format_report(report, args.file)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
@@ -0,0 +1,420 @@
+# src/checkpoint.py
+#
+# `main.py --checkpoint file.sl`: periodic and on-signal snapshots of a
+# running program, and resuming from the latest one after a crash or
+# preemption.
+#
+# A snapshot holds the program's globals (and those of every module it
+# imported) together with the position of the next statement to run: one
+# step per enclosing block, `while` body, `if` branch, `switch` case or
+# `try`/`catch` block, counted from the Program down.  Snapshots are taken
+# only between two statements of the program's own top-level code, or
+# between two iterations of one of its `while` loops, where every variable
+# lives in an env dict.
+# A request that arrives during a function call, a `for` loop or a module's
+# top level waits until control is back there.  Programs that start threads
+# are never snapshotted: another thread could be half-way through an update.
+#
+# Functions and modules are not stored.  Resuming binds them afresh from the
+# same source, without running module top levels again, and the snapshot
+# refers to them by name.  A snapshot is a zlib-compressed pickle, written to
+# a temporary file and renamed over the old one, so a crash while writing
+# leaves the previous snapshot intact.
+import argparse
+import hashlib
+import io
+import os
+import pickle
+import signal
+import sys
+import tempfile
+import threading
+import time
+import zlib
+
+from .interpreter import BREAK, CATCHABLE, CONTINUE, Interpreter, describe_error, locate
+from .parser import FunDecl, ImportStmt
+from .values import Function, Module
+
+MAGIC = b'SLCHECKPOINT1\n'
+SNAPSHOT_SUFFIX = '.ckpt'
+
+
+class CheckpointError(Exception):
+    pass
+
+
+class CheckpointStop(Exception):
+    """Raised once the snapshot requested by `request_stop` is written."""
+
+
+def fingerprint(source):
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+def write_snapshot(path, data):
+    """Replace the file at `path` with `data` atomically."""
+    path = os.path.abspath(path)
+    fd, tmp = tempfile.mkstemp(prefix='.' + os.path.basename(path), suffix='.tmp',
+                               dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def load_snapshot(path):
+    """The snapshot dict stored at `path`."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise CheckpointError(f"'{path}' is not a SwiftLang checkpoint")
+    try:
+        return pickle.loads(zlib.decompress(data[len(MAGIC):]))
+    except (zlib.error, pickle.UnpicklingError, EOFError) as e:
+        raise CheckpointError(f"'{path}' is damaged: {e}") from None
+
+
+class CheckpointingInterpreter(Interpreter):
+    """Interpreter that tracks its position in the top-level code and can snapshot it."""
+
+    def __init__(self, symbol_table, snapshot_path, source_fingerprint, resume=None, **kwargs):
+        super().__init__(symbol_table, **kwargs)
+        self.globals = symbol_table
+        self.snapshot_path = snapshot_path
+        self.fingerprint = source_fingerprint
+        self.checkpoint_due = False  # set by the timer and signal handlers
+        self.stop_requested = False
+        self.checkpoints = 0  # snapshots written by this run
+        self.position = []  # steps from the Program to the running statement
+        self._opaque = 0  # > 0 inside calls, `for` loops and module top levels
+        self._resume = resume
+        self._resume_path = list(reversed(resume['position'])) if resume else []
+
+    def request_checkpoint(self):
+        self.checkpoint_due = True
+
+    def request_stop(self):
+        """Snapshot at the next opportunity, then raise CheckpointStop."""
+        self.stop_requested = True
+        self.checkpoint_due = True
+
+    # -- snapshots -----------------------------------------------------------
+
+    def _env_key(self, env):
+        if env is self.globals:
+            return None
+        for path, module in self.modules.items():
+            if module.env is env:
+                return path
+        raise CheckpointError("function of an unknown module")
+
+    def _persistent_id(self, value):
+        if type(value) is Function:
+            return ('fun', self._env_key(value.env), value.name)
+        if type(value) is Module:
+            return ('module', self._env_key(value.env))
+        return None
+
+    def _persistent_load(self, pid):
+        kind, path, *name = pid
+        if kind == 'module':
+            return self.modules[path]
+        env = self.globals if path is None else self.modules[path].env
+        return env[name[0]]['value']
+
+    def snapshot(self):
+        """Compressed snapshot of the globals and the current position."""
+        state = {'globals': {name: entry['value'] for name, entry in self.globals.items()},
+                 'modules': {path: {name: entry['value'] for name, entry in module.env.items()}
+                             for path, module in self.modules.items()}}
+        buf = io.BytesIO()
+        pickler = pickle.Pickler(buf, pickle.HIGHEST_PROTOCOL)
+        pickler.persistent_id = self._persistent_id
+        pickler.dump(state)
+        snapshot = {'fingerprint': self.fingerprint, 'position': list(self.position),
+                    'state': buf.getvalue(), 'time': time.time()}
+        return MAGIC + zlib.compress(pickle.dumps(snapshot, pickle.HIGHEST_PROTOCOL))
+
+    def checkpoint(self):
+        """Write a snapshot now; only called between two top-level statements."""
+        self.checkpoint_due = False
+        if self.runtime is not None:
+            print("Checkpoint skipped: the program has started threads.", file=sys.stderr)
+        else:
+            try:
+                write_snapshot(self.snapshot_path, self.snapshot())
+                self.checkpoints += 1
+            except (pickle.PicklingError, TypeError, OSError, CheckpointError) as e:
+                print(f"Checkpoint failed: {e}", file=sys.stderr)
+        if self.stop_requested:
+            raise CheckpointStop()
+
+    def _restore(self):
+        unpickler = pickle.Unpickler(io.BytesIO(self._resume['state']))
+        unpickler.persistent_load = self._persistent_load
+        state = unpickler.load()
+        for path, values in state['modules'].items():
+            if path not in self.modules:
+                raise CheckpointError(f"the snapshot expects module '{path}'")
+            env = self.modules[path].env
+            for name, value in values.items():
+                env[name]['value'] = value
+        for name, value in state['globals'].items():
+            self.globals[name]['value'] = value
+        self._resume = None
+
+    # -- execution -----------------------------------------------------------
+
+    def visit_Program(self, node):
+        if self._opaque:
+            return super().visit_Program(node)  # a module's top level
+        for stmt in node.stmts:
+            if isinstance(stmt, (FunDecl, ImportStmt)):
+                self.visit(stmt)
+        if self._resume is not None:
+            self._restore()
+        return self._run(node.stmts)
+
+    def visit_BlockStmt(self, node):
+        if self._opaque:
+            return super().visit_BlockStmt(node)
+        return self._run(node.stmts)
+
+    def _run(self, stmts):
+        start = self._resume_path.pop() if self._resume_path else 0
+        position = self.position
+        depth = len(position)
+        position.append(start)
+        try:
+            for index in range(start, len(stmts)):
+                position[depth] = index
+                if self.checkpoint_due and not self._opaque:
+                    self.checkpoint()
+                stmt = stmts[index]
+                if type(stmt) is ImportStmt:
+                    continue
+                signal = self.visit(stmt)
+                if signal is not None:
+                    return signal
+        except Exception as e:
+            locate(e, stmts[position[depth]])
+            raise
+        finally:
+            del position[depth:]
+
+    def visit_WhileStmt(self, node):
+        if self._opaque:
+            return super().visit_WhileStmt(node)
+        plan = node.plan
+        if plan is not None:
+            for invariant in plan.invariants:
+                invariant.cached = False
+        # A resumed loop re-enters its body without testing the condition.
+        resumed = bool(self._resume_path)
+        if resumed:
+            self._resume_path.pop()
+        self.position.append('body')
+        try:
+            while resumed or self.visit(node.cond):
+                # Also a checkpoint for bodies that are not blocks; resuming
+                # here re-enters the body, just as for a block.
+                if self.checkpoint_due:
+                    self.checkpoint()
+                resumed = False
+                signal = self.visit(node.body)
+                if signal is not None:
+                    if signal is BREAK:
+                        break
+                    if signal is CONTINUE:
+                        continue
+                    return signal
+        finally:
+            self.position.pop()
+
+    def visit_IfStmt(self, node):
+        if self._opaque:
+            return super().visit_IfStmt(node)
+        if self._resume_path:
+            branch = self._resume_path.pop()
+        elif self.visit(node.cond):
+            branch = 'then'
+        elif node.else_body:
+            branch = 'else'
+        else:
+            return None
+        return self._enter(branch, node.then_body if branch == 'then' else node.else_body)
+
+    def visit_SwitchStmt(self, node):
+        if self._opaque:
+            return super().visit_SwitchStmt(node)
+        if self._resume_path:
+            index = self._resume_path.pop()
+        else:
+            index = self.select_case(node, self.visit(node.subject))
+            if index is None:
+                return None
+        signal = self._enter(index, node.clauses[index].body)
+        return None if signal is BREAK else signal
+
+    def visit_TryStmt(self, node):
+        if self._opaque:
+            return super().visit_TryStmt(node)
+        if not self._resume_path or self._resume_path.pop() == 'try':
+            try:
+                return self._enter('try', node.body)
+            except CATCHABLE as e:
+                self.bind_error(node, e)
+        return self._enter('catch', node.handler)
+
+    def _enter(self, step, body):
+        self.position.append(step)
+        try:
+            return self.visit(body)
+        finally:
+            self.position.pop()
+
+    def _opaquely(self, run, *args):
+        self._opaque += 1
+        try:
+            return run(*args)
+        finally:
+            self._opaque -= 1
+
+    def visit_ForStmt(self, node):
+        return self._opaquely(super().visit_ForStmt, node)
+
+    def visit_ParallelForStmt(self, node):
+        return self._opaquely(super().visit_ParallelForStmt, node)
+
+    def call(self, fn, args):
+        return self._opaquely(super().call, fn, args)
+
+    def instantiate(self, compiled):
+        if self._resume is None or compiled.path in self.modules:
+            return self._opaquely(super().instantiate, compiled)
+        # Resuming: bind the module's functions and imports; its globals
+        # come from the snapshot.
+        module = self.modules[compiled.path] = Module(compiled.name, compiled.new_env())
+        saved_env, self.env = self.env, module.env
+        try:
+            for stmt in compiled.ast.stmts:
+                if isinstance(stmt, (FunDecl, ImportStmt)):
+                    self.visit(stmt)
+        finally:
+            self.env = saved_env
+        return module
+
+    def _fork(self):
+        child = super()._fork()
+        child._opaque = 1  # spawned blocks never snapshot
+        return child
+
+
+class Ticker:
+    """Daemon thread that asks `interp` for a checkpoint every `seconds`."""
+
+    def __init__(self, interp, seconds):
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(interp, seconds), daemon=True)
+        self._thread.start()
+
+    def _run(self, interp, seconds):
+        while not self._stop.wait(seconds):
+            interp.request_checkpoint()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_checkpointed(source, path, snapshot_path, every=None, log=None):
+    """Run a program, resuming from `snapshot_path` if it exists.
+
+    Snapshots are written every `every` seconds, on SIGUSR1, and on SIGTERM,
+    which then stops the program.  Returns True if the program ran to the
+    end (the snapshot is then removed) and False if it was stopped.
+    """
+    from .pipeline import compile_source
+
+    log = log or sys.stderr
+    digest = fingerprint(source)
+    resume = None
+    if os.path.exists(snapshot_path):
+        resume = load_snapshot(snapshot_path)
+        if resume['fingerprint'] != digest:
+            raise CheckpointError(f"'{snapshot_path}' was taken from a different version of "
+                                  "the program; delete it to start over")
+        taken = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(resume['time']))
+        print(f"Resuming from checkpoint '{snapshot_path}' taken {taken}.", file=log)
+    ast, symbol_table = compile_source(source, path)
+    interp = CheckpointingInterpreter(symbol_table, snapshot_path, digest, resume)
+
+    handlers = {}
+
+    def on_signal(signum, frame):
+        if signum == signal.SIGTERM:
+            if interp.stop_requested:
+                raise SystemExit(128 + signum)  # a second SIGTERM stops at once
+            interp.request_stop()
+        else:
+            interp.request_checkpoint()
+
+    if threading.current_thread() is threading.main_thread():
+        for signum in (signal.SIGTERM, getattr(signal, 'SIGUSR1', None)):
+            if signum is not None:
+                handlers[signum] = signal.signal(signum, on_signal)
+    ticker = Ticker(interp, every) if every else None
+    try:
+        interp.interpret(ast)
+    except CheckpointStop:
+        print(f"Stopped; state saved to '{snapshot_path}'.", file=log)
+        return False
+    finally:
+        if ticker is not None:
+            ticker.stop()
+        for signum, handler in handlers.items():
+            signal.signal(signum, handler)
+    if os.path.exists(snapshot_path):
+        os.remove(snapshot_path)
+    return True
+
+
+def main(argv):
+    ap = argparse.ArgumentParser(prog='main.py --checkpoint',
+                                 description='Run a SwiftLang program that can be stopped '
+                                             'and resumed from a snapshot.')
+    ap.add_argument('file', help='.sl program to run')
+    ap.add_argument('--snapshot', metavar='FILE',
+                    help=f'snapshot file (default: the program path + {SNAPSHOT_SUFFIX})')
+    ap.add_argument('--every', type=float, metavar='SECONDS',
+                    help='also take a snapshot this often')
+    args = ap.parse_args(argv)
+    snapshot_path = args.snapshot or args.file + SNAPSHOT_SUFFIX
+
+    try:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            source = f.read()
+    except OSError as e:
+        print(f"Error reading file '{args.file}': {e}")
+        return 1
+
+    from .pipeline import PipelineError
+    try:
+        finished = run_checkpointed(source, args.file, snapshot_path, args.every)
+    except PipelineError as e:
+        print(f"{e.label}:")
+        print(e)
+        return 1
+    except (CheckpointError, OSError) as e:
+        print(f"Checkpoint Error:\n{e}")
+        return 1
+    except Exception as e:
+        print(f"Runtime Error:\n{describe_error(e)}")
+        return 1
+    return 0 if finished else 1
@@ -0,0 +1,108 @@
+# src/concurrency.py
+#
+# Runtime support for `spawn`, `thread`, `join`, `lock` and `unlock`.
+#
+# Spawned blocks share the interpreter's `env`.  Semantic analysis declares
+# every name before the program starts, so the env dict never changes shape
+# at run time: a spawned block only ever replaces `entry['value']`, which is
+# a single atomic store.  Read-modify-write sequences such as `x = x + 1`
+# are not atomic and must be guarded with `lock(name)` / `unlock(name)`.
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+
+class ThreadHandle:
+    """Value produced by `spawn { ... }`; `join(handle)` waits for the block."""
+    __slots__ = ('_future', '_fn', '_guard', '_ran_inline', '_error')
+
+    def __init__(self, future, fn):
+        self._future = future
+        self._fn = fn
+        self._guard = threading.Lock()
+        self._ran_inline = False
+        self._error = None
+
+    def join(self):
+        # A block that has not started yet runs on the joining thread instead.
+        # Otherwise a bounded pool whose workers all sit in `join` waiting for
+        # queued blocks would deadlock.
+        with self._guard:
+            if not self._ran_inline and self._future.cancel():
+                self._ran_inline = True
+                try:
+                    self._fn()
+                except Exception as e:
+                    self._error = e
+        if self._ran_inline:
+            if self._error is not None:
+                raise self._error
+            return
+        self._future.result()
+
+    def __str__(self):
+        state = 'done' if self._ran_inline or self._future.done() else 'running'
+        return f"<thread {state}>"
+
+
+class Runtime:
+    """Bounded thread pool plus the table of named locks."""
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or DEFAULT_MAX_WORKERS
+        self._pool = None
+        self._guard = threading.Lock()
+        self._locks = {}
+        self._detached = []
+
+    def _executor(self):
+        with self._guard:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix='swiftlang')
+            return self._pool
+
+    def spawn(self, fn):
+        return ThreadHandle(self._executor().submit(fn), fn)
+
+    def start_detached(self, fn):
+        """Start a `thread { ... }` block; it is joined when the program ends."""
+        handle = self.spawn(fn)
+        with self._guard:
+            self._detached.append(handle)
+
+    def _named_lock(self, name):
+        with self._guard:
+            lock = self._locks.get(name)
+            if lock is None:
+                lock = self._locks[name] = threading.Lock()
+            return lock
+
+    def lock(self, name):
+        self._named_lock(name).acquire()
+
+    def unlock(self, name):
+        try:
+            self._named_lock(name).release()
+        except RuntimeError:
+            raise RuntimeError(f"unlock({name}) without a matching lock") from None
+
+    def shutdown(self):
+        """Wait for detached blocks, stop the pool and re-raise the first failure."""
+        error = None
+        while True:
+            with self._guard:
+                if not self._detached:
+                    break
+                handle = self._detached.pop(0)
+            try:
+                handle.join()
+            except Exception as e:
+                error = error or e
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        if error is not None:
+            raise error
@@ -0,0 +1,432 @@
+# src/debugger.py
+#
+# `main.py --debug file.sl`: line breakpoints, step / next / finish /
+# continue, variable inspection and watch expressions.
+#
+# A debugged program pays only for the breakpoints it has.  Setting a
+# breakpoint wraps the first statement on that line in a BreakpointStmt and
+# deleting it unwraps the statement again, so every other statement runs
+# through the ordinary `Interpreter.visit`.  Only while stepping is the
+# interpreter switched to StepInterpreter, whose `visit` looks at every
+# statement; `continue` switches it back.
+#
+# Programs are optimized and hot loops compiled as in a normal run.  A loop
+# that encloses a breakpoint, and every loop while stepping, is held in the
+# tree walker instead: it runs unoptimized, statement by statement, and a
+# compiled loop that becomes held goes on interpreted from its next
+# iteration.  The call stack is read off the Python stack when the program
+# stops, so calls cost nothing extra either.
+import argparse
+import copy
+import os
+import sys
+import threading
+from collections import Counter
+
+from .interpreter import Interpreter, describe_error
+from .optimizer import optimize
+from .parser import ASTNode, BlockStmt, FunDecl, ImportStmt, Parser, WhileStmt
+from .pipeline import PipelineError, parse_source, tokenize
+from .semantic_analyzer import SemanticAnalyzer, SemanticError
+from .values import format_value
+
+HELP = """\
+  break N | b N     stop at line N          delete N | d N   remove that breakpoint
+  step | s          stop at the next statement, entering calls
+  next | n          stop at the next statement in this function or its callers
+  finish | f        run until the current function returns
+  continue | c      run to the next breakpoint
+  print EXPR | p    evaluate EXPR here      vars | v         locals and globals
+  watch EXPR | w    show EXPR at every stop unwatch N        drop watch N
+  info | i          breakpoints and watches backtrace | bt   active calls
+  list | l          source around this line quit | q         stop the program"""
+
+LIST_CONTEXT = 3
+
+
+class BreakpointStmt(ASTNode):
+    """`stmt` with a breakpoint on its line."""
+    def __init__(self, stmt):
+        self.stmt = stmt
+        self.line = stmt.line
+
+
+# Statements that are never stopped at: blocks and hoisted declarations.
+NOT_BREAKABLE = (BlockStmt, FunDecl, ImportStmt, BreakpointStmt)
+
+
+class DebuggerQuit(Exception):
+    pass
+
+
+_CALL = Interpreter.call.__code__
+
+
+def running_calls():
+    """(Function, Python frame) of every call running on this thread, outermost first."""
+    calls = []
+    frame = sys._getframe(1)
+    while frame is not None:
+        if frame.f_code is _CALL:
+            calls.append((frame.f_locals['fn'], frame))
+        frame = frame.f_back
+    calls.reverse()
+    return calls
+
+
+def innermost_call(frame):
+    """Python frame of the innermost call running at `frame`, or None at the top level."""
+    while frame is not None and frame.f_code is not _CALL:
+        frame = frame.f_back
+    return frame
+
+
+class DebugInterpreter(Interpreter):
+    """Interpreter that reports breakpoints to its debugger and holds loops for it."""
+
+    def __init__(self, symbol_table, debugger=None, **kwargs):
+        super().__init__(symbol_table, **kwargs)
+        self.debugger = debugger
+        self.calls = []  # Functions being run at the latest stop, innermost last
+        self.outer_calls = []  # calls a spawned block was started from, on another thread
+        self.call_frames = []  # Python frames of this thread's calls at the latest stop
+
+    def visit_BreakpointStmt(self, node):
+        if self.debugger is not None:
+            self.debugger.stop(self, node.stmt)
+        # Straight to the statement: a stepping `visit` must not stop here twice.
+        return Interpreter.visit(self, node.stmt)
+
+    def visit_WhileStmt(self, node):
+        debugger = self.debugger
+        if debugger is None or not debugger.holds(node):
+            return Interpreter.visit_WhileStmt(self, node)
+        plan = node.plan
+        if plan is not None:
+            for invariant in plan.invariants:
+                invariant.cached = False
+        return self._while(node, False)
+
+    def compile_loop(self, node):
+        from .tiering import compile_loop
+        return compile_loop(node, self.debugger.holds if self.debugger is not None else None)
+
+    def _fork(self):
+        child = super()._fork()
+        child.outer_calls = self.outer_calls + [fn for fn, _ in running_calls()]
+        return child
+
+
+class StepInterpreter(DebugInterpreter):
+    """DebugInterpreter that asks its debugger before every statement."""
+
+    def visit(self, node):
+        if node.line is not None and not isinstance(node, NOT_BREAKABLE):
+            debugger = self.debugger
+            if debugger is not None and debugger.should_step(self):
+                debugger.stop(self, node)
+        return Interpreter.visit(self, node)
+
+
+def compile_for_debugging(source, path=None):
+    """Tokenize, parse, check and optimize `source`; return (ast, symbol_table)."""
+    ast = parse_source(source)
+    base_dir = os.path.dirname(os.path.abspath(path)) if path else None
+    try:
+        symbol_table = SemanticAnalyzer(base_dir=base_dir).analyze(ast)
+    except SemanticError as e:
+        raise PipelineError("Semantic Error", str(e)) from e
+    optimize(ast)
+    return ast, symbol_table
+
+
+def find_statement(node, line, loops=()):
+    """(container, key, stmt, enclosing loops) for the first statement on `line` under `node`.
+
+    Statements are searched in source order; the loops are outermost first.
+    """
+    for key, value in vars(node).items():
+        if isinstance(value, list):
+            items = enumerate(value)
+            container = value
+        elif isinstance(value, ASTNode):
+            items = [(key, value)]
+            container = node
+        else:
+            continue
+        for index, item in items:
+            if not isinstance(item, ASTNode):
+                continue
+            if item.line == line and not isinstance(item, NOT_BREAKABLE):
+                return container, index, item, loops
+            found = find_statement(item, line,
+                                   loops + (item,) if isinstance(item, WhileStmt) else loops)
+            if found is not None:
+                return found
+    return None
+
+
+def _replace(container, key, value):
+    if isinstance(container, list):
+        container[key] = value
+    else:
+        setattr(container, key, value)
+
+
+class Debugger:
+    def __init__(self, source, ast, symbol_table, read=input, out=None):
+        self.lines = source.splitlines()
+        self.ast = ast
+        self.symbol_table = symbol_table
+        self.read = read
+        self.out = out or sys.stdout
+        self.breakpoints = {}  # line -> ([(container, key)], BreakpointStmt, loops)
+        self.held_loops = Counter()  # loop -> breakpoints inside it
+        self.watches = []  # expression texts
+        # 'step', or ('next', top level allowed, Python frames of allowed calls)
+        self.mode = None
+        self.current_line = None  # line of the latest stop
+        self._lock = threading.RLock()  # one stopped thread at a time
+
+    def _print(self, text):
+        print(text, file=self.out)
+
+    # -- breakpoints ---------------------------------------------------------
+
+    def add_breakpoint(self, line):
+        if line in self.breakpoints:
+            return True
+        found = find_statement(self.ast, line)
+        if found is None:
+            return False
+        container, key, stmt, loops = found
+        wrapper = BreakpointStmt(stmt)
+        places = [(container, key)]
+        for loop in loops:
+            self.held_loops[loop] += 1
+            # A counted loop already running executes a copy of its body.
+            induction = loop.plan.induction if loop.plan is not None else None
+            if induction is not None and stmt in induction.body.stmts:
+                places.append((induction.body.stmts, induction.body.stmts.index(stmt)))
+        for container, key in places:
+            _replace(container, key, wrapper)
+        self.breakpoints[line] = (places, wrapper, loops)
+        return True
+
+    def remove_breakpoint(self, line):
+        entry = self.breakpoints.pop(line, None)
+        if entry is None:
+            return False
+        places, wrapper, loops = entry
+        for container, key in places:
+            _replace(container, key, wrapper.stmt)
+        self.held_loops.subtract(loops)
+        self.held_loops += Counter()  # drop the loops left at zero
+        return True
+
+    def holds(self, loop):
+        """Whether `loop` must run in the tree walker: it encloses a breakpoint, or we are stepping."""
+        return self.mode is not None or loop in self.held_loops
+
+    # -- stepping ------------------------------------------------------------
+
+    def should_step(self, interp):
+        mode = self.mode
+        if mode == 'step':
+            return True
+        if mode is None:
+            return False
+        _, top_level, frames = mode
+        frame = innermost_call(sys._getframe(1))
+        return top_level if frame is None else frame in frames
+
+    def _resume(self, interp, mode):
+        if mode is not None and mode != 'step':
+            # ('next', depth): stop in any call at most `depth` deep
+            depth = mode[1] - len(interp.outer_calls)
+            mode = ('next', depth >= 0, frozenset(interp.call_frames[:max(depth, 0)]))
+        interp.call_frames = []
+        self.mode = mode
+        interp.__class__ = DebugInterpreter if mode is None else StepInterpreter
+
+    def stop(self, interp, stmt):
+        """Report a stop at `stmt` and run debugger commands until execution resumes."""
+        with self._lock:
+            calls = running_calls()
+            interp.calls = interp.outer_calls + [fn for fn, _ in calls]
+            interp.call_frames = [frame for _, frame in calls]
+            self.current_line = stmt.line
+            self._print(f"Stopped at line {stmt.line}: {self.source_line(stmt.line)}")
+            self.show_watches(interp)
+            while True:
+                try:
+                    line = self.read('(sldb) ')
+                except EOFError:
+                    raise DebuggerQuit() from None
+                if self.command(interp, line.strip()):
+                    return
+
+    def command(self, interp, line):
+        """Run one debugger command; return True when execution should resume."""
+        name, _, arg = line.partition(' ')
+        arg = arg.strip()
+        if name in ('c', 'continue'):
+            self._resume(interp, None)
+            return True
+        if name in ('s', 'step'):
+            self._resume(interp, 'step')
+            return True
+        if name in ('n', 'next'):
+            self._resume(interp, ('next', len(interp.calls)))
+            return True
+        if name in ('f', 'finish'):
+            if not interp.calls:
+                self._print("Not inside a function.")
+                return False
+            self._resume(interp, ('next', len(interp.calls) - 1))
+            return True
+        if name in ('q', 'quit'):
+            raise DebuggerQuit()
+        if name in ('b', 'break', 'd', 'delete', 'unwatch'):
+            if not arg.isdigit():
+                self._print(f"Usage: {name} N")
+            elif name in ('b', 'break'):
+                if self.add_breakpoint(int(arg)):
+                    self._print(f"Breakpoint at line {arg}.")
+                else:
+                    self._print(f"No statement on line {arg}.")
+            elif name in ('d', 'delete'):
+                if not self.remove_breakpoint(int(arg)):
+                    self._print(f"No breakpoint at line {arg}.")
+            elif not 1 <= int(arg) <= len(self.watches):
+                self._print(f"No watch {arg}.")
+            else:
+                del self.watches[int(arg) - 1]
+        elif name in ('p', 'print'):
+            self._print(self.show(interp, arg))
+        elif name in ('w', 'watch'):
+            self.watches.append(arg)
+            self._print(f"{len(self.watches)}: {self.show(interp, arg)}")
+        elif name in ('v', 'vars'):
+            self.show_vars(interp)
+        elif name in ('i', 'info'):
+            lines = sorted(self.breakpoints)
+            self._print("Breakpoints: " + (", ".join(map(str, lines)) or "none"))
+            for i, text in enumerate(self.watches, 1):
+                self._print(f"Watch {i}: {text}")
+        elif name in ('bt', 'backtrace'):
+            for depth, fn in enumerate(reversed(interp.calls)):
+                self._print(f"  #{depth} {fn.name}({', '.join(fn.params)})")
+            self._print(f"  #{len(interp.calls)} <program>")
+        elif name in ('l', 'list'):
+            self.list_source(interp)
+        elif name in ('h', 'help'):
+            self._print(HELP)
+        elif name:
+            self._print(f"Unknown command '{name}'. Type 'help' for a list.")
+        return False
+
+    # -- inspection ----------------------------------------------------------
+
+    def source_line(self, line):
+        return self.lines[line - 1].strip() if 0 < line <= len(self.lines) else ''
+
+    def list_source(self, interp):
+        current = self.current_line
+        first = max(1, current - LIST_CONTEXT)
+        for number in range(first, min(len(self.lines), current + LIST_CONTEXT) + 1):
+            marker = '->' if number == current else 'B ' if number in self.breakpoints else '  '
+            self._print(f"{marker}{number:>4}  {self.lines[number - 1]}")
+
+    def evaluate(self, interp, text):
+        """Value of expression `text` in the stopped function's scope."""
+        parser = Parser(tokenize(text))
+        try:
+            expr = parser.parse_expr()
+        except (SyntaxError, IndexError, AttributeError) as e:
+            raise SyntaxError(str(e) or "invalid expression") from None
+        if parser._current() is not None:
+            raise SyntaxError(f"unexpected '{parser._current().value}'")
+        analyzer = SemanticAnalyzer()
+        analyzer.symbol_table = interp.env
+        if interp.calls:
+            locals_ = interp.calls[-1].locals or {}
+            analyzer.scope = {name: {'type': 'unknown', 'slot': slot}
+                              for name, slot in locals_.items()}
+        analyzer.visit(expr)
+        if analyzer.errors:
+            raise SemanticError("; ".join(analyzer.errors))
+        # A quiet copy: breakpoints inside functions called from `text` do not stop.
+        child = copy.copy(interp)
+        child.__class__, child.debugger = DebugInterpreter, None
+        return child.visit(expr)
+
+    def show(self, interp, text):
+        try:
+            return f"{text} = {format_value(self.evaluate(interp, text))}"
+        except Exception as e:
+            return f"{text}: error: {e}"
+
+    def show_watches(self, interp):
+        for i, text in enumerate(self.watches, 1):
+            self._print(f"  {i}: {self.show(interp, text)}")
+
+    def show_vars(self, interp):
+        if interp.calls:
+            fn = interp.calls[-1]
+            self._print(f"Locals of {fn.name}:")
+            for name, slot in sorted((fn.locals or {}).items(), key=lambda item: item[1]):
+                self._print(f"  {name} = {format_value(interp.frame[slot])}")
+        self._print("Globals:")
+        for name, entry in interp.env.items():
+            if entry['type'] != 'function':
+                self._print(f"  {name} = {format_value(entry['value'])}")
+
+    # -- running -------------------------------------------------------------
+
+    def run(self, stop_at_start=True):
+        """Run the program under the debugger; return True if it ran to the end."""
+        interp = DebugInterpreter(self.symbol_table, debugger=self)
+        if stop_at_start:
+            self._resume(interp, 'step')
+        try:
+            interp.interpret(self.ast)
+        except DebuggerQuit:
+            self._print("Program stopped.")
+            return False
+        except Exception as e:
+            self._print(f"Runtime Error:\n{describe_error(e)}")
+            return False
+        self._print("Program finished.")
+        return True
+
+
+def main(argv):
+    ap = argparse.ArgumentParser(prog='main.py --debug',
+                                 description='Run a SwiftLang program under the debugger.')
+    ap.add_argument('file', help='.sl program to debug')
+    ap.add_argument('-b', '--break', dest='breaks', type=int, action='append', default=[],
+                    metavar='LINE', help='set a breakpoint before starting (repeatable)')
+    ap.add_argument('--run', action='store_true',
+                    help='run to the first breakpoint instead of stopping at the first statement')
+    args = ap.parse_args(argv)
+
+    try:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            source = f.read()
+    except OSError as e:
+        print(f"Error reading file '{args.file}': {e}")
+        return 1
+    try:
+        ast, symbol_table = compile_for_debugging(source, args.file)
+    except PipelineError as e:
+        print(f"{e.label}:")
+        print(e)
+        return 1
+
+    debugger = Debugger(source, ast, symbol_table)
+    for line in args.breaks:
+        if not debugger.add_breakpoint(line):
+            print(f"No statement on line {line}.")
+    print("SwiftLang debugger. Type 'help' at the (sldb) prompt for commands.")
+    return 0 if debugger.run(stop_at_start=not args.run) else 1
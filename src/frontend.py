@@ -0,0 +1,88 @@
+# src/frontend.py
+#
+# Parallel tokenizing and parsing of very large single files.
+#
+# The source is cut into pieces at top-level statement boundaries: line
+# ends outside any bracket, string or block comment, after a `;` or `}`,
+# where the next line starts a new statement rather than an `else` or
+# `catch`.  A process pool tokenizes and parses every piece with its line
+# numbers shifted to where the piece sits in the file, and the statements
+# come back in order as one Program.  Semantic analysis then runs once over
+# the whole tree, so declarations are checked across pieces exactly as
+# before.  If any piece fails, the file is parsed again sequentially, so
+# errors are reported with the same wording and token positions as ever.
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+
+from .parser import Parser, Program
+from .pipeline import parse, tokenize
+from .tokenizer_analyzer import clean_source
+
+# Pieces per worker: enough to balance uneven statements, few enough that
+# the fixed cost of each task stays small.
+CHUNKS_PER_WORKER = 4
+
+# What can hide a line end or a bracket from the splitter.  Strings and
+# block comments are matched whole, as the tokenizer matches them.
+SCAN = re.compile(r'"(?:\\.|[^"\\])*"|/\*[\s\S]*?\*/|[{}()\[\]\n]')
+
+# A line that begins a new top-level statement.
+STATEMENT_START = re.compile(r'\s*(?!(?:else|catch|and|or|in)\b)[A-Za-z_]')
+
+
+def statement_boundaries(source):
+    """Line counts after which a new top-level statement of `source` starts, in order."""
+    lines, line_numbers = clean_source(source)
+    depth = 0
+    row = 0  # index into `lines` of the current position
+    for match in SCAN.finditer('\n'.join(lines)):
+        text = match.group()
+        if text == '\n':
+            if (depth == 0 and lines[row].rstrip().endswith((';', '}'))
+                    and STATEMENT_START.match(lines[row + 1])):
+                yield line_numbers[row]
+            row += 1
+        elif text in '{([':
+            depth += 1
+        elif text in '})]':
+            depth -= 1
+        else:
+            row += text.count('\n')
+
+
+def split_source(source, parts):
+    """About `parts` pieces of `source` as (lines before the piece, piece text)."""
+    lines = source.splitlines(keepends=True)
+    ends = list(accumulate(map(len, lines)))  # offset just past each line
+    size = max(1, len(source) // parts)
+    pieces, first, target = [], 0, size
+    for cut in statement_boundaries(source):
+        if ends[cut - 1] >= target:
+            pieces.append((first, ''.join(lines[first:cut])))
+            first, target = cut, ends[cut - 1] + size
+    pieces.append((first, ''.join(lines[first:])))
+    return pieces
+
+
+def parse_piece(piece):
+    """Statements of one piece, with lines counted from the start of the file; runs in pool workers."""
+    offset, text = piece
+    tokens = tokenize(text)
+    if offset:
+        for token in tokens:
+            token.line += offset
+    return Parser(tokens).parse_program().stmts
+
+
+def parse_parallel(source, workers):
+    """Program of `source`, tokenized and parsed by up to `workers` processes."""
+    pieces = split_source(source, workers * CHUNKS_PER_WORKER)
+    if len(pieces) < 2:
+        return parse(tokenize(source))
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pieces))) as pool:
+            results = list(pool.map(parse_piece, pieces))
+    except Exception:
+        return parse(tokenize(source))
+    return Program([stmt for stmts in results for stmt in stmts])
@@ -0,0 +1,299 @@
+# src/instrumentation.py
+#
+# Runtime metrics and tracing hooks.
+#
+# An EventBus carries six events: phase_start / phase_end around each
+# pipeline phase, statement and loop_iteration from the interpreter, output
+# for every line printed, and tier_up when a hot loop is compiled.  Nothing
+# in the plain pipeline knows about the bus: `instrument()` switches an
+# interpreter to a subclass that emits events only when someone has
+# subscribed to them, so a program run without subscribers executes exactly
+# the same code as before.  Tracing statements or loop iterations keeps
+# every loop in the tree walker, where each of them is seen.
+import json
+import os
+import socket
+import threading
+import time
+import tracemalloc
+
+from .interpreter import Interpreter, describe_error
+from .parser import ForStmt, WhileStmt, count_nodes, iter_children
+from .pipeline import PipelineError, analyze, parse, tokenize
+
+EVENTS = ('phase_start', 'phase_end', 'statement', 'loop_iteration', 'output', 'tier_up')
+
+
+class EventBus:
+    """Synchronous publish/subscribe: callbacks run as `callback(event, data)`."""
+
+    def __init__(self):
+        self._subscribers = {event: [] for event in EVENTS}
+
+    def subscribe(self, event, callback):
+        if event not in self._subscribers:
+            raise ValueError(f"unknown event {event!r}; expected one of {', '.join(EVENTS)}")
+        self._subscribers[event].append(callback)
+
+    def subscribe_all(self, callback):
+        for event in EVENTS:
+            self.subscribe(event, callback)
+
+    def unsubscribe(self, event, callback):
+        self._subscribers[event].remove(callback)
+
+    def has_subscribers(self, event):
+        return bool(self._subscribers[event])
+
+    def emit(self, event, **data):
+        for callback in self._subscribers[event]:
+            callback(event, data)
+
+
+def loop_bodies(ast):
+    """ids of the bodies of every `while` and `for` loop in `ast`."""
+    bodies, stack = set(), [ast]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (WhileStmt, ForStmt)):
+            bodies.add(id(node.body))
+            plan = getattr(node, 'plan', None)
+            if plan is not None and plan.induction is not None:
+                bodies.add(id(plan.induction.body))  # what a counted loop runs
+        stack.extend(iter_children(node))
+    return frozenset(bodies)
+
+
+_instrumented_classes = {}
+
+
+def _instrumented_class(base, trace_visits, trace_output, trace_tiers):
+    key = (base, trace_visits, trace_output, trace_tiers)
+    cls = _instrumented_classes.get(key)
+    if cls is not None:
+        return cls
+    namespace = {}
+    if trace_visits:
+        base_visit = base.visit
+
+        def visit(self, node):
+            bus = self.bus
+            kind = type(node).__name__
+            if kind.endswith('Stmt'):
+                bus.emit('statement', kind=kind)
+            if id(node) in self.loop_bodies:
+                bus.emit('loop_iteration')
+            return base_visit(self, node)
+
+        namespace['visit'] = visit
+    if trace_output:
+        base_write = base.write
+
+        def write(self, text):
+            base_write(self, text)
+            self.bus.emit('output', text=text)
+
+        namespace['write'] = write
+    if trace_tiers:
+        base_report = base.report_tier_up
+
+        def report_tier_up(self, event):
+            base_report(self, event)
+            self.bus.emit('tier_up', **event)
+
+        namespace['report_tier_up'] = report_tier_up
+    # A subclass (rather than per-instance overrides) so that interpreters
+    # forked for `spawn` blocks stay instrumented.
+    cls = _instrumented_classes[key] = type(f"Instrumented{base.__name__}", (base,), namespace)
+    return cls
+
+
+def instrument(interp, bus, ast):
+    """Emit `interp`'s events on `bus`; without subscribers `interp` is left as is."""
+    trace_statements = bus.has_subscribers('statement')
+    trace_loops = bus.has_subscribers('loop_iteration')
+    trace_output = bus.has_subscribers('output')
+    trace_tiers = bus.has_subscribers('tier_up')
+    if not (trace_statements or trace_loops or trace_output or trace_tiers):
+        return interp
+    interp.bus = bus
+    interp.loop_bodies = loop_bodies(ast) if trace_loops else frozenset()
+    if trace_statements or trace_loops:
+        interp.tier_threshold = None  # compiled loops would skip their events
+    interp.__class__ = _instrumented_class(type(interp), trace_statements or trace_loops,
+                                           trace_output, trace_tiers)
+    return interp
+
+
+def run_source(source, bus, interpreter_class=Interpreter, path=None):
+    """Run a program like `pipeline.run_source`, emitting events on `bus`."""
+    def phase(name, fn, *args, counter=None):
+        bus.emit('phase_start', phase=name)
+        start = time.perf_counter()
+        error = None
+        try:
+            result = fn(*args)
+        except PipelineError as e:
+            error = e.label
+            raise
+        finally:
+            data = {'phase': name, 'seconds': time.perf_counter() - start}
+            if error is not None:
+                data['error'] = error
+            elif counter is not None and bus.has_subscribers('phase_end'):
+                data.update(counter(result))
+            bus.emit('phase_end', **data)
+        return result
+
+    tokens = phase('tokenize', tokenize, source, counter=lambda t: {'tokens': len(t)})
+    ast = phase('parse', parse, tokens, counter=lambda a: {'nodes': count_nodes(a)})
+    base_dir = os.path.dirname(os.path.abspath(path)) if path else None
+    symbol_table = phase('analyze', analyze, ast, base_dir)
+
+    def execute():
+        interp = instrument(interpreter_class(symbol_table), bus, ast)
+        try:
+            interp.interpret(ast)
+        except Exception as e:
+            raise PipelineError("Runtime Error", describe_error(e)) from e
+
+    phase('execute', execute)
+
+
+class MetricsCollector:
+    """Counters over one run: sizes, phase times, statements, loops, output, memory.
+
+    Memory is traced only on request: `tracemalloc` slows every allocation,
+    so the phase times of a traced run are not comparable to untraced ones.
+    """
+
+    def __init__(self, bus, track_memory=False):
+        self.track_memory = track_memory
+        self.phases = {}
+        self.counts = {'tokens': 0, 'nodes': 0, 'statements': 0, 'loop_iterations': 0,
+                       'output_lines': 0, 'output_bytes': 0}
+        self.peak_memory = None
+        self._lock = threading.Lock()  # spawned blocks emit from worker threads
+        self._tracing = False
+        bus.subscribe('phase_start', self._phase_start)
+        bus.subscribe('phase_end', self._phase_end)
+        bus.subscribe('statement', self._statement)
+        bus.subscribe('loop_iteration', self._loop_iteration)
+        bus.subscribe('output', self._output)
+
+    def _phase_start(self, event, data):
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+
+    def _phase_end(self, event, data):
+        self.phases[data['phase']] = data['seconds']
+        for key in ('tokens', 'nodes'):
+            if key in data:
+                self.counts[key] = data[key]
+        if self._tracing and (data['phase'] == 'execute' or 'error' in data):
+            self.stop()
+
+    def _statement(self, event, data):
+        with self._lock:
+            self.counts['statements'] += 1
+
+    def _loop_iteration(self, event, data):
+        with self._lock:
+            self.counts['loop_iterations'] += 1
+
+    def _output(self, event, data):
+        with self._lock:
+            self.counts['output_lines'] += 1
+            self.counts['output_bytes'] += len(data['text'].encode('utf-8'))
+
+    def stop(self):
+        """Stop memory tracing (if this collector started it) and keep the peak."""
+        if self._tracing:
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            self._tracing = False
+
+    def summary(self):
+        execute = self.phases.get('execute')
+        return {
+            'phases': dict(self.phases),
+            **self.counts,
+            'peak_memory_bytes': self.peak_memory,
+            'memory_traced': self.track_memory,  # the times include tracemalloc's overhead
+            'statements_per_second': self.counts['statements'] / execute if execute else None,
+        }
+
+
+class JsonLinesExporter:
+    """Writes events, and finally a `metrics` record, as one JSON object per line."""
+
+    def __init__(self, bus, stream, events=('phase_start', 'phase_end')):
+        self.stream = stream
+        self._lock = threading.Lock()
+        for event in events:
+            bus.subscribe(event, self._write_event)
+
+    def write(self, record):
+        with self._lock:
+            self.stream.write(json.dumps(record) + "\n")
+            self.stream.flush()
+
+    def _write_event(self, event, data):
+        self.write({'event': event, 'time': time.time(), **data})
+
+
+def open_sink(target):
+    """Writable text stream for a metrics target.
+
+    `tcp://host:port` and `unix:///path/to/socket` connect to a local
+    listener; anything else is a file path, opened for appending.
+    """
+    if target.startswith('tcp://'):
+        host, _, port = target[len('tcp://'):].rpartition(':')
+        sock = socket.create_connection((host or 'localhost', int(port)))
+        return _SocketStream(sock)
+    if target.startswith('unix://'):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(target[len('unix://'):])
+        return _SocketStream(sock)
+    directory = os.path.dirname(os.path.abspath(target))
+    os.makedirs(directory, exist_ok=True)
+    return open(target, 'a', encoding='utf-8')
+
+
+class _SocketStream:
+    """Text stream over a connected socket; closing also closes the socket."""
+
+    def __init__(self, sock):
+        self._sock = sock
+        self._file = sock.makefile('w', encoding='utf-8')
+
+    def write(self, text):
+        return self._file.write(text)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+        self._sock.close()
+
+
+def run_with_metrics(source, target, path=None, track_memory=False):
+    """Run `source`, exporting phase events and a final metrics record to `target`."""
+    bus = EventBus()
+    collector = MetricsCollector(bus, track_memory)
+    stream = open_sink(target)
+    exporter = JsonLinesExporter(bus, stream)
+    status = 'ok'
+    try:
+        run_source(source, bus, path=path)
+    except PipelineError as e:
+        status = e.label
+        raise
+    finally:
+        collector.stop()
+        exporter.write({'event': 'metrics', 'time': time.time(), 'status': status,
+                        **collector.summary()})
+        stream.close()
@@ -1,12 +1,116 @@
 # interpreter.py
-from .parser import ASTNode
+import os
+import time
+
+from .parser import ASTNode, BinaryExpr, FunDecl, ImportStmt, iter_children
+from .operators import BINARY_OPS, SPECIALIZED
+from .stdlib import BUILTINS
+from .values import (Array, Function, Map, Module, Rope, format_value, index_get, index_set,
+                     iterate)
+
+# Statement visitors return None, or one of these signals to unwind
+# enclosing blocks.  The returned value travels in `Interpreter.return_value`.
+RETURN = 'return'
+BREAK = 'break'
+CONTINUE = 'continue'
+
+
+class Thrown(Exception):
+    """A value passed to `throw`, on its way to the nearest `catch`."""
+    def __init__(self, value, line=None):
+        super().__init__(f"Uncaught exception: {format_value(value)}")
+        self.value = value
+        self.line = line
+
+
+# What `catch` handles: thrown values and errors raised by the language's
+# operations.  Exceptions that control the interpreter itself pass through.
+CATCHABLE = (Thrown, ArithmeticError, LookupError, TypeError, ValueError, AttributeError,
+             RuntimeError)
+
+
+def locate(error, stmt):
+    """Record on `error` the line of the innermost statement it escaped from."""
+    if getattr(error, 'line', None) is None:
+        error.line = stmt.line
+
+
+def describe_error(error):
+    """Message of a runtime error, with its source line when known."""
+    line = getattr(error, 'line', None)
+    return str(error) if line is None else f"{error} (line {line})"
+
+
+# Result types a loop-invariant expression may reuse across iterations;
+# arrays and maps must be rebuilt each time, since each one is a new object.
+CACHEABLE = frozenset({int, float, bool, str, type(None), Rope})
+
+# A `while` loop is compiled by src/tiering.py once it has run this many
+# iterations.  SWIFTLANG_TIER_THRESHOLD=0 turns compilation off.
+TIER_THRESHOLD = int(os.environ.get('SWIFTLANG_TIER_THRESHOLD') or 1000) or None
+
+# A BinaryExpr site stops re-specializing after this many cache rewrites.
+MAX_IC_REWRITES = 4
+# Cache entry that never matches: the site runs the generic operator.
+UNCACHED = (None, None, None)
+
+
+def inline_cache_stats(ast):
+    """Hit/miss counters of every operator site in `ast`."""
+    stats = {'sites': 0, 'specialized': 0, 'generic': 0, 'hits': 0, 'misses': 0}
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, BinaryExpr) and node.ic is not None:
+            stats['sites'] += 1
+            stats['specialized' if node.ic is not UNCACHED else 'generic'] += 1
+            stats['hits'] += node.ic_hits
+            stats['misses'] += node.ic_misses
+        stack.extend(iter_children(node))
+    total = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / total if total else 0.0
+    return stats
+
+
+class TailCall:
+    """Result of `return f(...)`: the caller's frame is reused for the call."""
+    __slots__ = ('fn', 'args')
+
+    def __init__(self, fn, args):
+        self.fn = fn
+        self.args = args
+
 
 class Interpreter:
-    def __init__(self, symbol_table):
+    # `parallel for` loops shorter than this run in-process
+    parallel_threshold = 1000
+    # loop iterations before tier-up; None keeps every loop in the tree walker
+    tier_threshold = TIER_THRESHOLD
+
+    def __init__(self, symbol_table, max_workers=None, parallel_workers=None):
         self.env = symbol_table  # {name: {'type': str, 'value': any}}
+        self.max_workers = max_workers  # thread pool bound for spawn/thread
+        self.parallel_workers = parallel_workers  # process pool size for `parallel for`
+        self.runtime = None  # created on first spawn/thread/lock
+        self._process_runner = None  # created on first large `parallel for`
+        self.frame = None  # slot list of the running function call
+        self.return_value = None
+        self.modules = {}  # path -> Module instance for this run
+        self.tier_ups = []  # {'line', 'iterations', 'seconds'} of every loop compiled
 
     def interpret(self, ast):
-        self.visit(ast)
+        try:
+            self.visit(ast)
+        finally:
+            self.close()
+
+    def close(self):
+        """Wait for spawned blocks and release worker pools."""
+        runner, self._process_runner = self._process_runner, None
+        if runner is not None:
+            runner.shutdown()
+        if self.runtime is not None:
+            self.runtime.shutdown()
 
     def visit(self, node):
         method = f'visit_{type(node).__name__}'
@@ -23,56 +127,329 @@ class Interpreter:
         return None
 
     def visit_Program(self, node):
-        self.generic_visit(node)
+        try:
+            # Bind every import and function first so uses may precede them.
+            for stmt in node.stmts:
+                if isinstance(stmt, (FunDecl, ImportStmt)):
+                    self.visit(stmt)
+            for stmt in node.stmts:
+                if type(stmt) is not ImportStmt:
+                    self.visit(stmt)
+        except Exception as e:
+            locate(e, stmt)
+            raise
 
     def visit_DeclStmt(self, node):
         value = self.visit(node.expr)
-        self.env[node.name]['value'] = value
+        if node.slot is not None:
+            self.frame[node.slot] = value
+        else:
+            self.env[node.name]['value'] = value
 
     def visit_AssignStmt(self, node):
         value = self.visit(node.expr)
-        self.env[node.name]['value'] = value
+        if node.slot is not None:
+            self.frame[node.slot] = value
+        else:
+            self.env[node.name]['value'] = value
+
+    def visit_FunDecl(self, node):
+        self.env[node.name]['value'] = Function(node, self.env)
+
+    def visit_ImportStmt(self, node):
+        self.env[node.alias]['value'] = self.instantiate(node.module)
+
+    def instantiate(self, compiled):
+        """This run's instance of a compiled module; its top level runs on first import."""
+        module = self.modules.get(compiled.path)
+        if module is None:
+            module = self.modules[compiled.path] = Module(compiled.name, compiled.new_env())
+            saved_frame, saved_env = self.frame, self.env
+            self.frame, self.env = None, module.env
+            try:
+                self.visit(compiled.ast)
+            finally:
+                self.frame, self.env = saved_frame, saved_env
+        return module
+
+    def visit_ReturnStmt(self, node):
+        expr = node.expr
+        if expr is None:
+            value = None
+        elif node.tail_call and expr.builtin is None:
+            fn = self.visit(expr.callee)
+            args = [self.visit(arg) for arg in expr.args]
+            value = TailCall(fn, args) if type(fn) is Function else self.call(fn, args)
+        else:
+            value = self.visit(expr)
+        self.return_value = value
+        return RETURN
+
+    def visit_IndexAssignStmt(self, node):
+        container = self.visit(node.target)
+        index = self.visit(node.index)
+        index_set(container, index, self.visit(node.expr))
+
+    def visit_MemberAssignStmt(self, node):
+        target = self.visit(node.target)
+        if type(target) is not Map:
+            raise TypeError(f"cannot set field '{node.name}' on {target!r}")
+        target.set_field(node.name, self.visit(node.expr))
+
+    def visit_ExprStmt(self, node):
+        self.visit(node.expr)
 
     def visit_PrintStmt(self, node):
-        value = self.visit(node.expr)
-        print(value)
+        # One write per line so output from spawned blocks never interleaves mid-line.
+        self.write(f"{self.visit(node.expr)}\n")
+
+    def write(self, text):
+        print(text, end='')
 
     def visit_ReadStmt(self, node):
         value = input("Enter value: ")
         # Infer type from input (simplify: assume string)
-        self.env[node.name]['value'] = value
+        if node.slot is not None:
+            self.frame[node.slot] = value
+        else:
+            self.env[node.name]['value'] = value
 
     def visit_IfStmt(self, node):
         cond = self.visit(node.cond)
         if cond:
-            self.visit(node.then_body)
+            return self.visit(node.then_body)
         elif node.else_body:
-            self.visit(node.else_body)
+            return self.visit(node.else_body)
+
+    def visit_SwitchStmt(self, node):
+        index = self.select_case(node, self.visit(node.subject))
+        if index is None:
+            return None
+        signal = self.visit(node.clauses[index].body)
+        return None if signal is BREAK else signal
+
+    def select_case(self, node, subject):
+        """Index of the clause `subject` selects, or None."""
+        try:
+            hit = node.table.get(subject)
+        except TypeError:  # arrays and maps are never equal to a constant
+            hit = None
+        # Non-constant labels that come before the constant hit are tested first.
+        clauses = node.clauses
+        for index, position in node.dynamic:
+            if hit is not None and index >= hit:
+                break
+            if self.visit(clauses[index].labels[position]) == subject:
+                return index
+        return node.default if hit is None else hit
 
     def visit_WhileStmt(self, node):
-        while self.visit(node.cond):
-            self.visit(node.body)
+        plan = node.plan
+        if plan is not None:
+            for invariant in plan.invariants:
+                invariant.cached = False
+        if node.compiled is not None and self.tier_threshold is not None:
+            return node.compiled(self)
+        if plan is not None and plan.induction is not None:
+            return self._counted_while(node, plan.induction)
+        return self._while(node)
+
+    def _while(self, node, tiering=True):
+        # `budget` counts down the iterations left before the loop is
+        # compiled; it carries over from one run of the loop to the next.
+        threshold = self.tier_threshold if tiering else None
+        budget = -1 if threshold is None else threshold if node.budget is None else node.budget
+        try:
+            while self.visit(node.cond):
+                signal = self.visit(node.body)
+                if signal is not None and signal is not CONTINUE:
+                    if signal is BREAK:
+                        break
+                    return signal
+                budget -= 1
+                if not budget:
+                    compiled = self.tier_up(node)
+                    if compiled is not None:
+                        return compiled(self)
+        finally:
+            if threshold is not None:
+                node.budget = budget
+
+    def _counted_while(self, node, var):
+        # `while (i < n) { body; i = i + step; }` with `i` kept as a Python int.
+        if var.slot is not None:
+            store, key = self.frame, var.slot
+        else:
+            store, key = self.env[var.name], 'value'
+        i = store[key]
+        bound = self.visit(var.bound)
+        if type(i) is not int or type(bound) is not int:
+            return self._while(node)
+        test, step, body = var.test, var.step, var.body
+        threshold = self.tier_threshold
+        budget = -1 if threshold is None else threshold if node.budget is None else node.budget
+        try:
+            while test(i, bound):
+                store[key] = i
+                signal = self.visit(body)
+                if signal is not None:
+                    if signal is BREAK:
+                        return None
+                    if signal is CONTINUE:
+                        continue  # skips the increment, as in the loop as written
+                    return signal
+                i += step
+                budget -= 1
+                if not budget:
+                    compiled = self.tier_up(node)
+                    if compiled is not None:
+                        store[key] = i
+                        return compiled(self)
+            store[key] = i
+        finally:
+            if threshold is not None:
+                node.budget = budget
+
+    def tier_up(self, node):
+        """Compile hot loop `node`; return the compiled loop, or None if it cannot be compiled."""
+        start = time.perf_counter()
+        compiled = self.compile_loop(node)
+        if compiled is not None:
+            node.compiled = compiled
+            self.report_tier_up({'line': node.line, 'iterations': self.tier_threshold,
+                                 'seconds': time.perf_counter() - start})
+        return compiled
+
+    def compile_loop(self, node):
+        from .tiering import compile_loop
+        return compile_loop(node)
+
+    def report_tier_up(self, event):
+        self.tier_ups.append(event)
+
+    def visit_ForStmt(self, node):
+        values = iterate(self.visit(node.iterable))
+        body = node.body
+        # Bind the loop variable straight into its frame slot or env entry.
+        if node.slot is not None:
+            store, key = self.frame, node.slot
+        else:
+            store, key = self.env[node.var], 'value'
+        for value in values:
+            store[key] = value
+            signal = self.visit(body)
+            if signal is not None:
+                if signal is BREAK:
+                    break
+                if signal is CONTINUE:
+                    continue
+                return signal
+
+    def visit_TryStmt(self, node):
+        # The body's statements run right here rather than through
+        # visit_BlockStmt, so entering a `try` adds no dispatch either.
+        try:
+            for stmt in node.body.stmts:
+                signal = self.visit(stmt)
+                if signal is not None:
+                    return signal
+            return None
+        except Exception as e:
+            locate(e, stmt)
+            if not isinstance(e, CATCHABLE):
+                raise
+            self.bind_error(node, e)
+        return self.visit(node.handler)
+
+    def bind_error(self, node, error):
+        """Give `catch (name)` the thrown value, or the error's message."""
+        if node.name is None:
+            return
+        value = error.value if type(error) is Thrown else describe_error(error)
+        if node.slot is not None:
+            self.frame[node.slot] = value
+        else:
+            self.env[node.name]['value'] = value
+
+    def visit_ThrowStmt(self, node):
+        raise Thrown(self.visit(node.expr), node.line)
+
+    def visit_BreakStmt(self, node):
+        return BREAK
+
+    def visit_ContinueStmt(self, node):
+        return CONTINUE
+
+    def visit_ParallelForStmt(self, node):
+        from . import parallel
+        parallel.execute(self, node, self.visit(node.iterable))
+
+    def process_runner(self, workers):
+        if self._process_runner is None or self._process_runner.workers != workers:
+            from .parallel import ProcessRunner
+            if self._process_runner is not None:
+                self._process_runner.shutdown()
+            self._process_runner = ProcessRunner(workers)
+        return self._process_runner
+
+    def visit_CallExpr(self, node):
+        if node.builtin is not None:
+            return BUILTINS[node.builtin](*[self.visit(arg) for arg in node.args])
+        fn = self.visit(node.callee)
+        return self.call(fn, [self.visit(arg) for arg in node.args])
+
+    def call(self, fn, args):
+        if type(fn) is not Function:
+            raise TypeError(f"{fn!r} is not a function")
+        saved_frame, saved_env = self.frame, self.env
+        frame = None
+        try:
+            while True:
+                nargs, nslots = len(args), fn.nslots
+                if nargs != len(fn.params):
+                    raise TypeError(f"{fn.name}() expects {len(fn.params)} arguments, got {nargs}")
+                if frame is not None and len(frame) == nslots:
+                    # Tail call: recycle the finished frame instead of growing the stack.
+                    frame[:nargs] = args
+                    for i in range(nargs, nslots):
+                        frame[i] = None
+                else:
+                    frame = args + [None] * (nslots - nargs)
+                self.frame, self.env = frame, fn.env
+                if self.visit(fn.body) is not RETURN:
+                    return None
+                value, self.return_value = self.return_value, None
+                if type(value) is not TailCall:
+                    return value
+                fn, args = value.fn, value.args
+                if type(fn) is not Function:
+                    raise TypeError(f"{fn!r} is not a function")
+        finally:
+            self.frame, self.env = saved_frame, saved_env
 
     def visit_BinaryExpr(self, node):
         left = self.visit(node.left)
         right = self.visit(node.right)
-        ops = {
-            '+': lambda l, r: l + r,
-            '-': lambda l, r: l - r,
-            '*': lambda l, r: l * r,
-            '/': lambda l, r: l / r,
-            '%': lambda l, r: l % r,
-            '==': lambda l, r: l == r,
-            '!=': lambda l, r: l != r,
-            '<': lambda l, r: l < r,
-            '>':  lambda l, r: l > r,
-            'and': lambda l, r: l and r,
-            'or': lambda l, r: l or r,
-            '<=': lambda l, r: l <= r,
-            '>=': lambda l, r: l >= r,
-
-        }
-        return ops[node.op](left, right)
+        ic = node.ic
+        if ic is not None and type(left) is ic[0] and type(right) is ic[1]:
+            node.ic_hits += 1
+            return ic[2](left, right)
+        return self._binary_miss(node, left, right)
+
+    def _binary_miss(self, node, left, right):
+        # Quickening: a site that sees new operand types rewrites its cache to
+        # the specialized implementation for them, until it has been
+        # rewritten too often and settles on the generic operator.
+        if node.ic is not None:
+            node.ic_misses += 1
+        ic = UNCACHED
+        if node.ic_rewrites < MAX_IC_REWRITES:
+            fn = SPECIALIZED.get((node.op, type(left), type(right)))
+            if fn is not None:
+                ic = (type(left), type(right), fn)
+                node.ic_rewrites += 1
+        node.ic = ic
+        return BINARY_OPS[node.op](left, right)
 
     def visit_UnaryExpr(self, node):
         expr = self.visit(node.expr)
@@ -81,25 +458,97 @@ class Interpreter:
         elif node.op == 'not':
             return not expr
 
+    def visit_InvariantExpr(self, node):
+        if node.cached:
+            return node.value
+        value = self.visit(node.expr)
+        if type(value) in CACHEABLE:
+            node.value, node.cached = value, True
+        return value
+
     def visit_LiteralExpr(self, node):
-        if node.typ == 'integer':
-            return int(node.value)
-        elif node.typ == 'float':
-            return float(node.value)
-        elif node.typ == 'string':
-            return node.value.strip('"')
-        elif node.typ == 'boolean':
-            return node.value == 'true'
-        elif node.typ == 'null':
-            return None
+        return node.literal
+
+    def visit_ArrayExpr(self, node):
+        return Array([self.visit(element) for element in node.elements])
+
+    def visit_IndexExpr(self, node):
+        return index_get(self.visit(node.target), self.visit(node.index))
+
+    def visit_MapExpr(self, node):
+        return Map([(self.visit(key), self.visit(value)) for key, value in node.entries])
+
+    def visit_MemberExpr(self, node):
+        target = self.visit(node.target)
+        if type(target) is not Map:
+            if type(target) is Module:
+                return target.get(node.name)
+            raise TypeError(f"value {target!r} has no field '{node.name}'")
+        shape = target.shape
+        cached_shape, cached_slot = node.cache
+        if shape is cached_shape:
+            return target.slots[cached_slot]
+        slot = shape.index.get(node.name)
+        if slot is None:
+            return target.get(node.name)  # dictionary mode, or a missing key
+        node.cache = (shape, slot)
+        return target.slots[slot]
 
     def visit_VarExpr(self, node):
+        if node.slot is not None:
+            return self.frame[node.slot]
         return self.env[node.name]['value']
     
     def visit_BlockStmt(self, node):
-        for stmt in node.stmts:
-            self.visit(stmt)
+        # The handler only runs while an error unwinds: a `try` whose body
+        # does not raise costs nothing on Python 3.11+.
+        try:
+            for stmt in node.stmts:
+                signal = self.visit(stmt)
+                if signal is not None:
+                    return signal
+        except Exception as e:
+            locate(e, stmt)
+            raise
+
+
+    def _runtime(self):
+        if self.runtime is None:
+            from .concurrency import Runtime
+            self.runtime = Runtime(self.max_workers)
+        return self.runtime
+
+    def _fork(self):
+        """Interpreter for a spawned block: same env and runtime, own frame and call state."""
+        import copy
+        child = copy.copy(self)
+        child.return_value = None
+        # The block gets a copy of the function's frame: its own `let`s must
+        # not collide with other blocks', and a tail call may recycle the
+        # caller's frame while the block still runs.
+        if self.frame is not None:
+            child.frame = list(self.frame)
+        return child
+
+    def visit_SpawnExpr(self, node):
+        child = self._fork()
+        return self._runtime().spawn(lambda: child.visit(node.body))
+
+    def visit_ThreadStmt(self, node):
+        child = self._fork()
+        self._runtime().start_detached(lambda: child.visit(node.body))
+
+    def visit_JoinStmt(self, node):
+        handle = self.visit(node.expr)
+        if not hasattr(handle, 'join'):
+            raise TypeError(f"join() expects a spawned thread, got {handle!r}")
+        handle.join()
+
+    def visit_LockStmt(self, node):
+        self._runtime().lock(node.name)
 
+    def visit_UnlockStmt(self, node):
+        self._runtime().unlock(node.name)
 
     # Add infer_type if needed (from semantic analyzer)
 
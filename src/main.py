@@ -1,23 +1,49 @@
 # src/main.py
 import sys
 import os
-from .parser import Parser, Program
-from .interpreter import Interpreter
-from .semantic_analyzer import SemanticAnalyzer, SemanticError
-from .tokenizer_analyzer import SwiftLangAnalyzer
 
 def print_usage():
     print("Usage: python main.py <source_file.sl>")
+    print("       python main.py --batch [--workers N] [--manifest FILE] <file.sl> ...")
+    print("       python main.py --bench N [--format text|json] [--output FILE] <file.sl>")
+    print("       python main.py --metrics FILE|tcp://HOST:PORT|unix://PATH [--memory] <file.sl>")
+    print("       python main.py --repl")
+    print("       python main.py --debug [--break LINE] [--run] <file.sl>")
+    print("       python main.py --checkpoint [--snapshot FILE] [--every SECONDS] <file.sl>")
     print("Example: python main.py examples/currentlyImplemented.sl")
     print("         python main.py myprogram.sl")
 
 def main():
-    if len(sys.argv) != 2:
+    if len(sys.argv) > 1 and sys.argv[1] == '--batch':
+        from . import batch
+        sys.exit(batch.main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == '--repl':
+        from . import repl
+        sys.exit(repl.main())
+    if len(sys.argv) > 1 and sys.argv[1] == '--debug':
+        from . import debugger
+        sys.exit(debugger.main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == '--checkpoint':
+        from . import checkpoint
+        sys.exit(checkpoint.main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == '--bench':
+        from . import bench
+        sys.exit(bench.main(sys.argv[2:]))
+
+    args = sys.argv[1:]
+    metrics_target = None
+    track_memory = False
+    if len(args) >= 2 and args[0] == '--metrics':
+        metrics_target, args = args[1], args[2:]
+        if args and args[0] == '--memory':
+            track_memory, args = True, args[1:]
+
+    if len(args) != 1:
         print("Error: No source file provided.")
         print_usage()
         sys.exit(1)
 
-    filepath = sys.argv[1]
+    filepath = args[0]
 
     if not os.path.exists(filepath):
         print(f"Error: File '{filepath}' not found.")
@@ -36,47 +62,19 @@ def main():
         print(f"Error reading file '{filepath}': {e}")
         sys.exit(1)
 
-    # 1. Tokenize
-    tokenizer = SwiftLangAnalyzer()
-    tokenizer.analyze(source)
-    tokens = tokenizer.get_tokens()
-
-    # Optional: Print tokens for debugging
-    # for t in tokens:
-    #     print(t.kind, t.value)
-
-    # 2. Parse
-    try:
-        parser = Parser(tokens)
-        ast: Program = parser.parse_program()
-    except SyntaxError as e:
-        print("Syntax Error:")
-        print(e)
-        sys.exit(1)
-    except Exception as e:
-        print("Parsing Error:")
-        print(e)
-        sys.exit(1)
-
-    # 3. Semantic Analysis
-    try:
-        semantic_analyzer = SemanticAnalyzer()
-        symbol_table = semantic_analyzer.analyze(ast)
-    except SemanticError as e:
-        print("Semantic Error:")
-        print(e)
-        sys.exit(1)
-    except Exception as e:
-        print("Semantic Analysis Error:")
-        print(e)
-        sys.exit(1)
+    # Imported here so usage errors and --batch never load the phases.
+    from .pipeline import PipelineError, compile_source, execute
 
-    # 4. Interpret
+    # compile_source tokenizes, parses and checks; execute interprets.
     try:
-        interpreter = Interpreter(symbol_table)
-        interpreter.interpret(ast)
-    except Exception as e:
-        print("Runtime Error:")
+        if metrics_target:
+            from .instrumentation import run_with_metrics
+            run_with_metrics(source, metrics_target, filepath, track_memory)
+        else:
+            ast, symbol_table = compile_source(source, filepath)
+            execute(ast, symbol_table)
+    except PipelineError as e:
+        print(f"{e.label}:")
         print(e)
         sys.exit(1)
 
@@ -84,4 +82,4 @@ def main():
     print("Program finished successfully.")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,178 @@
+# src/modules.py
+#
+# `import name;`: finding module files, compiling each one once per process,
+# and parsing independent imports in parallel.
+#
+# Module `a.b` is the file a/b.sl, looked up in the importing file's
+# directory and then in each directory listed in SWIFTLANG_PATH.  A compiled
+# module (its optimized AST and the symbol table its own SemanticAnalyzer
+# built) is cached by absolute path together with the file's mtime and size, so
+# programs that share a helper module pay for tokenizing, parsing and
+# checking it once per process; it is recompiled only when the file, or a
+# module it imports, changes.  The cache holds no runtime state: every
+# interpreter creates its own instance of each module it imports.
+import os
+
+from .pipeline import PipelineError, parse, tokenize
+
+MODULE_SUFFIX = '.sl'
+PATH_VARIABLE = 'SWIFTLANG_PATH'
+
+
+class ModuleError(Exception):
+    pass
+
+
+class CompiledModule:
+    """A checked module: AST, global symbol table and the files it depends on."""
+    __slots__ = ('name', 'path', 'ast', 'symbol_table', 'stamp', 'imports')
+
+    def __init__(self, name, path, ast, symbol_table, stamp, imports):
+        self.name = name
+        self.path = path
+        self.ast = ast
+        self.symbol_table = symbol_table
+        self.stamp = stamp
+        self.imports = imports  # paths of the modules this one imports
+
+    def new_env(self):
+        """Fresh globals for one instance of the module."""
+        return {name: {'type': entry['type'], 'value': None}
+                for name, entry in self.symbol_table.items()}
+
+
+_compiled = {}  # absolute path -> CompiledModule
+
+
+def clear_cache():
+    _compiled.clear()
+
+
+def search_path():
+    """Directories from SWIFTLANG_PATH, in order."""
+    return [d for d in os.environ.get(PATH_VARIABLE, '').split(os.pathsep) if d]
+
+
+def file_stamp(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def parse_file(path):
+    """(stamp, ast, error) for a module file; also runs in pool workers."""
+    try:
+        # Stamp first: a write racing with the read forces a recompile later.
+        stamp = file_stamp(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        return stamp, parse(tokenize(source)), None
+    except PipelineError as e:
+        return None, None, f"{e.label}: {e}"
+    except OSError as e:
+        return None, None, f"Read Error: {e}"
+
+
+def import_nodes(ast):
+    from .parser import ImportStmt
+    return [stmt for stmt in ast.stmts if isinstance(stmt, ImportStmt)]
+
+
+class ModuleLoader:
+    """Resolves and compiles the modules one program imports."""
+
+    def __init__(self, base_dir=None, path=None, workers=None):
+        self.base_dir = base_dir or os.getcwd()
+        self.path = list(path) if path is not None else search_path()
+        self.workers = workers  # parse pool size; default CPU count
+        self.parsed = {}  # path -> parse_file result, filled ahead by preload
+        self.loading = []  # (name, path) of modules being checked, outermost first
+
+    def resolve(self, name, base_dir=None):
+        """Absolute path of module `name` imported from a file in `base_dir`."""
+        relative = os.path.join(*name.split('.')) + MODULE_SUFFIX
+        dirs = [base_dir or self.base_dir] + self.path
+        for directory in dirs:
+            candidate = os.path.join(directory, relative)
+            if os.path.isfile(candidate):
+                return os.path.abspath(candidate)
+        raise ModuleError(f"Module '{name}' not found (searched {', '.join(dirs)})")
+
+    def is_fresh(self, path):
+        """True if the cached compile of `path` and of everything it imports is current."""
+        module = _compiled.get(path)
+        try:
+            if module is None or module.stamp != file_stamp(path):
+                return False
+        except OSError:
+            return False
+        return all(self.is_fresh(dep) for dep in module.imports)
+
+    def preload(self, nodes, base_dir=None):
+        """Parse every stale module reachable from the ImportStmts `nodes`.
+
+        Works through the import graph a level at a time; the files of one
+        level do not depend on each other and are parsed in parallel.
+        """
+        seen = set(self.parsed)
+        frontier = [(node.name, base_dir) for node in nodes]
+        while frontier:
+            paths = []
+            for name, directory in frontier:
+                try:
+                    path = self.resolve(name, directory)
+                except ModuleError:
+                    continue  # reported when the importer is checked
+                if path not in seen:
+                    seen.add(path)
+                    paths.append(path)
+            stale = [p for p in paths if not self.is_fresh(p)]
+            self.parsed.update(zip(stale, self._parse_all(stale)))
+            frontier = []
+            for path in stale:
+                ast = self.parsed[path][1]
+                if ast is not None:
+                    directory = os.path.dirname(path)
+                    frontier.extend((node.name, directory) for node in import_nodes(ast))
+
+    def _parse_all(self, paths):
+        workers = min(len(paths), self.workers or os.cpu_count() or 1)
+        if workers < 2:
+            return [parse_file(path) for path in paths]
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(parse_file, paths))
+
+    def load(self, name, base_dir=None):
+        """CompiledModule for `name`, compiling it unless the cached copy is current."""
+        from .optimizer import optimize
+        from .semantic_analyzer import SemanticAnalyzer, SemanticError
+
+        path = self.resolve(name, base_dir)
+        if self.is_fresh(path):
+            return _compiled[path]
+        if any(p == path for _, p in self.loading):
+            chain = [n for n, _ in self.loading] + [name]
+            raise ModuleError(f"Circular import: {' -> '.join(chain)}")
+
+        parsed = self.parsed.pop(path, None)
+        try:
+            if parsed is None or parsed[0] != file_stamp(path):
+                parsed = parse_file(path)
+        except OSError:
+            parsed = parse_file(path)
+        stamp, ast, error = parsed
+        if error is not None:
+            raise ModuleError(f"In module '{name}' ({path}): {error}")
+
+        analyzer = SemanticAnalyzer(loader=self, base_dir=os.path.dirname(path))
+        self.loading.append((name, path))
+        try:
+            symbol_table = analyzer.analyze(ast)
+        except SemanticError as e:
+            raise ModuleError(f"In module '{name}' ({path}): {e}") from None
+        finally:
+            self.loading.pop()
+        optimize(ast, shared=True)
+        imports = [node.module.path for node in import_nodes(ast)]
+        module = _compiled[path] = CompiledModule(name, path, ast, symbol_table, stamp, imports)
+        return module
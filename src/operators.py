@@ -0,0 +1,50 @@
+# src/operators.py
+"""Binary operator implementations and their type-specialized variants."""
+import operator
+
+from .values import Rope, add, concat
+
+
+def _and(l, r):
+    return l and r
+
+
+def _or(l, r):
+    return l or r
+
+
+# Generic implementation of every binary operator, used for any operand types.
+BINARY_OPS = {
+    '+': add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '%': operator.mod,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+    'and': _and,
+    'or': _or,
+}
+
+ARITHMETIC = ('+', '-', '*', '/', '%')
+COMPARISON = ('==', '!=', '<', '>', '<=', '>=')
+
+# (op, left type, right type) -> implementation valid while both operand
+# types match exactly.  Only pairs listed here are worth a guarded fast path.
+SPECIALIZED = {}
+for _op in ARITHMETIC + COMPARISON:
+    for _pair in ((int, int), (float, float), (int, float), (float, int)):
+        SPECIALIZED[(_op,) + _pair] = operator.add if _op == '+' else BINARY_OPS[_op]
+for _op in COMPARISON:
+    SPECIALIZED[(_op, str, str)] = BINARY_OPS[_op]
+SPECIALIZED[('+', str, str)] = concat
+SPECIALIZED[('+', Rope, str)] = Rope.append
+SPECIALIZED[('+', Rope, Rope)] = Rope.append
+SPECIALIZED[('+', str, Rope)] = Rope.of
+for _op in ('==', '!=', 'and', 'or'):
+    SPECIALIZED[(_op, bool, bool)] = BINARY_OPS[_op]
+del _op, _pair
@@ -0,0 +1,212 @@
+# src/optimizer.py
+#
+# Loop optimizations on a checked AST.
+#
+# For every `while` loop the pass collects the variables the loop can
+# assign.  A variable is loop-invariant when the loop never assigns it; a
+# global also needs the loop to make no calls to user functions, which could
+# assign it behind the loop's back.
+#
+# - Invariant hoisting: operator expressions built only from literals and
+#   invariant variables are wrapped in an InvariantExpr.  Its value is
+#   computed the first time the loop needs it and reused until the loop is
+#   entered again.  Evaluation stays lazy, so a loop that never runs, or an
+#   `if` branch that is never taken, raises no errors it would not have raised
+#   before.  Only immutable results are kept: an expression that produces an
+#   array or a map is evaluated afresh every time.  Loops that call user
+#   functions are not hoisted, because recursion could re-enter the loop while
+#   an outer activation still relies on the cached values.
+# - Induction variables: `while (i < n) { ...; i = i + k; }`, where the last
+#   statement of the body is the only assignment to `i`, `k` is an integer
+#   literal and `n` is invariant, is recorded as an InductionVar.  The
+#   interpreter then keeps `i` in a Python int and compares it with `n`
+#   natively, bypassing operator dispatch.  It writes `i` back before every
+#   iteration.  A runtime guard falls back to the ordinary loop unless both
+#   `i` and `n` are ints when the loop starts.
+#
+# Programs that use `spawn` or `thread` are left alone, since another thread
+# may assign any variable while a loop runs.  A module's tree is compiled
+# once and shared by every program that imports it, any of which may call
+# into it from several threads at once, so a shared tree gets neither
+# hoisting (the cached values live on the tree) nor plans that rely on a
+# global staying put; induction variables in frame slots are still kept.
+import operator
+from collections import Counter
+
+from .parser import (ASTNode, AssignStmt, BinaryExpr, BlockStmt, CallExpr, DeclStmt, ForStmt,
+                     InvariantExpr, LiteralExpr, ParallelForStmt, ReadStmt, SpawnExpr,
+                     ThreadStmt, TryStmt, UnaryExpr, VarExpr, WhileStmt, iter_children)
+
+# Comparison of the induction variable (on the left) with its bound.
+TESTS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+         '!=': operator.ne}
+# `n > i` is `i < n`.
+SWAPPED = {'<': '>', '>': '<', '<=': '>=', '>=': '<=', '!=': '!='}
+
+
+class LoopPlan:
+    """What the optimizer found for one `while` loop (`WhileStmt.plan`)."""
+    __slots__ = ('invariants', 'induction')
+
+    def __init__(self, invariants, induction):
+        self.invariants = invariants  # InvariantExprs to reset on loop entry
+        self.induction = induction    # InductionVar or None
+
+
+class InductionVar:
+    """`while (name <test> bound) { body; name = name + step; }`."""
+    __slots__ = ('name', 'slot', 'test', 'bound', 'step', 'body')
+
+    def __init__(self, name, slot, test, bound, step, body):
+        self.name = name
+        self.slot = slot
+        self.test = test
+        self.bound = bound  # invariant expression, evaluated once per loop entry
+        self.step = step
+        self.body = body  # the loop body without its final increment
+
+
+def walk(node):
+    """Nodes of the tree rooted at `node`, parents before their children."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(iter_children(node))
+
+
+def assigned_names(nodes):
+    """Counter of the variable names the statements in `nodes` assign."""
+    names = Counter()
+    for node in nodes:
+        if isinstance(node, (AssignStmt, DeclStmt, ReadStmt)):
+            names[node.name] += 1
+        elif isinstance(node, ForStmt):
+            names[node.var] += 1
+        elif isinstance(node, TryStmt) and node.name is not None:
+            names[node.name] += 1
+        elif isinstance(node, ParallelForStmt):
+            names[node.var] += 1
+            names.update(name for _, name in node.reductions)
+    return names
+
+
+def optimize(ast, shared=False):
+    """Annotate the `while` loops of a checked tree; return how many were optimized.
+
+    `shared` is for a tree that may run on several threads at once.
+    """
+    if any(isinstance(node, (SpawnExpr, ThreadStmt)) for node in walk(ast)):
+        return 0
+    optimized = 0
+    # Outer loops come first, so an expression invariant in a whole loop nest
+    # is cached once for the outermost loop it is invariant in.
+    for node in walk(ast):
+        if isinstance(node, WhileStmt) and node.plan is None:
+            node.plan = plan_loop(node, shared)
+            if node.plan is not None:
+                optimized += 1
+    return optimized
+
+
+def plan_loop(node, shared=False):
+    nodes = list(walk(node.cond)) + list(walk(node.body))
+    assigned = assigned_names(nodes)
+    # Another thread running the same tree acts like a call: it may assign
+    # globals and re-enter the loop.
+    calls = shared or any(isinstance(n, CallExpr) and n.builtin is None for n in nodes)
+
+    def invariant(expr):
+        if isinstance(expr, (LiteralExpr, InvariantExpr)):
+            return True
+        if isinstance(expr, VarExpr):
+            return expr.name not in assigned and (expr.slot is not None or not calls)
+        if isinstance(expr, BinaryExpr):
+            return invariant(expr.left) and invariant(expr.right)
+        if isinstance(expr, UnaryExpr):
+            return invariant(expr.expr)
+        return False
+
+    invariants = [] if calls else hoist(node, invariant)
+    induction = induction_var(node, assigned, calls, invariant)
+    if not invariants and induction is None:
+        return None
+    return LoopPlan(invariants, induction)
+
+
+def hoist(loop, invariant):
+    """Wrap the largest invariant operator expressions under `loop`; return the wrappers."""
+    wrapped = []
+
+    def wrap(expr):
+        if isinstance(expr, (BinaryExpr, UnaryExpr)) and invariant(expr):
+            wrapper = InvariantExpr(expr)
+            wrapped.append(wrapper)
+            return wrapper
+        return None
+
+    stack = [loop]
+    while stack:
+        node = stack.pop()
+        for field, value in vars(node).items():
+            if isinstance(value, list):
+                for i, item in enumerate(value):
+                    if isinstance(item, tuple):  # MapExpr entries
+                        item = value[i] = tuple(wrap(x) or x for x in item)
+                        stack.extend(x for x in item
+                                     if isinstance(x, ASTNode) and not isinstance(x, InvariantExpr))
+                        continue
+                    replacement = wrap(item)
+                    if replacement is not None:
+                        value[i] = replacement
+                    elif isinstance(item, ASTNode):
+                        stack.append(item)
+            elif isinstance(value, ASTNode) and not isinstance(value, InvariantExpr):
+                replacement = wrap(value)
+                if replacement is not None:
+                    setattr(node, field, replacement)
+                else:
+                    stack.append(value)
+    return wrapped
+
+
+def induction_var(node, assigned, calls, invariant):
+    body = node.body
+    if not isinstance(body, BlockStmt) or not body.stmts:
+        return None
+    update = body.stmts[-1]
+    if not isinstance(update, AssignStmt) or assigned[update.name] != 1:
+        return None
+    name = update.name
+    if update.slot is None and calls:
+        return None
+    step = constant_step(update.expr, name)
+    cond = node.cond
+    if step is None or not isinstance(cond, BinaryExpr) or cond.op not in SWAPPED:
+        return None
+    if is_var(cond.left, name) and not is_var(cond.right, name) and invariant(cond.right):
+        op, bound = cond.op, cond.right
+    elif is_var(cond.right, name) and not is_var(cond.left, name) and invariant(cond.left):
+        op, bound = SWAPPED[cond.op], cond.left
+    else:
+        return None
+    return InductionVar(name, update.slot, TESTS[op], bound, step, BlockStmt(body.stmts[:-1]))
+
+
+def is_var(expr, name):
+    return isinstance(expr, VarExpr) and expr.name == name
+
+
+def constant_step(expr, name):
+    """k for `name + k`, `k + name` or `name - k` with an integer literal k != 0."""
+    if not isinstance(expr, BinaryExpr) or expr.op not in ('+', '-'):
+        return None
+    left, right = expr.left, expr.right
+    if expr.op == '+' and is_var(right, name):
+        left, right = right, left
+    if not (is_var(left, name) and isinstance(right, LiteralExpr)):
+        return None
+    step = right.literal
+    if type(step) is not int or step == 0:
+        return None
+    return step if expr.op == '+' else -step
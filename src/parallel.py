@@ -0,0 +1,119 @@
+# src/parallel.py
+#
+# Data-parallel execution of `parallel for` loops.
+#
+# The iterations are split into chunks and every chunk runs against its own
+# copy of the environment, so writes to ordinary variables inside the body
+# stay private to the chunk and are discarded.  Only reduction variables
+# flow back: each iteration starts with the variable reset (0, 1 or "" for
+# sum, product and concat, null for min and max), the value left at the end
+# of the iteration is that iteration's result, and results are folded in
+# iteration order into the variable's value from before the loop.
+import contextlib
+import io
+import operator
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from .values import add, iterate
+
+# Chunks per worker: enough to balance uneven iterations, few enough that
+# shipping the body and environment to each task stays cheap.
+CHUNKS_PER_WORKER = 4
+
+IDENTITY = {'sum': 0, 'product': 1, 'concat': '', 'min': None, 'max': None}
+
+COMBINE = {
+    'sum': operator.add,
+    'product': operator.mul,
+    'concat': add,
+    'min': min,
+    'max': max,
+}
+
+
+def fold(op, acc, value):
+    """Combine `value` into `acc`; min and max ignore null on either side."""
+    if op in ('min', 'max'):
+        if value is None:
+            return acc
+        if acc is None:
+            return value
+    return COMBINE[op](acc, value)
+
+
+def run_chunk(payload, items, capture=True):
+    """Run the loop body for `items`; return ([(seen, partial), ...], output)."""
+    from .interpreter import Interpreter
+
+    body, var, env_bytes, reductions = payload
+    env = pickle.loads(env_bytes)
+    interp = Interpreter(env)
+    loop_entry = env[var]
+    entries = [(op, env[name]) for op, name in reductions]
+    partials = [(False, None)] * len(entries)
+
+    out = io.StringIO() if capture else None
+    with contextlib.redirect_stdout(out) if capture else contextlib.nullcontext():
+        try:
+            for item in items:
+                loop_entry['value'] = item
+                for op, entry in entries:
+                    entry['value'] = IDENTITY[op]
+                interp.visit(body)
+                for k, (op, entry) in enumerate(entries):
+                    seen, acc = partials[k]
+                    partials[k] = (True, fold(op, acc, entry['value']) if seen else entry['value'])
+        finally:
+            interp.close()
+    return partials, out.getvalue() if capture else ''
+
+
+def split(items, parts):
+    size = max(1, -(-len(items) // parts))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class ProcessRunner:
+    """Process pool shared by all `parallel for` loops of one interpreter."""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self._pool = ProcessPoolExecutor(max_workers=workers)
+
+    def map(self, payload, chunks):
+        return list(self._pool.map(run_chunk, repeat(payload), chunks))
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+def execute(interp, node, iterable):
+    items = iterable if isinstance(iterable, range) else list(iterate(iterable))
+    try:
+        env_bytes = pickle.dumps(interp.env)
+    except Exception as e:
+        raise TypeError(f"parallel for cannot copy the environment: {e}") from None
+    payload = (node.body, node.var, env_bytes, node.reductions)
+
+    workers = interp.parallel_workers or os.cpu_count() or 1
+    if workers <= 1 or len(items) < interp.parallel_threshold:
+        results = [run_chunk(payload, items, capture=False)]
+    else:
+        runner = interp.process_runner(workers)
+        results = runner.map(payload, split(items, workers * CHUNKS_PER_WORKER))
+        for _, output in results:
+            if output:
+                sys.stdout.write(output)
+
+    for k, (op, name) in enumerate(node.reductions):
+        entry = interp.env[name]
+        value = entry['value']
+        for partials, _ in results:
+            seen, partial = partials[k]
+            if seen:
+                value = fold(op, value, partial)
+        entry['value'] = value
@@ -1,15 +1,42 @@
 # parser.py (or extend symbol_table_generator.py)
-from .tokenizer_analyzer import RESERVED_WORDS
+from .tokenizer_analyzer import RESERVED_WORDS, decode_literal
 
 # AST Node Classes
 class ASTNode:
-    pass
+    line = None  # source line, recorded on statements by the parser
+
+
+def iter_children(node):
+    """Child nodes of `node` in field order (including (key, value) entry pairs)."""
+    for value in vars(node).values():
+        if isinstance(value, ASTNode):
+            yield value
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                if isinstance(item, ASTNode):
+                    yield item
+                elif isinstance(item, tuple):
+                    yield from (x for x in item if isinstance(x, ASTNode))
+
+
+def count_nodes(ast):
+    """Number of nodes in the tree rooted at `ast`."""
+    count, stack = 0, [ast]
+    while stack:
+        count += 1
+        stack.extend(iter_children(stack.pop()))
+    return count
 
 class BinaryExpr(ASTNode):
     def __init__(self, left, op, right):
         self.left = left
         self.op = op
         self.right = right
+        # Inline cache filled by the interpreter: (left type, right type, fn)
+        self.ic = None
+        self.ic_hits = 0
+        self.ic_misses = 0
+        self.ic_rewrites = 0
 
 class UnaryExpr(ASTNode):
     def __init__(self, op, expr):
@@ -17,23 +44,77 @@ class UnaryExpr(ASTNode):
         self.expr = expr
 
 class LiteralExpr(ASTNode):
-    def __init__(self, value, typ):
-        self.value = value
+    def __init__(self, value, typ, literal=None):
+        self.value = value  # source text
         self.typ = typ
+        # Decoded value, normally taken from the lexer's constant pool
+        self.literal = literal if literal is not None else decode_literal(typ.upper(), value)
+
+class InvariantExpr(ASTNode):
+    """Loop-invariant `expr`, inserted by the optimizer; caches its value per loop entry."""
+    def __init__(self, expr):
+        self.expr = expr
+        self.cached = False
+        self.value = None
 
 class VarExpr(ASTNode):
     def __init__(self, name):
         self.name = name
 
+class ArrayExpr(ASTNode):
+    def __init__(self, elements):
+        self.elements = elements
+
+class IndexExpr(ASTNode):
+    def __init__(self, target, index):
+        self.target = target
+        self.index = index
+
+class MapExpr(ASTNode):
+    def __init__(self, entries):
+        self.entries = entries  # [(key LiteralExpr, value expr), ...]
+
+class MemberExpr(ASTNode):
+    def __init__(self, target, name):
+        self.target = target
+        self.name = name
+        # Inline cache for `.name` reads: (last map shape seen, its slot),
+        # one tuple so threads sharing the node never see a torn pair.
+        self.cache = (None, None)
+
+class CallExpr(ASTNode):
+    def __init__(self, callee, args):
+        self.callee = callee
+        self.args = args
+        self.builtin = None  # set by the semantic analyzer for built-in calls
+
 class AssignStmt(ASTNode):
     def __init__(self, name, expr):
         self.name = name
         self.expr = expr
 
+class IndexAssignStmt(ASTNode):
+    def __init__(self, target, index, expr):
+        self.target = target
+        self.index = index
+        self.expr = expr
+
+class MemberAssignStmt(ASTNode):
+    def __init__(self, target, name, expr):
+        self.target = target
+        self.name = name
+        self.expr = expr
+
+class ExprStmt(ASTNode):
+    """A call made for its effect, e.g. `log(x);`; the result is discarded."""
+    def __init__(self, expr):
+        self.expr = expr
+
 class DeclStmt(ASTNode):
     def __init__(self, name, expr):
         self.name = name
         self.expr = expr
+        self.slot = None
 
 class IfStmt(ASTNode):
     def __init__(self, cond, then_body, else_body=None):
@@ -45,6 +126,62 @@ class WhileStmt(ASTNode):
     def __init__(self, cond, body):
         self.cond = cond
         self.body = body
+        self.plan = None  # optimizer.LoopPlan, if the loop was optimized
+        self.budget = None  # iterations left before tier-up (interpreter)
+        self.compiled = None  # tiering.compile_loop result once the loop is hot
+
+    def __getstate__(self):
+        # Generated code stays in the process that compiled it.
+        state = dict(self.__dict__)
+        state['compiled'] = None
+        return state
+
+class SwitchStmt(ASTNode):
+    def __init__(self, subject, clauses):
+        self.subject = subject
+        self.clauses = clauses
+        # Filled in by the semantic analyzer:
+        self.table = None    # constant label value -> clause index
+        self.dynamic = ()    # (clause index, label index) of non-constant labels
+        self.default = None  # index of the `default` clause
+
+class CaseClause(ASTNode):
+    """`case a, b:` (and/or `default:`) labels and the statements up to the next label."""
+    def __init__(self, labels, body, is_default=False):
+        self.labels = labels
+        self.body = body
+        self.is_default = is_default
+
+class TryStmt(ASTNode):
+    def __init__(self, body, name, handler):
+        self.body = body
+        self.name = name  # variable bound to the caught error, or None
+        self.handler = handler
+        self.slot = None
+
+class ThrowStmt(ASTNode):
+    def __init__(self, expr):
+        self.expr = expr
+
+class ForStmt(ASTNode):
+    def __init__(self, var, iterable, body):
+        self.var = var
+        self.iterable = iterable
+        self.body = body
+        self.slot = None
+
+class BreakStmt(ASTNode):
+    pass
+
+class ContinueStmt(ASTNode):
+    pass
+
+class ParallelForStmt(ASTNode):
+    def __init__(self, var, iterable, reductions, body):
+        self.var = var
+        self.iterable = iterable
+        self.reductions = reductions  # [(op, name), ...]
+        self.body = body
 
 class PrintStmt(ASTNode):
     def __init__(self, expr):
@@ -53,15 +190,58 @@ class PrintStmt(ASTNode):
 class ReadStmt(ASTNode):
     def __init__(self, name):
         self.name = name
+        self.slot = None
+
+class FunDecl(ASTNode):
+    def __init__(self, name, params, body):
+        self.name = name
+        self.params = params
+        self.body = body
+        self.nslots = len(params)  # params + locals, sized by the semantic analyzer
+        self.locals = None  # {name: slot}, filled by the semantic analyzer
+
+class ReturnStmt(ASTNode):
+    def __init__(self, expr):
+        self.expr = expr
+        # `return f(...)`: the call can reuse the caller's frame
+        self.tail_call = isinstance(expr, CallExpr)
 
 class BlockStmt(ASTNode):
     def __init__(self, stmts):
         self.stmts = stmts
 
+class SpawnExpr(ASTNode):
+    def __init__(self, body):
+        self.body = body
+
+class ThreadStmt(ASTNode):
+    def __init__(self, body):
+        self.body = body
+
+class JoinStmt(ASTNode):
+    def __init__(self, expr):
+        self.expr = expr
+
+class LockStmt(ASTNode):
+    def __init__(self, name):
+        self.name = name
+
+class UnlockStmt(ASTNode):
+    def __init__(self, name):
+        self.name = name
+
+class ImportStmt(ASTNode):
+    def __init__(self, name, alias):
+        self.name = name    # dotted module name, e.g. "lib.strings"
+        self.alias = alias  # global the module is bound to
+        self.module = None  # CompiledModule, set by the semantic analyzer
+
 class Program(ASTNode):
     def __init__(self, stmts):
         self.stmts = stmts
 
+REDUCTION_OPS = ('sum', 'product', 'min', 'max', 'concat')
+
 # Parser Class
 class Parser:
     def __init__(self, tokens):
@@ -71,6 +251,10 @@ class Parser:
     def _current(self):
         return self.tokens[self.pos] if self.pos < len(self.tokens) else None
 
+    def _peek(self, offset=1):
+        pos = self.pos + offset
+        return self.tokens[pos] if pos < len(self.tokens) else None
+
     def _advance(self):
         self.pos += 1
 
@@ -92,6 +276,12 @@ class Parser:
         return Program(stmts)
 
     def parse_stmt(self):
+        line = self._current().line
+        stmt = self._parse_stmt()
+        stmt.line = line
+        return stmt
+
+    def _parse_stmt(self):
         tok = self._current()
         if tok.kind == 'IDENTIFIER':
             if tok.value == 'let':
@@ -100,10 +290,36 @@ class Parser:
                 return self.parse_if()
             elif tok.value == 'while':
                 return self.parse_while()
+            elif tok.value == 'switch':
+                return self.parse_switch()
+            elif tok.value == 'try':
+                return self.parse_try()
+            elif tok.value == 'throw':
+                return self.parse_throw()
+            elif tok.value == 'for':
+                return self.parse_for()
+            elif tok.value in ('break', 'continue'):
+                self._advance()
+                self._expect('OPERATOR', ';')
+                return BreakStmt() if tok.value == 'break' else ContinueStmt()
             elif tok.value == 'print':
                 return self.parse_print()
             elif tok.value == 'read':
                 return self.parse_read()
+            elif tok.value == 'fun':
+                return self.parse_fun()
+            elif tok.value == 'return':
+                return self.parse_return()
+            elif tok.value == 'thread':
+                return self.parse_thread()
+            elif tok.value == 'join':
+                return self.parse_join()
+            elif tok.value in ('lock', 'unlock'):
+                return self.parse_lock()
+            elif tok.value == 'import':
+                return self.parse_import()
+            elif tok.value == 'parallel' and self._peek() and self._peek().value == 'for':
+                return self.parse_parallel_for()
             elif tok.value not in RESERVED_WORDS:
                 return self.parse_assign()
         elif tok.kind == 'OPERATOR' and tok.value == '{':
@@ -120,11 +336,50 @@ class Parser:
 
     def parse_assign(self):
         name = self._expect('IDENTIFIER').value
+        if self._current() and self._current().value in ('[', '.', '('):
+            return self.parse_target_assign(VarExpr(name))
         self._expect('OPERATOR', '=')
         expr = self.parse_expr()
         self._expect('OPERATOR', ';')
         return AssignStmt(name, expr)
 
+    def parse_target_assign(self, target):
+        # a[i].b[j] = expr;  -> the last accessor becomes the assignment
+        # m.f(x);            -> a call statement
+        accessor = self._parse_accessor()
+        while self._current() and self._current().value in ('[', '.', '('):
+            target = self._apply_accessor(target, accessor)
+            accessor = self._parse_accessor()
+        if accessor[0] == '(':
+            self._expect('OPERATOR', ';')
+            return ExprStmt(self._apply_accessor(target, accessor))
+        self._expect('OPERATOR', '=')
+        expr = self.parse_expr()
+        self._expect('OPERATOR', ';')
+        kind, key = accessor
+        if kind == '.':
+            return MemberAssignStmt(target, key, expr)
+        return IndexAssignStmt(target, key, expr)
+
+    def _parse_accessor(self):
+        """Parse `[expr]`, `.name` or `(args)`; return ('[', expr), ('.', name) or ('(', args)."""
+        if self._current().value == '.':
+            self._advance()
+            return '.', self._expect('IDENTIFIER').value
+        if self._current().value == '(':
+            self._advance()
+            return '(', self._parse_expr_list(')')
+        self._expect('OPERATOR', '[')
+        index = self.parse_expr()
+        self._expect('OPERATOR', ']')
+        return '[', index
+
+    def _apply_accessor(self, target, accessor):
+        kind, key = accessor
+        if kind == '(':
+            return CallExpr(target, key)
+        return MemberExpr(target, key) if kind == '.' else IndexExpr(target, key)
+
     def parse_if(self):
         self._expect('IDENTIFIER', 'if')
         self._expect('OPERATOR', '(')
@@ -145,6 +400,100 @@ class Parser:
         body = self.parse_stmt()
         return WhileStmt(cond, body)
 
+    def _at_case_label(self):
+        tok = self._current()
+        return tok is not None and tok.kind == 'IDENTIFIER' and tok.value in ('case', 'default')
+
+    def parse_switch(self):
+        # switch (expr) { case 1, 2: stmts  case 3: default: stmts }
+        self._expect('IDENTIFIER', 'switch')
+        self._expect('OPERATOR', '(')
+        subject = self.parse_expr()
+        self._expect('OPERATOR', ')')
+        self._expect('OPERATOR', '{')
+        clauses, seen_default = [], False
+        while self._current() and self._current().value != '}':
+            if not self._at_case_label():
+                raise SyntaxError(f"Expected 'case' or 'default' at pos {self.pos}")
+            # Labels with no statements between them share the next body.
+            labels, is_default = [], False
+            while self._at_case_label():
+                if self._current().value == 'default':
+                    if seen_default:
+                        raise SyntaxError(f"Duplicate 'default' in switch at pos {self.pos}")
+                    seen_default = is_default = True
+                    self._advance()
+                else:
+                    self._advance()
+                    labels.append(self.parse_expr())
+                    while self._current() and self._current().value == ',':
+                        self._advance()
+                        labels.append(self.parse_expr())
+                self._expect('OPERATOR', ':')
+            stmts = []
+            while (self._current() and self._current().value != '}'
+                   and not self._at_case_label()):
+                stmts.append(self.parse_stmt())
+            clauses.append(CaseClause(labels, BlockStmt(stmts), is_default))
+        self._expect('OPERATOR', '}')
+        return SwitchStmt(subject, clauses)
+
+    def parse_try(self):
+        # try { ... } catch (name) { ... }; the `(name)` is optional
+        self._expect('IDENTIFIER', 'try')
+        body = self.parse_block()
+        self._expect('IDENTIFIER', 'catch')
+        name = None
+        if self._current() and self._current().value == '(':
+            self._advance()
+            name = self._expect('IDENTIFIER').value
+            if name in RESERVED_WORDS:
+                raise SyntaxError(f"Invalid catch variable '{name}' at pos {self.pos - 1}")
+            self._expect('OPERATOR', ')')
+        return TryStmt(body, name, self.parse_block())
+
+    def parse_throw(self):
+        self._expect('IDENTIFIER', 'throw')
+        expr = self.parse_expr()
+        self._expect('OPERATOR', ';')
+        return ThrowStmt(expr)
+
+    def _parse_for_header(self):
+        self._expect('IDENTIFIER', 'for')
+        var = self._expect('IDENTIFIER').value
+        if var in RESERVED_WORDS:
+            raise SyntaxError(f"Invalid loop variable '{var}' at pos {self.pos - 1}")
+        self._expect('IDENTIFIER', 'in')
+        iterable = self.parse_expr()
+        return var, iterable
+
+    def parse_for(self):
+        # for i in <expr> <stmt>
+        var, iterable = self._parse_for_header()
+        return ForStmt(var, iterable, self.parse_stmt())
+
+    def parse_parallel_for(self):
+        # parallel for i in <expr> [reduce(op: name, ...)] <stmt>
+        self._expect('IDENTIFIER', 'parallel')
+        var, iterable = self._parse_for_header()
+        reductions = []
+        if self._current() and self._current().value == 'reduce':
+            self._advance()
+            self._expect('OPERATOR', '(')
+            while True:
+                op = self._expect('IDENTIFIER').value
+                if op not in REDUCTION_OPS:
+                    raise SyntaxError(f"Unknown reduction '{op}' at pos {self.pos - 1}")
+                self._expect('OPERATOR', ':')
+                reductions.append((op, self._expect('IDENTIFIER').value))
+                if self._current() and self._current().value == ',':
+                    self._advance()
+                    continue
+                break
+            self._expect('OPERATOR', ')')
+        body = self.parse_stmt()
+        return ParallelForStmt(var, iterable, reductions, body)
+
     def parse_print(self):
         self._expect('IDENTIFIER', 'print')
         self._expect('OPERATOR', '(')
@@ -161,6 +510,67 @@ class Parser:
         self._expect('OPERATOR', ';')
         return ReadStmt(name)
 
+    def parse_fun(self):
+        self._expect('IDENTIFIER', 'fun')
+        name = self._expect('IDENTIFIER').value
+        if name in RESERVED_WORDS:
+            raise SyntaxError(f"Invalid function name '{name}' at pos {self.pos - 1}")
+        self._expect('OPERATOR', '(')
+        params = []
+        while not (self._current() and self._current().value == ')'):
+            if params:
+                self._expect('OPERATOR', ',')
+            param = self._expect('IDENTIFIER').value
+            if param in RESERVED_WORDS:
+                raise SyntaxError(f"Invalid parameter name '{param}' at pos {self.pos - 1}")
+            params.append(param)
+        self._expect('OPERATOR', ')')
+        return FunDecl(name, params, self.parse_block())
+
+    def parse_return(self):
+        self._expect('IDENTIFIER', 'return')
+        expr = None
+        if not (self._current() and self._current().value == ';'):
+            expr = self.parse_expr()
+        self._expect('OPERATOR', ';')
+        return ReturnStmt(expr)
+
+    def parse_import(self):
+        # import a.b;  or  import a.b as name;
+        self._expect('IDENTIFIER', 'import')
+        parts = [self._expect('IDENTIFIER').value]
+        while self._current() and self._current().value == '.':
+            self._advance()
+            parts.append(self._expect('IDENTIFIER').value)
+        alias = parts[-1]
+        if self._current() and self._current().value == 'as':
+            self._advance()
+            alias = self._expect('IDENTIFIER').value
+        if alias in RESERVED_WORDS:
+            raise SyntaxError(f"Invalid module name '{alias}' at pos {self.pos - 1}")
+        self._expect('OPERATOR', ';')
+        return ImportStmt('.'.join(parts), alias)
+
+    def parse_thread(self):
+        self._expect('IDENTIFIER', 'thread')
+        return ThreadStmt(self.parse_block())
+
+    def parse_join(self):
+        self._expect('IDENTIFIER', 'join')
+        self._expect('OPERATOR', '(')
+        expr = self.parse_expr()
+        self._expect('OPERATOR', ')')
+        self._expect('OPERATOR', ';')
+        return JoinStmt(expr)
+
+    def parse_lock(self):
+        keyword = self._expect('IDENTIFIER').value
+        self._expect('OPERATOR', '(')
+        name = self._expect('IDENTIFIER').value
+        self._expect('OPERATOR', ')')
+        self._expect('OPERATOR', ';')
+        return LockStmt(name) if keyword == 'lock' else UnlockStmt(name)
+
     def parse_block(self):
         self._expect('OPERATOR', '{')
         stmts = []
@@ -238,15 +648,30 @@ class Parser:
         return self.parse_primary()
 
     def parse_primary(self):
+        return self.parse_postfix(self.parse_atom())
+
+    def parse_postfix(self, expr):
+        while (self._current() and self._current().kind == 'OPERATOR' and
+               self._current().value in ('[', '.', '(')):
+            if self._current().value == '(':
+                expr = self.parse_call(expr)
+            else:
+                expr = self._apply_accessor(expr, self._parse_accessor())
+        return expr
+
+    def parse_atom(self):
         tok = self._current()
         if tok is None:
             raise SyntaxError("Unexpected end of input")
 
         if tok.kind in ('INTEGER', 'FLOAT', 'STRING', 'BOOLEAN', 'NULL'):
             self._advance()
-            return LiteralExpr(tok.value, tok.kind.lower())
+            return LiteralExpr(tok.value, tok.kind.lower(), tok.literal)
 
         if tok.kind == 'IDENTIFIER':
+            if tok.value == 'spawn':
+                self._advance()
+                return SpawnExpr(self.parse_block())
             if tok.value in RESERVED_WORDS:
                 raise SyntaxError(f"Unexpected reserved word in expression: {tok.value}")
             self._advance()
@@ -258,7 +683,51 @@ class Parser:
             self._expect('OPERATOR', ')')
             return expr
 
+        if tok.kind == 'OPERATOR' and tok.value == '[':
+            self._advance()
+            return ArrayExpr(self._parse_expr_list(']'))
+
+        if tok.kind == 'OPERATOR' and tok.value == '{':
+            return self.parse_map()
+
         raise SyntaxError(f"Unexpected token in primary: {tok}")
 
+    def parse_map(self):
+        # {"key": expr, name: expr, 1: expr}; bare names are string keys
+        self._expect('OPERATOR', '{')
+        entries = []
+        while not (self._current() and self._current().value == '}'):
+            if entries:
+                self._expect('OPERATOR', ',')
+            tok = self._current()
+            if tok is None:
+                raise SyntaxError("Unexpected end of input in map literal")
+            if tok.kind in ('STRING', 'INTEGER', 'FLOAT', 'BOOLEAN', 'NULL'):
+                key = LiteralExpr(tok.value, tok.kind.lower(), tok.literal)
+            elif tok.kind == 'IDENTIFIER' and tok.value not in RESERVED_WORDS:
+                key = LiteralExpr(f'"{tok.value}"', 'string', tok.value)
+            else:
+                raise SyntaxError(f"Invalid map key {tok.value!r} at pos {self.pos}")
+            self._advance()
+            self._expect('OPERATOR', ':')
+            entries.append((key, self.parse_expr()))
+        self._expect('OPERATOR', '}')
+        return MapExpr(entries)
+
+    def parse_call(self, callee):
+        self._expect('OPERATOR', '(')
+        return CallExpr(callee, self._parse_expr_list(')'))
+
+    def _parse_expr_list(self, closing):
+        """Parse `expr, expr, ...` up to and including the `closing` operator."""
+        exprs = []
+        if not (self._current() and self._current().value == closing):
+            exprs.append(self.parse_expr())
+            while self._current() and self._current().value == ',':
+                self._advance()
+                exprs.append(self.parse_expr())
+        self._expect('OPERATOR', closing)
+        return exprs
+
 # Integrate with your symbol table (optional, but call after parsing for now)
 # In main, after analyzer.get_tokens(), do: ast = Parser(tokens).parse_program()
\ No newline at end of file
@@ -0,0 +1,77 @@
+# src/pipeline.py
+import os
+
+from .tokenizer_analyzer import SwiftLangAnalyzer
+from .parser import Parser
+from .semantic_analyzer import SemanticAnalyzer, SemanticError
+from .interpreter import Interpreter, describe_error
+from .optimizer import optimize
+
+# Sources at least this long are tokenized and parsed across processes
+# (src/frontend.py); below it, starting the pool costs more than it saves.
+PARALLEL_PARSE_CHARS = 1_000_000
+# Processes for that; None means one per CPU.  Batch workers set it to 1.
+parse_workers = None
+
+
+class PipelineError(Exception):
+    """Failure in one phase of the pipeline, labelled the way the CLI reports it."""
+    def __init__(self, label, message):
+        super().__init__(message)
+        self.label = label
+
+
+def tokenize(source):
+    tokenizer = SwiftLangAnalyzer()
+    tokenizer.analyze(source)
+    return tokenizer.get_tokens()
+
+
+def parse(tokens):
+    try:
+        return Parser(tokens).parse_program()
+    except SyntaxError as e:
+        raise PipelineError("Syntax Error", str(e)) from e
+    except Exception as e:
+        raise PipelineError("Parsing Error", str(e)) from e
+
+
+def parse_source(source):
+    """AST of `source`; very large sources are split and parsed in parallel."""
+    if len(source) >= PARALLEL_PARSE_CHARS:
+        workers = parse_workers or os.cpu_count() or 1
+        if workers > 1:
+            from .frontend import parse_parallel
+            return parse_parallel(source, workers)
+    return parse(tokenize(source))
+
+
+def analyze(ast, base_dir=None):
+    """Check and optimize `ast`; imports resolve from `base_dir` (default: the current directory)."""
+    try:
+        symbol_table = SemanticAnalyzer(base_dir=base_dir).analyze(ast)
+        optimize(ast)
+        return symbol_table
+    except SemanticError as e:
+        raise PipelineError("Semantic Error", str(e)) from e
+    except Exception as e:
+        raise PipelineError("Semantic Analysis Error", str(e)) from e
+
+
+def execute(ast, symbol_table):
+    try:
+        Interpreter(symbol_table).interpret(ast)
+    except Exception as e:
+        raise PipelineError("Runtime Error", describe_error(e)) from e
+
+
+def compile_source(source, path=None):
+    """Tokenize, parse and check `source`, read from file `path`; return (ast, symbol_table)."""
+    ast = parse_source(source)
+    return ast, analyze(ast, os.path.dirname(os.path.abspath(path)) if path else None)
+
+
+def run_source(source, path=None):
+    """Run a whole program; output goes to the current stdout."""
+    ast, symbol_table = compile_source(source, path)
+    execute(ast, symbol_table)
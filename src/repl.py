@@ -0,0 +1,178 @@
+# src/repl.py
+#
+# `main.py --repl`: an interactive session over one live symbol table.
+#
+# Every input is tokenized, parsed and checked on its own against the
+# session's SemanticAnalyzer, then run by the session's Interpreter, so the
+# cost of an input depends only on its own size.  An input that fails
+# semantic checks leaves the session as it was: names it declared are
+# removed again.  Runtime errors keep whatever the input did before failing.
+import contextlib
+import sys
+import time
+
+from .interpreter import Interpreter
+from .optimizer import optimize
+from .parser import Parser
+from .pipeline import PipelineError, parse, tokenize
+from .semantic_analyzer import SemanticAnalyzer, SemanticError
+from .values import format_value
+
+BANNER = "SwiftLang REPL. Type :help for commands, :quit to leave."
+
+HELP = """\
+Enter statements (`let x = 1;`) or a bare expression (`x + 1`) to see its value.
+Blocks may span several lines; input runs once every brace and parenthesis is closed.
+  :time <input>   run the input and report how long it took
+  :symbols        list every global with its type and value
+  :help           show this help
+  :quit           leave the REPL (end-of-file works too)"""
+
+OPENERS = {'{': '}', '(': ')', '[': ']'}
+
+
+class Repl:
+    def __init__(self, out=None):
+        self.out = out or sys.stdout
+        self.analyzer = SemanticAnalyzer()
+        self.interpreter = Interpreter(self.analyzer.symbol_table)
+
+    @property
+    def symbol_table(self):
+        return self.analyzer.symbol_table
+
+    def _print(self, text):
+        print(text, file=self.out)
+
+    @staticmethod
+    def is_complete(source):
+        """True once every bracket opened in `source` is closed."""
+        depth = 0
+        for tok in tokenize(source):
+            if tok.kind == 'OPERATOR':
+                if tok.value in OPENERS:
+                    depth += 1
+                elif tok.value in OPENERS.values():
+                    depth -= 1
+        return depth <= 0
+
+    def check(self, node):
+        """Check `node` against the session state; undo its declarations on error."""
+        analyzer = self.analyzer
+        before = set(analyzer.symbol_table)
+        analyzer.errors = []
+        try:
+            analyzer.analyze(node)
+        except Exception:
+            analyzer.pending_functions = []
+            for name in set(analyzer.symbol_table) - before:
+                del analyzer.symbol_table[name]
+            raise
+        optimize(node)
+
+    def compile(self, source):
+        """(node, is_expression) for one input."""
+        tokens = tokenize(source)
+        try:
+            return parse(tokens), False
+        except PipelineError:
+            # Not a statement list: maybe a bare expression.
+            parser = Parser(tokens)
+            try:
+                expr = parser.parse_expr()
+            except (SyntaxError, IndexError, AttributeError):
+                expr = None
+            tok = parser._current()
+            if tok is not None and tok.value == ';':
+                parser._advance()
+            if expr is None or parser._current() is not None:
+                raise
+            return expr, True
+
+    def execute(self, source):
+        """Run one input, printing its output, value or error; return True on success."""
+        try:
+            node, is_expression = self.compile(source)
+            self.check(node)
+        except PipelineError as e:
+            self._print(f"{e.label}: {e}")
+            return False
+        except SemanticError as e:
+            self._print(f"Semantic Error: {e}")
+            return False
+        with contextlib.redirect_stdout(self.out):
+            try:
+                try:
+                    if is_expression:
+                        self._print(format_value(self.interpreter.visit(node)))
+                    else:
+                        self.interpreter.visit(node)
+                finally:
+                    self.interpreter.close()  # wait for spawned blocks
+            except Exception as e:
+                self._print(f"Runtime Error: {e}")
+                return False
+        return True
+
+    def dump_symbols(self):
+        if not self.symbol_table:
+            self._print("  <no variables>")
+        for name in sorted(self.symbol_table):
+            entry = self.symbol_table[name]
+            self._print(f"  {name} : {entry['type']} = {format_value(entry['value'])}")
+
+    def command(self, line):
+        """Handle a `:command`; return False when the session should end."""
+        name, _, rest = line[1:].partition(' ')
+        if name in ('quit', 'q', 'exit'):
+            return False
+        if name == 'help':
+            self._print(HELP)
+        elif name == 'symbols':
+            self.dump_symbols()
+        elif name == 'time':
+            if not rest.strip():
+                self._print("Usage: :time <input>")
+            else:
+                start = time.perf_counter()
+                self.execute(rest)
+                self._print(f"({(time.perf_counter() - start) * 1e3:.3f} ms)")
+        else:
+            self._print(f"Unknown command ':{name}'. Type :help for a list.")
+        return True
+
+    def run(self, read=input):
+        """Read-eval-print until :quit or end of input."""
+        self._print(BANNER)
+        buffer = []
+        while True:
+            try:
+                line = read('... ' if buffer else '>>> ')
+            except EOFError:
+                self._print("")
+                return
+            except KeyboardInterrupt:
+                self._print("")
+                buffer = []
+                continue
+            if not buffer and line.strip().startswith(':'):
+                if not self.command(line.strip()):
+                    return
+                continue
+            buffer.append(line)
+            source = "\n".join(buffer)
+            if not source.strip():
+                buffer = []
+                continue
+            if not self.is_complete(source):
+                continue
+            buffer = []
+            try:
+                self.execute(source)
+            except KeyboardInterrupt:
+                self._print("Interrupted")
+
+
+def main():
+    Repl().run()
+    return 0
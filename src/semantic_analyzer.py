@@ -1,13 +1,32 @@
 # semantic_analyzer.py
-from .parser import *
+from .parser import (ASTNode, ArrayExpr, BinaryExpr, CallExpr, FunDecl, ImportStmt,
+                     LiteralExpr, MapExpr, MemberExpr, SpawnExpr, VarExpr)
+from .stdlib import BUILTINS, BUILTIN_TYPES
 
 class SemanticAnalyzer:
-    def __init__(self):
+    def __init__(self, loader=None, base_dir=None):
         self.symbol_table = {}  # {name: {'type': str, 'value': any}} - extend your HashTable if needed
         self.errors = []
+        # Function being checked: its locals map {name: {'type': str, 'slot': int}}
+        self.function = None
+        self.scope = None
+        self.return_allowed = False
+        self.loop_depth = 0  # enclosing loops that `break`/`continue` may leave
+        self.switch_depth = 0  # enclosing switches that `break` may leave
+        self.try_depth = 0  # enclosing `try` bodies; no tail calls inside them
+        self.pending_functions = []
+        # Imports: each module is checked by its own analyzer, in its own
+        # namespace; here only the alias is declared.
+        self.loader = loader  # modules.ModuleLoader, created on the first import
+        self.base_dir = base_dir  # directory imports are resolved from
+        self.modules = {}  # alias -> CompiledModule
 
     def analyze(self, ast):
         self.visit(ast)
+        # Bodies are checked after the top level so they can use globals
+        # declared below the function.
+        while self.pending_functions:
+            self.check_function(self.pending_functions.pop(0))
         if self.errors:
             raise SemanticError("\n".join(self.errors))
         return self.symbol_table  # Or whatever you need
@@ -26,30 +45,210 @@ class SemanticAnalyzer:
                         self.visit(item)
 
     def visit_Program(self, node):
-        self.generic_visit(node)
+        # Imports and functions are hoisted: any top-level statement may use them.
+        imports = [stmt for stmt in node.stmts if isinstance(stmt, ImportStmt)]
+        if imports:
+            self.module_loader().preload(imports, self.base_dir)
+            for stmt in imports:
+                self.import_module(stmt)
+        for stmt in node.stmts:
+            if isinstance(stmt, FunDecl):
+                if stmt.name in self.symbol_table:
+                    self.errors.append(f"Duplicate declaration: {stmt.name}")
+                else:
+                    self.symbol_table[stmt.name] = {'type': 'function', 'value': None}
+                self.pending_functions.append(stmt)
+        for stmt in node.stmts:
+            if not isinstance(stmt, (FunDecl, ImportStmt)):
+                self.visit(stmt)
+
+    def module_loader(self):
+        if self.loader is None:
+            from .modules import ModuleLoader
+            self.loader = ModuleLoader(self.base_dir)
+        return self.loader
+
+    def import_module(self, node):
+        from .modules import ModuleError
+        if node.alias in self.symbol_table:
+            self.errors.append(f"Duplicate declaration: {node.alias}")
+            return
+        # Declared even if loading fails, so uses are not reported as well.
+        self.symbol_table[node.alias] = {'type': 'module', 'value': None}
+        try:
+            node.module = self.loader.load(node.name, self.base_dir)
+        except ModuleError as e:
+            self.errors.append(str(e))
+            return
+        self.modules[node.alias] = node.module
+
+    def visit_ImportStmt(self, node):
+        # Top-level imports are handled by visit_Program.
+        self.errors.append(f"Import of '{node.name}' must be at the top level")
+
+    def imported_module(self, expr):
+        """CompiledModule that `expr` names, if it is an import's alias."""
+        if isinstance(expr, VarExpr) and expr.name in self.modules:
+            entry = self.lookup(expr.name)
+            if entry is self.symbol_table.get(expr.name) and entry['type'] == 'module':
+                return self.modules[expr.name]
+        return None
+
+    def visit_MemberExpr(self, node):
+        self.visit(node.target)
+        module = self.imported_module(node.target)
+        if module is not None and node.name not in module.symbol_table:
+            self.errors.append(f"Module '{module.name}' has no member '{node.name}'")
+
+    def visit_FunDecl(self, node):
+        # Top-level declarations are handled by visit_Program.
+        self.errors.append(f"Function '{node.name}' must be declared at the top level")
+
+    def check_function(self, node):
+        """Check a body and give every parameter and local a frame slot."""
+        self.function, self.return_allowed = node, True
+        self.scope = {}
+        self.loop_depth = self.switch_depth = self.try_depth = 0
+        for param in node.params:
+            if param in self.scope:
+                self.errors.append(f"Duplicate parameter: {param}")
+            self.scope[param] = {'type': 'unknown', 'slot': len(self.scope)}
+        self.visit(node.body)
+        node.nslots = len(self.scope)
+        node.locals = {name: entry['slot'] for name, entry in self.scope.items()}
+        self.function, self.scope, self.return_allowed = None, None, False
+
+    def lookup(self, name):
+        """Entry for `name`: the current function's local, else the global."""
+        if self.scope is not None and name in self.scope:
+            return self.scope[name]
+        return self.symbol_table.get(name)
+
+    def declare(self, name, typ):
+        """Declare `name` in the current scope; return its frame slot (None if global)."""
+        if self.scope is not None:
+            self.scope[name] = {'type': typ, 'slot': len(self.scope)}
+            return self.scope[name]['slot']
+        self.symbol_table[name] = {'type': typ, 'value': None}
+        return None
 
     def visit_DeclStmt(self, node):
-        if node.name in self.symbol_table:
+        table = self.scope if self.scope is not None else self.symbol_table
+        if node.name in table:
             self.errors.append(f"Duplicate declaration: {node.name}")
             return
         # Dynamic typing: store type but allow changes later
         typ = self.infer_type(node.expr)
-        self.symbol_table[node.name] = {'type': typ, 'value': None}
+        node.slot = self.declare(node.name, typ)
         self.visit(node.expr)
 
 
     def visit_AssignStmt(self, node):
-        if node.name not in self.symbol_table:
+        entry = self.lookup(node.name)
+        if entry is None:
             self.errors.append(f"Undeclared variable: {node.name}")
             return
         # Dynamic typing: update type on assignment
         new_type = self.infer_type(node.expr)
-        self.symbol_table[node.name]['type'] = new_type
+        entry['type'] = new_type
+        node.slot = entry.get('slot')
         self.visit(node.expr)
 
+    def visit_ExprStmt(self, node):
+        self.visit(node.expr)  # the parser only builds these for calls
+
     def visit_VarExpr(self, node):
-        if node.name not in self.symbol_table:
+        entry = self.lookup(node.name)
+        if entry is None:
+            self.errors.append(f"Undeclared variable: {node.name}")
+            return
+        node.slot = entry.get('slot')
+
+    def visit_ReadStmt(self, node):
+        entry = self.lookup(node.name)
+        if entry is None:
             self.errors.append(f"Undeclared variable: {node.name}")
+            return
+        node.slot = entry.get('slot')
+
+    def visit_ReturnStmt(self, node):
+        if not self.return_allowed:
+            self.errors.append("'return' outside function")
+        if self.try_depth:
+            # The call must finish before the `try` does, so it keeps its frame.
+            node.tail_call = False
+        if node.expr is not None:
+            self.visit(node.expr)
+
+    def visit_SpawnExpr(self, node):
+        self.visit_detached_body(node.body)
+
+    def visit_ThreadStmt(self, node):
+        self.visit_detached_body(node.body)
+
+    def visit_detached_body(self, body):
+        # A block that runs on its own (a spawned block, a parallel loop
+        # body): `return`, `break` and `continue` cannot leave it.
+        saved = self.return_allowed, self.loop_depth, self.switch_depth
+        self.return_allowed, self.loop_depth, self.switch_depth = False, 0, 0
+        self.visit(body)
+        self.return_allowed, self.loop_depth, self.switch_depth = saved
+
+    def visit_WhileStmt(self, node):
+        self.visit(node.cond)
+        self.visit_loop_body(node.body)
+
+    def visit_ForStmt(self, node):
+        self.visit(node.iterable)
+        node.slot = self.declare_loop_var(node.var, node.iterable)
+        self.visit_loop_body(node.body)
+
+    def visit_loop_body(self, body):
+        self.loop_depth += 1
+        self.visit(body)
+        self.loop_depth -= 1
+
+    def visit_BreakStmt(self, node):
+        if not self.loop_depth and not self.switch_depth:
+            self.errors.append("'break' outside loop or switch")
+
+    def visit_ContinueStmt(self, node):
+        if not self.loop_depth:
+            self.errors.append("'continue' outside loop")
+
+    def visit_SwitchStmt(self, node):
+        # Constant labels go into a jump table; the rest are tested in order.
+        self.visit(node.subject)
+        table, dynamic = {}, []
+        for index, clause in enumerate(node.clauses):
+            if clause.is_default:
+                node.default = index
+            for position, label in enumerate(clause.labels):
+                self.visit(label)
+                if not isinstance(label, LiteralExpr):
+                    dynamic.append((index, position))
+                elif label.literal in table:
+                    self.errors.append(f"Duplicate case label {label.value} in switch")
+                else:
+                    table[label.literal] = index
+            self.switch_depth += 1
+            self.visit(clause.body)
+            self.switch_depth -= 1
+        node.table, node.dynamic = table, tuple(dynamic)
+
+    def visit_TryStmt(self, node):
+        self.try_depth += 1
+        self.visit(node.body)
+        self.try_depth -= 1
+        if node.name is not None:
+            # Like a loop variable: declared on first use, reused afterwards.
+            entry = self.lookup(node.name)
+            if entry is None:
+                node.slot = self.declare(node.name, 'unknown')
+            else:
+                entry['type'] = 'unknown'
+                node.slot = entry.get('slot')
+        self.visit(node.handler)
 
     def visit_BinaryExpr(self, node):
         self.visit(node.left)
@@ -68,15 +267,54 @@ class SemanticAnalyzer:
         if node.else_body:
             self.visit(node.else_body)
 
+    def visit_CallExpr(self, node):
+        callee = node.callee
+        if isinstance(callee, VarExpr) and self.lookup(callee.name) is None:
+            if callee.name in BUILTINS:
+                node.builtin = callee.name
+            else:
+                self.errors.append(f"Undefined function: {callee.name}")
+        else:
+            self.visit(callee)
+        for arg in node.args:
+            self.visit(arg)
+
+    def visit_MapExpr(self, node):
+        for key, value in node.entries:
+            self.visit(key)
+            self.visit(value)
+
+    def visit_ParallelForStmt(self, node):
+        if self.function is not None:
+            self.errors.append("'parallel for' is only supported at the top level")
+            return
+        self.visit(node.iterable)
+        for _, name in node.reductions:
+            if name not in self.symbol_table:
+                self.errors.append(f"Undeclared variable: {name}")
+        self.declare_loop_var(node.var, node.iterable)
+        # Iterations run independently, possibly in other processes.
+        self.visit_detached_body(node.body)
+
+    def declare_loop_var(self, name, iterable):
+        """A loop declares its variable on first use and reuses it afterwards."""
+        typ = 'integer' if self.infer_type(iterable) == 'range' else 'unknown'
+        entry = self.lookup(name)
+        if entry is None:
+            return self.declare(name, typ)
+        entry['type'] = typ
+        return entry.get('slot')
+
     # Add visit_WhileStmt, etc. (check cond is boolean)
 
     def infer_type(self, expr):
         if isinstance(expr, LiteralExpr):
             return expr.typ
         elif isinstance(expr, VarExpr):
-            if expr.name not in self.symbol_table:
+            entry = self.lookup(expr.name)
+            if entry is None:
                 return 'unknown'
-            return self.symbol_table[expr.name]['type']
+            return entry['type']
         elif isinstance(expr, BinaryExpr):
             # Infer based on op (e.g., + for numbers/strings)
             left_type = self.infer_type(expr.left)
@@ -85,6 +323,21 @@ class SemanticAnalyzer:
             elif expr.op in ('==', '!=', '<', '>'):
                 return 'boolean'
             # etc.
+        elif isinstance(expr, SpawnExpr):
+            return 'thread'
+        elif isinstance(expr, ArrayExpr):
+            return 'array'
+        elif isinstance(expr, MapExpr):
+            return 'object'
+        elif isinstance(expr, MemberExpr):
+            module = self.imported_module(expr.target)
+            if module is not None and expr.name in module.symbol_table:
+                return module.symbol_table[expr.name]['type']
+        elif isinstance(expr, CallExpr):
+            callee = expr.callee
+            if (isinstance(callee, VarExpr) and self.lookup(callee.name) is None
+                    and callee.name in BUILTIN_TYPES):
+                return BUILTIN_TYPES[callee.name]
         return 'unknown'
 
     def types_compatible(self, t1, t2):
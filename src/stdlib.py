@@ -0,0 +1,31 @@
+# src/stdlib.py
+"""Built-in functions available to every SwiftLang program."""
+from .values import Array, Map, Rope
+
+
+def sl_range(*args):
+    if not 1 <= len(args) <= 3:
+        raise TypeError(f"range() expects 1 to 3 arguments, got {len(args)}")
+    for arg in args:
+        if type(arg) is not int:
+            raise TypeError(f"range() arguments must be integers, got {arg!r}")
+    return range(*args)
+
+
+def sl_len(value):
+    if isinstance(value, (str, Rope, Array, Map)):
+        return len(value)
+    raise TypeError(f"len() expects a string, array or map, got {value!r}")
+
+
+# name -> implementation
+BUILTINS = {
+    'range': sl_range,
+    'len': sl_len,
+}
+
+# name -> type reported by the semantic analyzer for a call's result
+BUILTIN_TYPES = {
+    'range': 'range',
+    'len': 'integer',
+}
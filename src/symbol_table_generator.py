@@ -1,35 +1,100 @@
+import argparse
+import csv
+import json
 import sys
-from .tokenizer_analyzer import SwiftLangAnalyzer, Token, RESERVED_WORDS
+from .tokenizer_analyzer import SwiftLangAnalyzer
+from .parser import (Parser, Program, LiteralExpr, ArrayExpr, MapExpr, DeclStmt, AssignStmt, FunDecl,
+                     iter_children)
+from .semantic_analyzer import SemanticAnalyzer
+from .values import Array, Map
 
 
-#  Simple hash table (separate chaining)
-class HashTable:
-    def __init__(self, size=101):
-        self.size = size
-        self.buckets = [[] for _ in range(size)]
+#  Open-addressing hash table
+_EMPTY = object()
+
 
-    def _hash(self, key):
-        return hash(key) % self.size
+class HashTable:
+    """Growable open-addressing table with cached hashes.
+
+    Capacity is a power of two and doubles once the table is two thirds
+    full.  Collisions probe with the same perturbation scheme as CPython's
+    dict, so clustered hashes still spread across the whole table.
+    Alphabetical order is kept in a sorted index of slots; keys inserted
+    since the last `entries()` wait in a pending run and are merged in on
+    demand, and a resize renumbers the index instead of re-sorting it.
+    """
+
+    def __init__(self, size=8):
+        capacity = 8
+        while capacity < size:
+            capacity *= 2
+        self._alloc(capacity)
+        self._used = 0
+        self._sorted = []   # slots in alphabetical order of their keys
+        self._pending = []  # slots not yet merged into _sorted
+
+    def _alloc(self, capacity):
+        self._mask = capacity - 1
+        self._keys = [_EMPTY] * capacity
+        self._hashes = [0] * capacity
+        self._items = [None] * capacity  # (key, payload), shared with entries()
+
+    def __len__(self):
+        return self._used
+
+    def _find(self, key, h):
+        """Slot holding `key`, or the empty slot where it belongs."""
+        keys, hashes, mask = self._keys, self._hashes, self._mask
+        perturb = h & 0xFFFFFFFFFFFFFFFF
+        i = h & mask
+        while True:
+            k = keys[i]
+            if k is _EMPTY or k is key or (hashes[i] == h and k == key):
+                return i
+            perturb >>= 5
+            i = (i * 5 + perturb + 1) & mask
+
+    def _resize(self):
+        keys, hashes, items = self._keys, self._hashes, self._items
+        self._alloc((self._mask + 1) * 2)
+        moved = [0] * len(keys)  # old slot -> new slot
+        for old, (k, h, item) in enumerate(zip(keys, hashes, items)):
+            if k is not _EMPTY:
+                i = self._find(k, h)  # every key is new: lands on an empty slot
+                self._keys[i], self._hashes[i], self._items[i] = k, h, item
+                moved[old] = i
+        self._sorted = [moved[i] for i in self._sorted]
+        self._pending = [moved[i] for i in self._pending]
 
     def insert(self, key, payload):
-        h = self._hash(key)
-        for i, (k, _) in enumerate(self.buckets[h]):
-            if k == key:
-                self.buckets[h][i] = (key, payload)
-                return
-        self.buckets[h].append((key, payload))
+        h = hash(key)
+        i = self._find(key, h)
+        if self._keys[i] is not _EMPTY:
+            self._items[i] = (self._keys[i], payload)
+            return
+        self._keys[i], self._hashes[i], self._items[i] = key, h, (key, payload)
+        self._used += 1
+        self._pending.append(i)
+        if self._used * 3 >= (self._mask + 1) * 2:
+            self._resize()
 
     def get(self, key):
-        h = self._hash(key)
-        for k, p in self.buckets[h]:
-            if k == key:
-                return p
-        return None
+        i = self._find(key, hash(key))
+        return self._items[i][1] if self._keys[i] is not _EMPTY else None
+
+    def _ordered_slots(self):
+        if self._pending:
+            # Two sorted runs: list.sort merges them in linear time.
+            by_key = self._keys.__getitem__
+            self._pending.sort(key=by_key)
+            self._sorted += self._pending
+            self._sorted.sort(key=by_key)
+            self._pending = []
+        return self._sorted
 
     def entries(self):
         """Return list of (name, payload) in alphabetical order."""
-        all_entries = [item for bucket in self.buckets for item in bucket]
-        return sorted(all_entries, key=lambda x: x[0])
+        return list(map(self._items.__getitem__, self._ordered_slots()))
 
 
 #  Symbol table wrapper
@@ -42,157 +107,186 @@ class SymbolTable:
         self.ht.insert(name, {'type': typ, 'value': value})
 
     def assign(self, name, typ, value):
-        """Update an existing variable (warn if it never existed)."""
-        if self.ht.get(name) is None:
-            print(f"[WARN] Assigning to undeclared variable '{name}' - treating as declaration.")
+        """Update an existing variable."""
         self.ht.insert(name, {'type': typ, 'value': value})
 
-    def print_state(self, title):
-        print("\n" + "=" * 60)
-        print(title)
-        print("=" * 60)
+    def print_state(self, title, out=None):
+        out = out or sys.stdout
+        print("\n" + "=" * 60, file=out)
+        print(title, file=out)
+        print("=" * 60, file=out)
         entries = self.ht.entries()
         if not entries:
-            print("  <no variables>")
+            print("  <no variables>", file=out)
             return
         for name, info in entries:
-            print(f"  {name} : {info['type']} = {repr(info['value'])}")
-        print()
-
-
-# Helper
-def literal_to_type_value(tok: Token):
-    """Infer a basic type/value from a literal token."""
-    if tok.kind == 'INTEGER':
-        return 'integer', int(tok.value)
-    if tok.kind == 'FLOAT':
-        return 'float', float(tok.value)
-    if tok.kind == 'STRING':
-        return 'string', eval(tok.value)
-    if tok.kind == 'BOOLEAN':
-        return 'boolean', tok.value == 'true'
-    if tok.kind == 'NULL':
-        return 'null', None
-    # Handle arrays and objects
-    if tok.value == '[':
-        return 'array', '<array literal>'
-    if tok.value == '{':
-        return 'object', '<object literal>'
-    # Fallback: unknown expression
-    return 'unknown', '<expression>'
-
-
-# Parser
+            print(f"  {name} : {info['type']} = {repr(info['value'])}", file=out)
+        print(file=out)
+
+
+# Helpers
+_PLACEHOLDERS = {ArrayExpr: '<array literal>', MapExpr: '<object literal>'}
+
+
+def constant_value(expr):
+    """Value of a literal, or of an array/map made only of literals.
+
+    Anything that needs evaluating is summarised by a placeholder string.
+    """
+    if isinstance(expr, LiteralExpr):
+        return expr.literal
+    if isinstance(expr, ArrayExpr):
+        if all(isinstance(e, LiteralExpr) for e in expr.elements):
+            return Array([e.literal for e in expr.elements])
+    elif isinstance(expr, MapExpr):
+        if all(isinstance(v, LiteralExpr) for _, v in expr.entries):
+            return Map([(k.literal, v.literal) for k, v in expr.entries])
+    return _PLACEHOLDERS.get(type(expr), '<expression>')
+
+
+def statement_end(tokens, start):
+    """Position just past the statement starting at `start`: its `;` or its closing `}`."""
+    depth = 0
+    for pos in range(start, len(tokens)):
+        tok = tokens[pos]
+        if tok.kind != 'OPERATOR':
+            continue
+        if tok.value == '{':
+            depth += 1
+        elif tok.value == '}':
+            depth -= 1
+            if depth <= 0:
+                return pos + 1
+        elif tok.value == ';' and depth == 0:
+            return pos + 1
+    return len(tokens)
+
+
+# Builder
 class SymbolTableBuilder:
+    """Builds the initial and updated symbol tables in one pass over the AST.
+
+    `initial` holds every `let` declaration; `st` (the updated table) also
+    applies every plain `name = expr;` assignment.  As in a program that
+    declares everything up front, an assignment wins over a declaration of
+    the same name even when the declaration comes later in the source.
+    Types are the ones `SemanticAnalyzer.infer_type` gives the expression,
+    with the types of earlier declarations and assignments in scope.
+    Function bodies are skipped: parameters and locals live in the call's
+    frame, not in the global table, even when they shadow a global.  A
+    top-level statement that does not parse is reported and skipped, and
+    collection goes on with the next one.
+    """
+
     def __init__(self, tokens):
         self.tokens = tokens
-        self.pos = 0
+        self.initial = SymbolTable()
         self.st = SymbolTable()
-
-    def _current(self):
-        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
-
-    def _advance(self):
-        self.pos += 1
-
-    def _parse_expression_until_semicolon(self):
-        """Collects tokens until the next ';' to form an expression summary."""
-        expr_tokens = []
-        while self._current() and not (self._current().kind == 'OPERATOR' and self._current().value == ';'):
-            expr_tokens.append(self._current())
-            self._advance()
-        if expr_tokens:
-            first_tok = expr_tokens[0]
-            typ, val = literal_to_type_value(first_tok)
-            return typ, val
-        return 'unknown', '<empty>'
-
-    def _expect_semicolon(self):
-        semi = self._current()
-        if not (semi and semi.kind == 'OPERATOR' and semi.value == ';'):
-            raise SyntaxError("Expected ';' after expression")
-        self._advance()
-
-    def _parse_declaration(self):
-        """Parse: let ID = <expr> ;"""
-        self._advance()  # skip 'let'
-        id_tok = self._current()
-        if not id_tok or id_tok.kind != 'IDENTIFIER' or id_tok.value in RESERVED_WORDS:
-            raise SyntaxError("Invalid identifier in declaration")
-        name = id_tok.value
-        self._advance()
-
-        eq = self._current()
-        if not (eq and eq.kind == 'OPERATOR' and eq.value == '='):
-            raise SyntaxError("Expected '=' after identifier")
-        self._advance()
-
-        typ, val = self._parse_expression_until_semicolon()
-        self.st.declare(name, typ, val)
-        self._expect_semicolon()
-
-    def _parse_assignment(self):
-        """Parse: ID = <expr> ;"""
-        id_tok = self._current()
-        if not id_tok or id_tok.kind != 'IDENTIFIER' or id_tok.value in RESERVED_WORDS:
-            raise SyntaxError("Invalid identifier in assignment")
-        name = id_tok.value
-        self._advance()
-
-        eq = self._current()
-        if not (eq and eq.kind == 'OPERATOR' and eq.value == '='):
-            raise SyntaxError("Expected '=' after identifier")
-        self._advance()
-
-        typ, val = self._parse_expression_until_semicolon()
-        self.st.assign(name, typ, val)
-        self._expect_semicolon()
-
-    def build(self):
-        # FIRST PASS: collect ALL declarations
-        while self._current():
-            cur = self._current()
-            if cur.kind == 'IDENTIFIER' and cur.value == 'let':
-                try:
-                    self._parse_declaration()
-                except Exception as e:
-                    print(f"[WARN] Skipping malformed declaration at pos {self.pos}: {e}")
-                    self._advance()
-            else:
-                self._advance()
-
-        self.st.print_state("INITIAL STATE OF SYMBOL TABLE")
-
-        # SECOND PASS: process assignments
-        self.pos = 0
-        while self._current():
-            cur = self._current()
-            if cur.kind == 'IDENTIFIER' and cur.value not in RESERVED_WORDS:
-                # peek ahead for '='
-                if (self.pos + 1 < len(self.tokens) and
-                    self.tokens[self.pos + 1].kind == 'OPERATOR' and
-                    self.tokens[self.pos + 1].value == '='):
-                    try:
-                        self._parse_assignment()
-                    except Exception as e:
-                        print(f"[WARN] Skipping malformed assignment at pos {self.pos}: {e}")
-                        self._advance()
-                else:
-                    self._advance()
-            else:
-                self._advance()
-
-        self.st.print_state("UPDATED STATE OF SYMBOL TABLE")
+        self.types = SemanticAnalyzer()
+        self.assigned = {}  # names assigned before any declaration, in order
+
+    def _declare(self, node):
+        typ = self.types.infer_type(node.expr)
+        value = constant_value(node.expr)
+        self.types.symbol_table[node.name] = {'type': typ, 'value': None}
+        self.initial.declare(node.name, typ, value)
+        if self.st.ht.get(node.name) is None:
+            self.st.declare(node.name, typ, value)
+
+    def _assign(self, node):
+        typ = self.types.infer_type(node.expr)
+        if node.name not in self.types.symbol_table:
+            self.assigned[node.name] = None
+        self.types.symbol_table[node.name] = {'type': typ, 'value': None}
+        self.st.assign(node.name, typ, constant_value(node.expr))
+
+    def parse(self):
+        """Program of every top-level statement that parses."""
+        parser = Parser(self.tokens)
+        stmts = []
+        while parser._current():
+            start = parser.pos
+            try:
+                stmts.append(parser.parse_stmt())
+            except (SyntaxError, IndexError, AttributeError) as e:
+                print(f"[WARN] Skipping malformed statement at pos {start}: {e}", file=sys.stderr)
+                parser.pos = statement_end(self.tokens, start)
+        return Program(stmts)
+
+    def collect(self):
+        """Walk the program once, filling `initial` and `st`."""
+        stack = [self.parse()]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, DeclStmt):
+                self._declare(node)
+            elif isinstance(node, AssignStmt):
+                self._assign(node)
+            elif isinstance(node, FunDecl):
+                continue
+            stack.extend(reversed(list(iter_children(node))))  # source order
+        for name in self.assigned:
+            if self.initial.ht.get(name) is None:
+                print(f"[WARN] Assigning to undeclared variable '{name}' - treating as declaration.",
+                      file=sys.stderr)
+        return self
+
+    def snapshots(self):
+        return [('initial', self.initial), ('updated', self.st)]
+
+    def build(self, fmt='text', out=None):
+        self.collect()
+        WRITERS[fmt](self.snapshots(), out or sys.stdout)
+
+
+#  Writers: each streams [(state, SymbolTable), ...] to `out`
+def plain_value(value):
+    """JSON-compatible form of a symbol value."""
+    if isinstance(value, Array):
+        return [plain_value(x) for x in value]
+    if isinstance(value, Map):
+        return {k if isinstance(k, str) else json.dumps(k): plain_value(v) for k, v in value.items()}
+    return value
+
+
+_TITLES = {'initial': "INITIAL STATE OF SYMBOL TABLE", 'updated': "UPDATED STATE OF SYMBOL TABLE"}
+
+
+def write_text(snapshots, out):
+    for state, table in snapshots:
+        table.print_state(_TITLES[state], out)
+
+
+def write_json(snapshots, out):
+    """One JSON object per line: {"state", "name", "type", "value"}."""
+    for state, table in snapshots:
+        for name, info in table.ht.entries():
+            out.write(json.dumps({'state': state, 'name': name, 'type': info['type'],
+                                  'value': plain_value(info['value'])}) + "\n")
+
+
+def write_csv(snapshots, out):
+    """Columns state,name,type,value; values are JSON-encoded."""
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(['state', 'name', 'type', 'value'])
+    for state, table in snapshots:
+        writer.writerows((state, name, info['type'], json.dumps(plain_value(info['value'])))
+                         for name, info in table.ht.entries())
+
+
+WRITERS = {'text': write_text, 'json': write_json, 'csv': write_csv}
 
 
 #  Main driver
-def main():
-    if len(sys.argv) > 1:
-        src_path = sys.argv[1]
-    else:
-        src_path = 'inputCase2.sl'
-
-    with open(src_path, 'r', encoding='utf-8') as f:
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Print the symbol table of a SwiftLang program.")
+    ap.add_argument('source', nargs='?', default='inputCase2.sl')
+    ap.add_argument('--format', choices=sorted(WRITERS), default='text',
+                    help="text (default), json (one object per line) or csv")
+    ap.add_argument('--output', help="write to this file instead of stdout")
+    args = ap.parse_args(argv)
+
+    with open(args.source, 'r', encoding='utf-8') as f:
         source = f.read()
 
     analyzer = SwiftLangAnalyzer()
@@ -200,8 +294,17 @@ def main():
     tokens = analyzer.get_tokens()
 
     builder = SymbolTableBuilder(tokens)
-    builder.build()
+    try:
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8', newline='') as out:
+                builder.build(args.format, out)
+        else:
+            builder.build(args.format)
+    except SyntaxError as e:
+        print(f"Syntax Error: {e}", file=sys.stderr)
+        return 1
+    return 0
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
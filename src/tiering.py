@@ -0,0 +1,258 @@
+# src/tiering.py
+#
+# Second execution tier: a `while` loop that has run `tier_threshold`
+# iterations in the tree-walking interpreter is translated into the source
+# of a Python function, compiled once, and run in place of the loop.
+#
+# The generated code reads and writes variables where the interpreter keeps
+# them, in frame slots and in the entries of the environment, so it can take
+# over halfway through a loop and hand control back at the loop's end with
+# nothing to copy in either direction.  Operator sites whose inline cache is
+# warm become a type guard around the native Python operator, falling back
+# to the generic operator when the guard fails.  Statements and expressions
+# with no translation (switch, try, threads, member access, ...) are left to
+# `interp.visit`, which also returns any break, continue or return signal.
+#
+# Errors keep their source lines without costing anything while nothing is
+# raised: one handler around the loop maps the generated line the error
+# came from back to the statement that line was generated for.
+#
+# A loop compiled with a `held` check (the debugger's) asks it before every
+# iteration, and once it says yes finishes the loop in the tree walker, where
+# breakpoints and stepping see every statement.
+import operator
+
+from .interpreter import BREAK, CONTINUE, UNCACHED, locate
+from .operators import BINARY_OPS, SPECIALIZED, _and, _or
+from .parser import (ArrayExpr, AssignStmt, BinaryExpr, BlockStmt, BreakStmt, CallExpr,
+                     ContinueStmt, DeclStmt, ExprStmt, ForStmt, IfStmt, IndexAssignStmt,
+                     IndexExpr, InvariantExpr, LiteralExpr, MapExpr, PrintStmt, ReturnStmt,
+                     UnaryExpr, VarExpr, WhileStmt)
+from .stdlib import BUILTINS
+from .values import Array, Map, index_get, index_set, iterate
+
+# Specialized operator implementations that are exactly a Python operator.
+NATIVE_OPS = {
+    operator.add: '+', operator.sub: '-', operator.mul: '*', operator.truediv: '/',
+    operator.mod: '%', operator.eq: '==', operator.ne: '!=', operator.lt: '<',
+    operator.gt: '>', operator.le: '<=', operator.ge: '>=', _and: 'and', _or: 'or',
+}
+
+# Literals written into the generated source as they are; others are bound by name.
+INLINE_LITERALS = (bool, int, type(None))
+
+
+def reset_invariants(invariants):
+    for invariant in invariants:
+        invariant.cached = False
+
+
+HELPERS = {
+    'Array': Array, 'Map': Map, 'BREAK': BREAK, 'CONTINUE': CONTINUE,
+    'index_get': index_get, 'index_set': index_set, 'iterate': iterate,
+    'locate': locate, 'reset_invariants': reset_invariants,
+}
+
+
+class LoopCompiler:
+    """Generates the Python source of one loop and the namespace it runs in."""
+
+    def __init__(self, loop, held=None):
+        self.loop = loop
+        self.held = held
+        self.namespace = dict(HELPERS)
+        self.bound = {}  # id(object) -> name in the namespace
+        self.globals = {}  # variable name -> local holding its environment entry
+        self.temps = 0
+        self.body = []  # (indent, code, statement) lines inside the handler
+
+    # -- names ---------------------------------------------------------------
+
+    def bind(self, value, prefix='k'):
+        name = self.bound.get(id(value))
+        if name is None:
+            name = self.bound[id(value)] = f'{prefix}{len(self.bound)}'
+            self.namespace[name] = value
+        return name
+
+    def temp(self):
+        self.temps += 1
+        return f'_t{self.temps}'
+
+    def variable(self, name, slot):
+        if slot is not None:
+            return f'frame[{slot}]'
+        entry = self.globals.get(name)
+        if entry is None:
+            entry = self.globals[name] = f'g{len(self.globals)}'
+        return f"{entry}['value']"
+
+    # -- expressions ---------------------------------------------------------
+
+    def expr(self, node):
+        kind = type(node)
+        if kind is LiteralExpr:
+            value = node.literal
+            return repr(value) if type(value) in INLINE_LITERALS else self.bind(value)
+        if kind is VarExpr:
+            return self.variable(node.name, node.slot)
+        if kind is BinaryExpr:
+            return self.binary(node)
+        if kind is InvariantExpr:
+            name = self.bind(node, 'inv')
+            return f'({name}.value if {name}.cached else visit({name}))'
+        if kind is UnaryExpr and node.op in ('-', 'not'):
+            return f'({node.op} {self.expr(node.expr)})'
+        if kind is IndexExpr:
+            return f'index_get({self.expr(node.target)}, {self.expr(node.index)})'
+        if kind is ArrayExpr:
+            return f"Array([{', '.join(self.expr(e) for e in node.elements)}])"
+        if kind is MapExpr:
+            entries = ', '.join(f'({self.expr(k)}, {self.expr(v)})' for k, v in node.entries)
+            return f'Map([{entries}])'
+        if kind is CallExpr:
+            args = ', '.join(self.expr(arg) for arg in node.args)
+            if node.builtin is not None:
+                return f'{self.bind(BUILTINS[node.builtin], "builtin")}({args})'
+            return f'call({self.expr(node.callee)}, [{args}])'
+        return f'visit({self.bind(node, "n")})'
+
+    def binary(self, node):
+        left, right = self.expr(node.left), self.expr(node.right)
+        generic = self.bind(BINARY_OPS[node.op], 'op')
+        ic = node.ic
+        if ic is None:
+            # Never run by the tree walker, like a counted loop's own test
+            # and increment: guess integers.
+            fn = SPECIALIZED.get((node.op, int, int))
+            ic = UNCACHED if fn is None else (int, int, fn)
+        if ic is UNCACHED:
+            return f'{generic}({left}, {right})'
+        ltype, rtype, fn = ic
+        guards = []
+        a = self.operand(node.left, left, ltype, guards)
+        b = self.operand(node.right, right, rtype, guards)
+        if a is None or b is None:  # a literal of another type: the guard always fails
+            return f'{generic}({left}, {right})'
+        native = NATIVE_OPS.get(fn)
+        fast = f'{a} {native} {b}' if native else f'{self.bind(fn, "op")}({a}, {b})'
+        if not guards:
+            return f'({fast})'
+        # `&` rather than `and`: the right operand is evaluated even when the
+        # left one fails its guard.
+        return f"({fast} if {' & '.join(guards)} else {generic}({a}, {b}))"
+
+    def operand(self, node, code, expected, guards):
+        """Name or literal standing for one operand, adding its type guard to `guards`."""
+        if type(node) is LiteralExpr:
+            return code if type(node.literal) is expected else None
+        name = self.temp()
+        guards.append(f'(type({name} := {code}) is {self.bind(expected, "t")})')
+        return name
+
+    # -- statements ----------------------------------------------------------
+
+    def emit(self, indent, code, stmt):
+        self.body.append((indent, code, stmt))
+
+    def block(self, node, indent):
+        stmts = node.stmts if type(node) is BlockStmt else [node]
+        if not stmts:
+            self.emit(indent, 'pass', node)
+        for stmt in stmts:
+            self.stmt(stmt, indent)
+
+    def stmt(self, node, indent):
+        kind = type(node)
+        if kind is DeclStmt or kind is AssignStmt:
+            self.emit(indent, f'{self.variable(node.name, node.slot)} = {self.expr(node.expr)}', node)
+        elif kind is IndexAssignStmt:
+            self.emit(indent, f'index_set({self.expr(node.target)}, {self.expr(node.index)}, '
+                              f'{self.expr(node.expr)})', node)
+        elif kind is ExprStmt:
+            self.emit(indent, self.expr(node.expr), node)
+        elif kind is PrintStmt:
+            self.emit(indent, f"write(format({self.expr(node.expr)}, '') + '\\n')", node)
+        elif kind is IfStmt:
+            self.emit(indent, f'if {self.expr(node.cond)}:', node)
+            self.block(node.then_body, indent + 1)
+            if node.else_body:
+                self.emit(indent, 'else:', node)
+                self.block(node.else_body, indent + 1)
+        elif kind is WhileStmt:
+            self.loop_header(node, indent)
+        elif kind is ForStmt:
+            value = self.temp()
+            self.emit(indent, f'for {value} in iterate({self.expr(node.iterable)}):', node)
+            self.emit(indent + 1, f'{self.variable(node.var, node.slot)} = {value}', node)
+            self.block(node.body, indent + 1)
+        elif kind is BlockStmt:
+            self.block(node, indent)
+        elif kind is BreakStmt:
+            self.emit(indent, 'break', node)
+        elif kind is ContinueStmt:
+            self.emit(indent, 'continue', node)
+        elif kind is ReturnStmt:
+            self.emit(indent, f'return visit({self.bind(node, "n")})', node)
+        else:
+            self.emit(indent, f'_s = visit({self.bind(node, "n")})', node)
+            self.emit(indent, 'if _s is not None:', node)
+            self.emit(indent + 1, 'if _s is BREAK: break', node)
+            self.emit(indent + 1, 'if _s is CONTINUE: continue', node)
+            self.emit(indent + 1, 'return _s', node)
+
+    def loop_header(self, node, indent):
+        # Nested loops start afresh on every entry; the loop being compiled
+        # is already running, so its invariants stay cached.
+        plan = node.plan
+        if node is not self.loop and plan is not None and plan.invariants:
+            self.emit(indent, f'reset_invariants({self.bind(plan.invariants, "invs")})', node)
+        if node is self.loop and self.held is not None:
+            # Checked before the test, so a held loop never evaluates it twice.
+            self.emit(indent, 'while True:', node)
+            self.emit(indent + 1, f'if {self.bind(self.held, "held")}(loop_stmt): '
+                                  'return interp._while(loop_stmt, False)', node)
+            self.emit(indent + 1, f'if not {self.expr(node.cond)}: break', node)
+        else:
+            self.emit(indent, f'while {self.expr(node.cond)}:', node)
+        self.block(node.body, indent + 1)
+
+    # -- assembly ------------------------------------------------------------
+
+    def source(self):
+        """Source of `loop(interp)`, and {generated line number: statement}."""
+        self.loop_header(self.loop, 2)
+        lines = ['def loop(interp):',
+                 '    frame, env, visit = interp.frame, interp.env, interp.visit',
+                 '    call, write = interp.call, interp.write']
+        lines += [f'    {entry} = env[{name!r}]' for name, entry in self.globals.items()]
+        lines.append('    try:')
+        statements = {}
+        for indent, code, stmt in self.body:
+            lines.append('    ' * indent + code)
+            statements[len(lines)] = stmt
+        lines += ['    except Exception as _e:',
+                  '        locate(_e, statements.get(_e.__traceback__.tb_lineno, loop_stmt))',
+                  '        raise']
+        return '\n'.join(lines) + '\n', statements
+
+
+def compile_loop(node, held=None):
+    """Python function running `while` loop `node` from its next test, or None.
+
+    The function takes the interpreter and returns what `visit_WhileStmt`
+    would: None, or the RETURN signal.  `held(node)`, if given, is asked
+    before every iteration; when it is true the loop goes on interpreted.
+    """
+    compiler = LoopCompiler(node, held)
+    try:
+        source, statements = compiler.source()
+        code = compile(source, f'<loop at line {node.line}>', 'exec')
+    except (SyntaxError, RecursionError):  # nested too deeply for Python
+        return None
+    namespace = compiler.namespace
+    namespace.update(statements=statements, loop_stmt=node)
+    exec(code, namespace)
+    loop = namespace['loop']
+    loop.source = source
+    return loop
@@ -1,12 +1,12 @@
 import re
-from collections import Counter, defaultdict
+import sys
 
 # === SwiftLang Language Definition ===
 RESERVED_WORDS = {
     'if', 'else', 'switch', 'case', 'default', 'while', 'do', 'for', 'in',
     'break', 'continue', 'return', 'let', 'fun', 'try', 'catch',
     'throw', 'thread', 'spawn', 'join', 'lock', 'unlock', 'print', 'read',
-    'true', 'false', 'null'
+    'import', 'true', 'false', 'null'
 }
 
 OPERATORS = {
@@ -29,14 +29,78 @@ TOKEN_SPEC = [
 ]
 
 TOKEN_REGEX = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in TOKEN_SPEC)
-SCANNER = re.compile(TOKEN_REGEX, re.DOTALL)
+
+# Compiled on first use, so importing this module stays cheap.
+_scanner = None
+
+
+def get_scanner():
+    global _scanner
+    if _scanner is None:
+        _scanner = re.compile(TOKEN_REGEX, re.DOTALL)
+    return _scanner
+
+
+def __getattr__(name):
+    if name == 'SCANNER':
+        return get_scanner()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+LITERAL_KINDS = ('STRING', 'INTEGER', 'FLOAT', 'BOOLEAN', 'NULL')
+
+ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '0': '\0', '"': '"', '\\': '\\'}
+ESCAPE_RE = re.compile(r'\\(.)', re.DOTALL)
+
+
+def decode_literal(kind, text):
+    """Runtime value of a literal token's source text."""
+    if kind == 'INTEGER':
+        return int(text)
+    if kind == 'FLOAT':
+        return float(text)
+    if kind == 'STRING':
+        body = text[1:-1]
+        if '\\' in body:
+            # Unknown escapes such as \q keep the escaped character.
+            body = ESCAPE_RE.sub(lambda m: ESCAPES.get(m.group(1), m.group(1)), body)
+        return body
+    if kind == 'BOOLEAN':
+        return text == 'true'
+    return None
+
+
+def clean_source(source_code):
+    """(lines, line numbers) of `source_code` without blank lines and `//` comments.
+
+    `line numbers` holds the 1-based source line of each kept line.
+    """
+    clean_lines = []
+    line_numbers = []
+    for number, line in enumerate(source_code.splitlines(), 1):
+        if line.strip().startswith('//') or not line.strip():
+            continue
+        line_no_comment = re.sub(r'//.*$', '', line)
+        clean_lines.append(line_no_comment)
+        line_numbers.append(number)
+    return clean_lines, line_numbers
+
 
 class Token:
-    """Simple token container used by the symbol-table program."""
-    __slots__ = ('kind', 'value')
-    def __init__(self, kind, value):
+    """Simple token container used by the symbol-table program.
+
+    Identifiers carry `id`, their index in the analyzer's `names` table, and
+    an interned `value`.  Literals carry `id`, their index in the constant
+    pool, and `literal`, the decoded value shared by every equal literal.
+    `line` is the 1-based source line the token starts on.
+    """
+    __slots__ = ('kind', 'value', 'id', 'literal', 'line')
+    def __init__(self, kind, value, id=None, literal=None, line=None):
         self.kind = kind
         self.value = value
+        self.id = id
+        self.literal = literal
+        self.line = line
 
 
 class SwiftLangAnalyzer:
@@ -45,25 +109,44 @@ class SwiftLangAnalyzer:
         self.operators = []
         self.variables = set()
         self.reserved = []
-        self.var_declared = defaultdict(int)
+        self.var_declared = {}  # name -> number of `let` declarations
         self.line_count = 0
-        self._raw_tokens = []
+        self.names = {}           # interned identifier -> id
+        self.constants = []       # constant pool: decoded literal values
+        self._constant_ids = {}   # (kind, source text) -> index in constants
+        self._tokens = []
+
+    def intern_name(self, text):
+        """Interned copy of an identifier and its id in `names`."""
+        names = self.names
+        ident = names.get(text)
+        if ident is None:
+            text = sys.intern(text)
+            ident = names[text] = len(names)
+            return text, ident
+        return sys.intern(text), ident
+
+    def add_constant(self, kind, text):
+        """Index in `constants` of the literal `text`, decoding it once."""
+        key = (kind, text)
+        index = self._constant_ids.get(key)
+        if index is None:
+            index = self._constant_ids[key] = len(self.constants)
+            self.constants.append(decode_literal(kind, text))
+        return index
 
     def analyze(self, source_code):
-        clean_lines = []
-        for line in source_code.splitlines():
-            if line.strip().startswith('//') or not line.strip():
-                continue
-            line_no_comment = re.sub(r'//.*$', '', line)
-            clean_lines.append(line_no_comment)
+        clean_lines, line_numbers = clean_source(source_code)
         self.line_count = len([l for l in clean_lines if l.strip()])
-        clean_source = '\n'.join(clean_lines)
+        text = '\n'.join(clean_lines)
 
         pos = 0
+        row = 0  # index into line_numbers of the current position
         let_next = False
+        scan = get_scanner().match
 
-        while pos < len(clean_source):
-            match = SCANNER.match(clean_source, pos)
+        while pos < len(text):
+            match = scan(text, pos)
             if not match:
                 pos += 1
                 continue
@@ -73,38 +156,49 @@ class SwiftLangAnalyzer:
             pos = match.end()
 
             if kind in ('WHITESPACE', 'COMMENT_BLOCK', 'COMMENT_LINE'):
+                row += value.count('\n')
                 continue
-            
-            self._raw_tokens.append((kind, value))
 
-            if kind in ('STRING', 'INTEGER', 'FLOAT', 'BOOLEAN', 'NULL'):
+            line = line_numbers[row]
+            if kind in LITERAL_KINDS:
+                index = self.add_constant(kind, value)
+                self._tokens.append(Token(kind, value, index, self.constants[index], line))
                 self.literals.append(value)
+                if kind == 'STRING':
+                    row += value.count('\n')
                 continue
 
             if kind == 'OPERATOR':
+                self._tokens.append(Token(kind, value, line=line))
                 self.operators.append(value)
                 let_next = False
                 continue
 
             if kind == 'IDENTIFIER':
+                value, ident = self.intern_name(value)
+                self._tokens.append(Token(kind, value, ident, line=line))
                 if value in RESERVED_WORDS:
                     self.reserved.append(value)
                     let_next = (value == 'let')
                 else:
                     if let_next:
                         self.variables.add(value)
-                        self.var_declared[value] += 1
+                        self.var_declared[value] = self.var_declared.get(value, 0) + 1
                         let_next = False
                     else:
                         self.variables.add(value)
                 continue
 
+            self._tokens.append(Token(kind, value, line=line))
+
         self.variables = sorted(self.variables)
     
     def get_tokens(self):
-        return [Token(kind, value) for kind, value in self._raw_tokens]
+        return list(self._tokens)
 
     def generate_report(self):
+        from collections import Counter
+
         lines = []
         lines.append("=" * 60)
         lines.append("SWIFTLANG SOURCE CODE ANALYSIS REPORT")
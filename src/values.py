@@ -0,0 +1,501 @@
+# src/values.py
+"""Runtime representations of SwiftLang's compound values."""
+import operator
+from array import array
+from bisect import bisect_right
+from itertools import repeat
+
+
+def format_value(value):
+    """Text of `value` inside a printed container (strings are quoted)."""
+    if isinstance(value, (str, Rope)):
+        return '"' + str(value) + '"'
+    return str(value)
+
+
+# Concatenations producing at least this many characters build a Rope;
+# shorter strings are cheaper to copy than to track as pieces.
+ROPE_MIN_LENGTH = 256
+
+
+def _on_text(op, reflected=False):
+    """Rope method applying `op` to the joined text, so a rope acts exactly like its str."""
+    if reflected:
+        return lambda self, other: op(other, str(self))
+    return lambda self, other: op(str(self), other)
+
+
+class Rope:
+    """String built by repeated `+`, joined only when its text is needed.
+
+    Every rope covers the first `count` pieces of a `parts` list, and
+    `offsets[k]` is the length of the first k + 1 pieces.  Appending to the
+    rope that covers the whole list pushes onto the shared lists instead of
+    copying them, so `s = s + piece` in a loop is amortized O(1).  Indexing
+    bisects the offsets; printing, comparing, hashing and every operator
+    but `+` join the pieces once and cache the text.
+    """
+    __slots__ = ('parts', 'offsets', 'count', '_flat')
+
+    def __init__(self, parts, offsets, count):
+        self.parts = parts
+        self.offsets = offsets
+        self.count = count
+        self._flat = None
+
+    @classmethod
+    def of(cls, left, right):
+        """Concatenate two strings or ropes."""
+        if type(left) is Rope:
+            return left.append(right)
+        if type(right) is not Rope:
+            return cls([left, right], [len(left), len(left) + len(right)], 2)
+        count = right.count
+        shift = len(left)
+        offsets = [shift] + [shift + n for n in right.offsets[:count]]
+        return cls([left] + right.parts[:count], offsets, count + 1)
+
+    def append(self, text):
+        if type(text) is Rope:
+            text = str(text)
+        parts, offsets, count = self.parts, self.offsets, self.count
+        end = offsets[count - 1] + len(text)
+        if len(parts) == count:
+            parts.append(text)
+            # list.append is atomic; if another thread appended to the same
+            # list first, our piece is not at `count` and we need a copy.
+            # Only the thread that wins the slot extends `offsets`.
+            if parts[count] is text:
+                offsets.append(end)
+                return Rope(parts, offsets, count + 1)
+        return Rope(parts[:count] + [text], offsets[:count] + [end], count + 1)
+
+    def char_at(self, index):
+        """`str(self)[index]` without joining the pieces."""
+        flat = self._flat
+        if flat is not None:
+            return flat[index]
+        offsets = self.offsets
+        k = bisect_right(offsets, index, 0, self.count)
+        return self.parts[k][index - offsets[k - 1] if k else index]
+
+    def __str__(self):
+        flat = self._flat
+        if flat is None:
+            flat = self._flat = ''.join(self.parts[:self.count])
+        return flat
+
+    def __repr__(self):
+        return repr(str(self))
+
+    def __len__(self):
+        return self.offsets[self.count - 1]
+
+    def __bool__(self):
+        return self.offsets[self.count - 1] > 0
+
+    def __iter__(self):
+        return iter(str(self))
+
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __reduce__(self):
+        return (str, (str(self),))
+
+    def __add__(self, other):
+        if isinstance(other, (str, Rope)):
+            return self.append(other)
+        return NotImplemented
+
+    def __radd__(self, other):
+        if isinstance(other, str):
+            return Rope.of(other, self)
+        return NotImplemented
+
+    def _compare(self, other, op):
+        if isinstance(other, (str, Rope)):
+            return op(str(self), str(other))
+        return NotImplemented
+
+    def __eq__(self, other):
+        return self._compare(other, operator.eq)
+
+    def __ne__(self, other):
+        return self._compare(other, operator.ne)
+
+    def __lt__(self, other):
+        return self._compare(other, operator.lt)
+
+    def __le__(self, other):
+        return self._compare(other, operator.le)
+
+    def __gt__(self, other):
+        return self._compare(other, operator.gt)
+
+    def __ge__(self, other):
+        return self._compare(other, operator.ge)
+
+    # Results, and errors, are those of the same operator on a str.
+    __mul__ = _on_text(operator.mul)
+    __rmul__ = _on_text(operator.mul, reflected=True)
+    __mod__ = _on_text(operator.mod)
+    __rmod__ = _on_text(operator.mod, reflected=True)
+    __sub__ = _on_text(operator.sub)
+    __rsub__ = _on_text(operator.sub, reflected=True)
+    __truediv__ = _on_text(operator.truediv)
+    __rtruediv__ = _on_text(operator.truediv, reflected=True)
+
+    def __neg__(self):
+        return -str(self)
+
+
+def concat(left, right):
+    """`left + right` for two Python strings, as a Rope once the result is long."""
+    if len(left) + len(right) < ROPE_MIN_LENGTH:
+        return left + right
+    return Rope([left, right], [len(left), len(left) + len(right)], 2)
+
+
+def add(left, right):
+    """The `+` operator: string concatenation goes through ropes."""
+    if type(left) is str and type(right) is str:
+        return concat(left, right)
+    return left + right
+
+
+def _is_number(value):
+    return type(value) is int or type(value) is float
+
+
+def _pack(items):
+    """Store homogeneous ints/floats in a typed buffer, anything else in a list."""
+    items = list(items)
+    if items:
+        first = type(items[0])
+        if first in (int, float) and all(type(x) is first for x in items):
+            try:
+                return array('q' if first is int else 'd', items)
+            except OverflowError:
+                pass  # ints beyond 64 bits stay arbitrary-precision
+    return items
+
+
+class Array:
+    """Ordered, mutable sequence; numeric arrays live in `array.array` buffers.
+
+    Element-wise `+ - * /` runs through `map` over `operator` functions, so the
+    per-element loop happens in C rather than in the tree-walking interpreter.
+    """
+    __slots__ = ('data',)
+    __hash__ = None
+
+    def __init__(self, items=()):
+        self.data = _pack(items)
+
+    @classmethod
+    def _wrap(cls, data):
+        arr = cls.__new__(cls)
+        arr.data = data
+        return arr
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def _check_index(self, index):
+        if type(index) is not int:
+            raise TypeError(f"array index must be an integer, got {index!r}")
+        if not 0 <= index < len(self.data):
+            raise IndexError(f"array index {index} out of range (length {len(self.data)})")
+
+    def get(self, index):
+        self._check_index(index)
+        return self.data[index]
+
+    def set(self, index, value):
+        self._check_index(index)
+        data = self.data
+        if type(data) is array:
+            if (data.typecode == 'q') == (type(value) is int) and _is_number(value):
+                try:
+                    data[index] = value
+                    return
+                except OverflowError:
+                    pass
+            # The new element no longer fits the buffer's type.
+            data = self.data = data.tolist()
+        data[index] = value
+
+    def __eq__(self, other):
+        if not isinstance(other, Array):
+            return NotImplemented
+        return len(self.data) == len(other.data) and list(self.data) == list(other.data)
+
+    def __str__(self):
+        return '[' + ', '.join(format_value(x) for x in self.data) + ']'
+
+    __repr__ = __str__
+
+    def _elementwise(self, op, other, reflected=False):
+        if isinstance(other, Array):
+            if len(other.data) != len(self.data):
+                raise ValueError(f"array length mismatch ({len(self.data)} vs {len(other.data)})")
+            rhs, rhs_kind = other.data, _typecode(other.data)
+        elif _is_number(other):
+            rhs, rhs_kind = repeat(other, len(self.data)), 'q' if type(other) is int else 'd'
+        else:
+            return NotImplemented
+        lhs, lhs_kind = self.data, _typecode(self.data)
+        if reflected:
+            lhs, rhs = rhs, lhs
+        results = map(op, lhs, rhs)
+
+        if lhs_kind is None or rhs_kind is None:
+            return Array(results)
+        if lhs_kind == 'q' and rhs_kind == 'q' and op is not operator.truediv:
+            values = list(results)
+            try:
+                return Array._wrap(array('q', values))
+            except OverflowError:
+                return Array._wrap(values)
+        return Array._wrap(array('d', results))
+
+    def __add__(self, other):
+        return self._elementwise(operator.add, other)
+
+    def __radd__(self, other):
+        return self._elementwise(operator.add, other, reflected=True)
+
+    def __sub__(self, other):
+        return self._elementwise(operator.sub, other)
+
+    def __rsub__(self, other):
+        return self._elementwise(operator.sub, other, reflected=True)
+
+    def __mul__(self, other):
+        return self._elementwise(operator.mul, other)
+
+    def __rmul__(self, other):
+        return self._elementwise(operator.mul, other, reflected=True)
+
+    def __truediv__(self, other):
+        return self._elementwise(operator.truediv, other)
+
+    def __rtruediv__(self, other):
+        return self._elementwise(operator.truediv, other, reflected=True)
+
+
+def _typecode(data):
+    return data.typecode if type(data) is array else None
+
+
+class Shape:
+    """Hidden class: the ordered key set shared by maps built the same way.
+
+    Maps created by the same literal, or extended by the same `.field = ...`
+    assignments, share one Shape, so a `.field` site that has seen a shape
+    once can read the slot directly without hashing the key again.
+    """
+    __slots__ = ('keys', 'index', 'transitions')
+
+    def __init__(self, keys=(), index=None):
+        self.keys = keys
+        self.index = index if index is not None else {}  # key -> slot
+        self.transitions = {}  # key -> Shape with that key appended
+
+    def with_key(self, key):
+        child = self.transitions.get(key)
+        if child is None:
+            index = dict(self.index)
+            index[key] = len(self.keys)
+            child = self.transitions[key] = Shape(self.keys + (key,), index)
+        return child
+
+
+_MISSING = object()
+EMPTY_SHAPE = Shape()
+# Shared by every map in dictionary mode; its index is always empty, so a
+# `.field` cache can never be primed with it.
+DICTIONARY_SHAPE = Shape()
+
+# Maps with more keys than this, or that gain keys through computed
+# `m[expr] = v` stores, switch to a plain dict instead of growing shapes.
+MAX_SHAPE_KEYS = 32
+
+
+class Map:
+    """Keyed collection backed by native dicts (shape index or dictionary mode)."""
+    __slots__ = ('shape', 'slots', 'table')
+    __hash__ = None
+
+    def __init__(self, pairs=()):
+        self.shape = EMPTY_SHAPE
+        self.slots = []
+        self.table = None  # dict once in dictionary mode
+        for key, value in pairs:
+            self.set_field(key, value)
+
+    def __reduce__(self):
+        # Rebuild from items so pickling never drags the shape tree along.
+        return (_rebuild_map, (list(self.items()), self.table is not None))
+
+    def _to_dictionary_mode(self):
+        self.table = dict(zip(self.shape.keys, self.slots))
+        self.shape = DICTIONARY_SHAPE
+        self.slots = None
+
+    def get(self, key):
+        if type(key) is Rope:
+            key = str(key)
+        table = self.table
+        if table is not None:
+            value = table.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+        else:
+            slot = self.shape.index.get(key)
+            if slot is not None:
+                return self.slots[slot]
+        raise LookupError(f"key {format_value(key)} not found in map")
+
+    def has(self, key):
+        if type(key) is Rope:
+            key = str(key)
+        return key in (self.table if self.table is not None else self.shape.index)
+
+    def set(self, key, value):
+        """Store under a computed key; new keys switch the map to dictionary mode."""
+        if type(key) is Rope:
+            key = str(key)
+        if self.table is None:
+            slot = self.shape.index.get(key)
+            if slot is not None:
+                self.slots[slot] = value
+                return
+            self._to_dictionary_mode()
+        self.table[key] = value
+
+    def set_field(self, key, value):
+        """Store under a key written in the source (`.field` or a literal)."""
+        if type(key) is Rope:
+            key = str(key)
+        if self.table is None:
+            slot = self.shape.index.get(key)
+            if slot is not None:
+                self.slots[slot] = value
+                return
+            if len(self.slots) < MAX_SHAPE_KEYS:
+                self.shape = self.shape.with_key(key)
+                self.slots.append(value)
+                return
+            self._to_dictionary_mode()
+        self.table[key] = value
+
+    def keys(self):
+        return list(self.table) if self.table is not None else list(self.shape.keys)
+
+    def items(self):
+        if self.table is not None:
+            return list(self.table.items())
+        return list(zip(self.shape.keys, self.slots))
+
+    def __len__(self):
+        return len(self.table) if self.table is not None else len(self.slots)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __eq__(self, other):
+        if not isinstance(other, Map):
+            return NotImplemented
+        return dict(self.items()) == dict(other.items())
+
+    def __str__(self):
+        return '{' + ', '.join(f"{format_value(k)}: {format_value(v)}" for k, v in self.items()) + '}'
+
+    __repr__ = __str__
+
+
+def _rebuild_map(items, dictionary_mode):
+    if not dictionary_mode:
+        return Map(items)
+    m = Map()
+    m._to_dictionary_mode()
+    m.table.update(items)
+    return m
+
+
+class Function:
+    """A `fun` declaration bound to the globals of the program that defined it."""
+    __slots__ = ('name', 'params', 'body', 'nslots', 'locals', 'env')
+
+    def __init__(self, decl, env):
+        self.name = decl.name
+        self.params = decl.params
+        self.body = decl.body
+        self.nslots = decl.nslots
+        self.locals = decl.locals  # {name: frame slot}, for the debugger
+        self.env = env
+
+    def __str__(self):
+        return f"<fun {self.name}/{len(self.params)}>"
+
+    __repr__ = __str__
+
+
+class Module:
+    """An imported module: its own globals, set up by running its top level once."""
+    __slots__ = ('name', 'env')
+
+    def __init__(self, name, env):
+        self.name = name
+        self.env = env
+
+    def get(self, name):
+        entry = self.env.get(name)
+        if entry is None:
+            raise AttributeError(f"module '{self.name}' has no member '{name}'")
+        return entry['value']
+
+    def __str__(self):
+        return f"<module {self.name}>"
+
+    __repr__ = __str__
+
+
+def iterate(value):
+    """Python iterable for `for x in value`: ranges, arrays, map keys, strings."""
+    if isinstance(value, (range, Array, str)):
+        return value
+    if isinstance(value, Rope):
+        return str(value)
+    if isinstance(value, Map):
+        return value.keys()  # snapshot: the body may add keys
+    raise TypeError(f"cannot iterate over {value!r}")
+
+
+def index_get(container, index):
+    """Evaluate `container[index]`."""
+    if isinstance(container, (Array, Map)):
+        return container.get(index)
+    if isinstance(container, (str, Rope)):
+        if type(index) is not int:
+            raise TypeError(f"string index must be an integer, got {index!r}")
+        if not 0 <= index < len(container):
+            raise IndexError(f"string index {index} out of range (length {len(container)})")
+        if type(container) is Rope:
+            return container.char_at(index)
+        return container[index]
+    raise TypeError(f"value {container!r} is not indexable")
+
+
+def index_set(container, index, value):
+    """Execute `container[index] = value`."""
+    if isinstance(container, (Array, Map)):
+        container.set(index, value)
+        return
+    raise TypeError(f"value {container!r} does not support item assignment")
@@ -0,0 +1,52 @@
+import io
+import json
+import contextlib
+
+from src import batch
+
+
+def write(tmp_path, name, source):
+    path = tmp_path / name
+    path.write_text(source, encoding="utf-8")
+    return str(path)
+
+
+def test_run_batch_captures_output_per_file_in_order(tmp_path):
+    paths = [
+        write(tmp_path, "a.sl", "let x = 1; print(x);"),
+        write(tmp_path, "b.sl", "let y = 2; print(y + 1);"),
+        write(tmp_path, "bad.sl", "print(missing);"),
+    ]
+    results = batch.run_batch(paths, workers=2)
+
+    assert [r["path"] for r in results] == paths
+    assert [r["status"] for r in results] == ["ok", "ok", "Semantic Error"]
+    assert results[0]["output"].splitlines() == ["1"]
+    assert results[1]["output"].splitlines() == ["3"]
+    assert "Undeclared variable: missing" in results[2]["error"]
+    assert all(r["elapsed"] >= 0 for r in results)
+
+
+def test_load_manifest_resolves_relative_paths_and_skips_comments(tmp_path):
+    write(tmp_path, "one.sl", "print(1);")
+    manifest = tmp_path / "jobs.txt"
+    manifest.write_text("# nightly\none.sl\n\n", encoding="utf-8")
+    assert batch.load_manifest(str(manifest)) == [str(tmp_path / "one.sl")]
+
+
+def test_batch_main_writes_summary_and_outputs(tmp_path):
+    ok = write(tmp_path, "ok.sl", "print(\"hi\");")
+    bad = write(tmp_path, "bad.sl", "let = 1;")
+    summary = tmp_path / "summary.json"
+    out_dir = tmp_path / "out"
+
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        code = batch.main([ok, bad, "--workers", "1",
+                           "--summary-json", str(summary), "--output-dir", str(out_dir)])
+
+    assert code == 1
+    assert "2 programs: 1 ok, 1 failed" in buf.getvalue()
+    data = json.loads(summary.read_text(encoding="utf-8"))
+    assert [r["status"] for r in data["results"]] == ["ok", "Syntax Error"]
+    assert (out_dir / "00000_ok.out").read_text(encoding="utf-8") == "hi\n"
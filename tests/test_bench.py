@@ -0,0 +1,57 @@
+import io
+import json
+import contextlib
+
+from src import bench
+
+
+SOURCE = """\
+let i = 0;
+while (i < 10) {
+    print(i);
+    i = i + 1;
+}
+"""
+
+
+def test_bench_source_reports_every_phase_and_counts():
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        report = bench.bench_source(SOURCE, runs=3)
+
+    assert buf.getvalue() == ""  # program output is suppressed
+    assert report["runs"] == 3
+    for phase in bench.PHASES:
+        stats = report["phases"][phase]
+        assert 0 <= stats["min"] <= stats["median"] <= stats["p95"]
+        assert stats["peak_bytes"] >= 0
+    # 1 declaration + 1 while + 10 iterations of (block + print); the
+    # optimizer turns `i = i + 1` into a native counter update
+    assert report["counts"]["statements"] == 22
+    assert report["counts"]["tokens"] == 24
+    assert report["throughput"]["statements_per_second"] > 0
+
+
+def test_bench_main_writes_json_report(tmp_path):
+    program = tmp_path / "loop.sl"
+    program.write_text(SOURCE, encoding="utf-8")
+    out = tmp_path / "report.json"
+    assert bench.main(["2", str(program), "--format", "json", "--output", str(out)]) == 0
+    data = json.loads(out.read_text(encoding="utf-8"))
+    assert data["file"] == str(program)
+    assert set(data["phases"]) == set(bench.PHASES)
+    assert data["tier_ups"] == []  # ten iterations are not enough to compile the loop
+
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        assert bench.main(["1", str(program)]) == 0
+    assert "statements executed" in buf.getvalue()
+
+
+def test_bench_main_resolves_imports_from_the_program_directory(tmp_path):
+    (tmp_path / "util.sl").write_text("let step = 2;", encoding="utf-8")
+    program = tmp_path / "main.sl"
+    program.write_text("import util;\nlet x = util.step;\n", encoding="utf-8")
+    out = tmp_path / "report.json"
+    assert bench.main(["1", str(program), "--format", "json", "--output", str(out)]) == 0
+    assert json.loads(out.read_text(encoding="utf-8"))["counts"]["statements"] == 3
@@ -0,0 +1,151 @@
+import io
+import os
+import contextlib
+
+import pytest
+
+from src import checkpoint, modules
+from src.checkpoint import CheckpointError, CheckpointingInterpreter, CheckpointStop
+from src.pipeline import compile_source, run_source
+
+PROGRAM = """\
+let total = 0;
+let rows = 0;
+let i = 0;
+while (i < 4) {
+    let j = 0;
+    while (j < 3) {
+        if ((i + j) % 2 == 0) {
+            total = total + i * j;
+            print(total);
+        } else {
+            rows = rows * 10 + j;
+            print(rows);
+        }
+        j = j + 1;
+    }
+    i = i + 1;
+}
+print(total);
+"""
+
+
+class Preempted(CheckpointingInterpreter):
+    """Receives a stop request after its `after`th line of output."""
+    after = None
+
+    def write(self, text):
+        super().write(text)
+        self.after -= 1
+        if self.after == 0:
+            self.request_stop()
+
+
+def run_until_stopped(source, path, snapshot, after):
+    """(output, finished) of one run that resumes from and stops into `snapshot`."""
+    resume = checkpoint.load_snapshot(snapshot) if os.path.exists(snapshot) else None
+    ast, symtab = compile_source(source, path)
+    interp = Preempted(symtab, snapshot, checkpoint.fingerprint(source), resume)
+    interp.after = after
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        try:
+            interp.interpret(ast)
+            finished = True
+        except CheckpointStop:
+            finished = False
+    return out.getvalue().splitlines(), finished
+
+
+def expected_output(source, path=None):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        run_source(source, path)
+    return out.getvalue().splitlines()
+
+
+@pytest.mark.parametrize("after", [1, 2, 5])
+def test_resumed_runs_continue_where_the_snapshot_was_taken(tmp_path, after):
+    snapshot = str(tmp_path / "prog.ckpt")
+    output, runs = [], 0
+    while True:
+        lines, finished = run_until_stopped(PROGRAM, None, snapshot, after)
+        output += lines
+        runs += 1
+        if finished:
+            break
+    assert output == expected_output(PROGRAM)
+    assert runs > 1
+
+
+def test_functions_shared_arrays_and_modules_survive_a_restart(tmp_path):
+    modules.clear_cache()
+    (tmp_path / "counter.sl").write_text(
+        'let calls = 0;\nfun bump() { calls = calls + 1; return calls; }\nprint("loaded");\n',
+        encoding="utf-8")
+    source = """\
+import counter;
+fun double(x) { return x * 2; }
+let f = double;
+let a = [1, 2];
+let b = a;
+let m = {"k": 1};
+let i = 0;
+while (i < 3) {
+    a[0] = a[0] + f(counter.bump());
+    print(b[0]);
+    i = i + 1;
+}
+print(counter.calls);
+print(m["k"]);
+"""
+    path = str(tmp_path / "main.sl")
+    snapshot = str(tmp_path / "main.ckpt")
+    first, finished = run_until_stopped(source, path, snapshot, 2)
+    assert not finished
+    second, finished = run_until_stopped(source, path, snapshot, 100)
+    assert finished
+    # the module's top level does not run again, and `b` still aliases `a`
+    assert first == ["loaded", "3"]
+    assert second == ["7", "13", "3", "1"]
+
+
+def test_loops_without_braces_are_checkpointed_between_iterations(tmp_path):
+    source = """\
+fun show(x) { print(x); return 1; }
+let i = 0;
+while (i < 5) i = i + show(i);
+print("done");
+"""
+    snapshot = str(tmp_path / "prog.ckpt")
+    first, finished = run_until_stopped(source, None, snapshot, 2)
+    assert not finished
+    second, finished = run_until_stopped(source, None, snapshot, 100)
+    assert finished
+    assert first == ["0", "1"]
+    assert second == ["2", "3", "4", "done"]
+
+
+def test_snapshots_are_written_atomically_and_checked_against_the_source(tmp_path):
+    path = tmp_path / "prog.sl"
+    path.write_text(PROGRAM, encoding="utf-8")
+    snapshot = str(tmp_path / "prog.sl.ckpt")
+    run_until_stopped(PROGRAM, None, snapshot, 3)
+    # no temporary files are left behind
+    assert sorted(os.listdir(tmp_path)) == ["prog.sl", "prog.sl.ckpt"]
+
+    with pytest.raises(CheckpointError, match="different version"):
+        checkpoint.run_checkpointed(PROGRAM + "print(0);", str(path), snapshot,
+                                    log=io.StringIO())
+
+    out, log = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(out):
+        assert checkpoint.run_checkpointed(PROGRAM, str(path), snapshot, log=log)
+    assert "Resuming from checkpoint" in log.getvalue()
+    assert out.getvalue().splitlines() == expected_output(PROGRAM)[3:]
+    assert not os.path.exists(snapshot)
+
+    with open(snapshot, "wb") as f:
+        f.write(b"garbage")
+    with pytest.raises(CheckpointError, match="not a SwiftLang checkpoint"):
+        checkpoint.load_snapshot(snapshot)
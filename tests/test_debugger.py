@@ -0,0 +1,134 @@
+import io
+import contextlib
+
+from src.debugger import BreakpointStmt, DebugInterpreter, Debugger, compile_for_debugging
+from src.interpreter import Interpreter
+from src.parser import WhileStmt
+
+SOURCE = """\
+fun fact(n) {
+    let r = 1;
+    while (n > 1) {
+        r = r * n;
+        n = n - 1;
+    }
+    return r;
+}
+let total = 0;
+let i = 1;
+while (i <= 3) {
+    total = total + fact(i);
+    i = i + 1;
+}
+print(total);
+"""
+
+
+def debug(commands, breakpoints=(), stop_at_start=False):
+    """(debugger output lines, program output lines, finished) for a scripted session."""
+    ast, symbol_table = compile_for_debugging(SOURCE)
+    out = io.StringIO()
+    feed = iter(commands)
+
+    def read(prompt):
+        try:
+            return next(feed)
+        except StopIteration:
+            raise EOFError
+
+    debugger = Debugger(SOURCE, ast, symbol_table, read=read, out=out)
+    for line in breakpoints:
+        assert debugger.add_breakpoint(line)
+    program = io.StringIO()
+    with contextlib.redirect_stdout(program):
+        finished = debugger.run(stop_at_start=stop_at_start)
+    return out.getvalue().splitlines(), program.getvalue().splitlines(), finished
+
+
+def stops(lines):
+    return [int(line.split()[3].rstrip(':')) for line in lines if line.startswith("Stopped at")]
+
+
+def test_breakpoints_inspection_and_watches():
+    lines, program, finished = debug(
+        ["vars", "print r * 10", "watch n", "bt", "delete 4", "continue"], breakpoints=[4])
+    assert finished and program == ["9"]
+    assert stops(lines) == [4]
+    assert lines[1:7] == ["Locals of fact:", "  n = 2", "  r = 1",
+                          "Globals:", "  total = 1", "  i = 2"]
+    assert "r * 10 = 10" in lines
+    assert "1: n = 2" in lines
+    assert lines[lines.index("1: n = 2") + 1:][:2] == ["  #0 fact(n)", "  #1 <program>"]
+
+
+def test_step_next_and_finish():
+    lines, program, finished = debug(
+        ["next", "next", "next", "step", "step", "finish", "next", "quit"], stop_at_start=True)
+    assert not finished and lines[-1] == "Program stopped."
+    # 9 to 12 at the top level; `step` enters fact() at 2 and goes on to 3;
+    # `finish` stops at the caller's next statement, and `next` at the loop
+    # body's first statement in the following iteration.
+    assert stops(lines) == [9, 10, 11, 12, 2, 3, 13, 12]
+
+
+def test_no_breakpoints_means_the_plain_interpreter_code_path():
+    ast, symbol_table = compile_for_debugging(SOURCE)
+    debugger = Debugger(SOURCE, ast, symbol_table)
+    loop = ast.stmts[0].body.stmts[1]
+    loop_body = loop.body.stmts
+    original = list(loop_body)
+    assert loop.plan.induction is not None  # optimized as in a normal run
+
+    assert debugger.add_breakpoint(4)
+    # the counted loop's copy of its body is patched too, and the loop is held
+    assert isinstance(loop.plan.induction.body.stmts[0], BreakpointStmt)
+    assert debugger.holds(loop)
+    assert debugger.remove_breakpoint(4)
+    assert loop.plan.induction.body.stmts[0] is original[0] and not debugger.holds(loop)
+
+    assert debugger.add_breakpoint(5)
+    assert isinstance(loop_body[1], BreakpointStmt) and loop_body[1].stmt is original[1]
+    assert not debugger.add_breakpoint(6)  # only a closing brace
+    assert debugger.remove_breakpoint(5)
+    assert loop_body == original
+
+    # Without breakpoints or stepping, every node goes through Interpreter.visit.
+    assert DebugInterpreter.visit is Interpreter.visit
+    interp = DebugInterpreter(symbol_table, debugger)
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        interp.interpret(ast)
+    assert out.getvalue() == "9\n" and type(interp) is DebugInterpreter
+
+
+HOT_SOURCE = """\
+fun mark(k) {
+    return k;
+}
+let i = 0;
+let hits = 0;
+while (i < 3000) {
+    if (i == 2500) { hits = hits + mark(i); }
+    hits = hits + 1;
+    i = i + 1;
+}
+print(hits);
+"""
+
+
+def test_hot_loops_are_compiled_until_a_breakpoint_holds_them():
+    ast, symbol_table = compile_for_debugging(HOT_SOURCE)
+    [loop] = [stmt for stmt in ast.stmts if isinstance(stmt, WhileStmt)]
+    out = io.StringIO()
+    feed = iter(["break 8", "continue", "print i", "delete 8", "continue"])
+    debugger = Debugger(HOT_SOURCE, ast, symbol_table, read=lambda prompt: next(feed), out=out)
+    assert debugger.add_breakpoint(2)
+    program = io.StringIO()
+    with contextlib.redirect_stdout(program):
+        assert debugger.run(stop_at_start=False)
+    assert program.getvalue() == "5500\n"
+    assert loop.compiled is not None
+    # the breakpoint set inside the running compiled loop stops it at its next iteration
+    lines = out.getvalue().splitlines()
+    assert stops(lines) == [2, 8]
+    assert "i = 2501" in lines
+    assert not debugger.held_loops
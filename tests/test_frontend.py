@@ -0,0 +1,112 @@
+import io
+import contextlib
+
+import pytest
+
+from src import frontend, pipeline
+from src.frontend import parse_parallel, split_source
+from src.parser import ASTNode
+from src.pipeline import PipelineError, compile_source, execute, parse, tokenize
+
+SOURCE = """\
+let total = 0;
+fun add(a, b) {
+    return a + b;
+}
+// a comment with a brace {
+let text = "one;
+}
+two";
+/* a block comment
+   let hidden = 1;
+}
+*/
+if (total == 0) {
+    total = add(total, 1);
+}
+else {
+    total = -1;
+}
+try {
+    throw 5;
+}
+catch (err) {
+    total = total + err;
+}
+let items = [
+    1,
+    2
+];
+let i = 0;
+while (i < 3) {
+    total = total + items[i % 2];
+    i = i + 1;
+}
+print(total);
+print(text);
+"""
+
+
+def dump(node):
+    """Comparable form of an AST: node types, fields and lines."""
+    if isinstance(node, (list, tuple)):
+        return [dump(item) for item in node]
+    if isinstance(node, ASTNode):
+        return (type(node).__name__, node.line, {k: dump(v) for k, v in vars(node).items()})
+    return node
+
+
+def output_of(ast, symbol_table):
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        execute(ast, symbol_table)
+    return buf.getvalue()
+
+
+def test_split_source_cuts_only_between_top_level_statements():
+    pieces = split_source(SOURCE, 100)
+    assert "".join(text for _, text in pieces) == SOURCE
+    lines = SOURCE.splitlines()
+    starts = [offset for offset, _ in pieces]
+    assert starts[0] == 0
+    for offset, text in pieces:
+        assert text.startswith(lines[offset])
+    # never inside the string, the comments, a block or a bracketed list, nor
+    # before else/catch; a line ending in `*/` is not trusted to end a statement
+    assert starts == [0, 1, 4, 18, 24, 28, 29, 33, 34]
+
+
+def test_parallel_front_end_builds_the_same_program():
+    source = SOURCE * 3
+    sequential = parse(tokenize(source))
+    parallel = parse_parallel(source, 2)
+    assert dump(parallel) == dump(sequential)
+
+
+def test_large_sources_go_through_the_parallel_front_end(monkeypatch):
+    calls = []
+
+    def spy(source, workers):
+        calls.append(workers)
+        return parse_parallel(source, workers)
+
+    monkeypatch.setattr(frontend, "parse_parallel", spy)
+    monkeypatch.setattr(pipeline, "PARALLEL_PARSE_CHARS", len(SOURCE))
+    monkeypatch.setattr(pipeline, "parse_workers", 2)
+    ast, symbol_table = compile_source(SOURCE)
+    assert output_of(ast, symbol_table) == "10\none;\n}\ntwo\n"
+    assert calls == [2]
+
+    # declarations are still checked across pieces
+    with pytest.raises(PipelineError, match="Duplicate declaration: total"):
+        compile_source(SOURCE + "let total = 3;\n")
+
+
+def test_errors_are_reported_like_the_sequential_front_end():
+    source = SOURCE + "let broken = (1 + 2;\nprint(1);\n"
+    with pytest.raises(PipelineError) as sequential:
+        parse(tokenize(source))
+    with pytest.raises(PipelineError) as parallel:
+        parse_parallel(source, 2)
+    assert (parallel.value.label, str(parallel.value)) == \
+        (sequential.value.label, str(sequential.value))
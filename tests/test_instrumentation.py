@@ -0,0 +1,82 @@
+import io
+import json
+import socket
+import threading
+import contextlib
+
+import pytest
+
+from src.interpreter import Interpreter
+from src.pipeline import PipelineError, compile_source
+from src.instrumentation import EventBus, MetricsCollector, instrument, run_source, run_with_metrics
+
+
+SOURCE = """\
+let i = 0;
+while (i < 3) {
+    print(i);
+    i = i + 1;
+}
+let t = spawn { print("child"); };
+join(t);
+"""
+
+
+def test_instrument_without_subscribers_leaves_interpreter_untouched():
+    ast, symtab = compile_source(SOURCE)
+    bus = EventBus()
+    bus.subscribe("phase_end", lambda event, data: None)
+    interp = instrument(Interpreter(symtab), bus, ast)
+    assert type(interp) is Interpreter and "bus" not in vars(interp)
+
+
+def test_collector_counts_statements_loops_and_output_including_spawned_blocks():
+    bus = EventBus()
+    collector = MetricsCollector(bus)
+    kinds = []
+    bus.subscribe("statement", lambda event, data: kinds.append(data["kind"]))
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        run_source(SOURCE, bus)
+
+    assert out.getvalue().splitlines() == ["0", "1", "2", "child"]
+    summary = collector.summary()
+    assert summary["tokens"] == 41 and summary["nodes"] > 10
+    assert summary["loop_iterations"] == 3
+    assert summary["output_lines"] == 4
+    assert kinds.count("PrintStmt") == 4  # the spawned block's print is traced too
+    assert summary["statements"] == len(kinds)
+    assert set(summary["phases"]) == {"tokenize", "parse", "analyze", "execute"}
+
+
+def test_run_with_metrics_exports_json_lines_to_file_and_socket(tmp_path):
+    target = tmp_path / "metrics" / "run.jsonl"
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_with_metrics(SOURCE, str(target))
+        run_with_metrics(SOURCE, str(target), track_memory=True)
+        with pytest.raises(PipelineError):
+            run_with_metrics("print(1 / 0);", str(target))
+    records = [json.loads(line) for line in target.read_text(encoding="utf-8").splitlines()]
+    metrics = [r for r in records if r["event"] == "metrics"]
+    assert [m["status"] for m in metrics] == ["ok", "ok", "Runtime Error"]
+    # timings are taken without tracemalloc unless memory is asked for
+    assert (metrics[0]["peak_memory_bytes"], metrics[0]["memory_traced"]) == (None, False)
+    assert metrics[1]["peak_memory_bytes"] > 0 and metrics[1]["memory_traced"] is True
+    assert {"event": "phase_end", "phase": "execute", "error": "Runtime Error"}.items() <= records[-2].items()
+
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    received = []
+
+    def accept():
+        conn, _ = server.accept()
+        with conn, conn.makefile("r", encoding="utf-8") as f:
+            received.extend(f.read().splitlines())
+
+    listener = threading.Thread(target=accept)
+    listener.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_with_metrics(SOURCE, f"tcp://127.0.0.1:{server.getsockname()[1]}")
+    listener.join(timeout=5)
+    server.close()
+    assert json.loads(received[-1])["statements"] > 0
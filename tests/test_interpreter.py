@@ -1,10 +1,14 @@
 import io
+import time
 import contextlib
 
+import pytest
+
 from src.tokenizer_analyzer import SwiftLangAnalyzer
 from src.parser import Parser
 from src.semantic_analyzer import SemanticAnalyzer
-from src.interpreter import Interpreter
+from src.interpreter import Interpreter, inline_cache_stats
+from src.pipeline import PipelineError, compile_source, run_source
 
 
 def run_program(source: str):
@@ -73,3 +77,397 @@ while (x < 3) {
     assert symtab["x"]["type"] == "number"
     assert symtab["x"]["value"] == 3
     assert output.strip().splitlines() == ["0", "1", "2"]
+
+
+def test_interpreter_spawn_join_and_named_locks():
+    source = """\
+let total = 0;
+let a = spawn {
+    let i = 0;
+    while (i < 200) {
+        lock(total_lock);
+        total = total + 1;
+        unlock(total_lock);
+        i = i + 1;
+    }
+};
+let b = spawn {
+    let j = 0;
+    while (j < 200) {
+        lock(total_lock);
+        total = total + 1;
+        unlock(total_lock);
+        j = j + 1;
+    }
+};
+join(a);
+join(b);
+print(total);
+"""
+    symtab, output = run_program(source)
+    assert symtab["a"]["type"] == "thread"
+    assert output.strip().splitlines() == ["400"]
+
+
+def test_interpreter_spawned_io_blocks_overlap(monkeypatch):
+    def slow_input(prompt=""):
+        time.sleep(0.3)
+        return "ok"
+
+    monkeypatch.setattr("builtins.input", slow_input)
+    source = """\
+let x = "";
+let y = "";
+let t1 = spawn { read(x); };
+let t2 = spawn { read(y); };
+join(t1);
+join(t2);
+print(x + y);
+"""
+    start = time.perf_counter()
+    _, output = run_program(source)
+    assert time.perf_counter() - start < 0.55
+    assert output.strip() == "okok"
+
+
+def test_interpreter_thread_blocks_finish_and_errors_surface():
+    symtab, output = run_program("let done = false; thread { done = true; }")
+    assert symtab["done"]["value"] is True
+
+    with pytest.raises(ZeroDivisionError):
+        run_program("let t = spawn { let z = 1 / 0; }; join(t);")
+    with pytest.raises(RuntimeError):
+        run_program("unlock(m);")
+
+
+def test_interpreter_threads_from_tail_recursive_function_keep_their_locals():
+    # Each block gets its own frame: the tail call may not recycle the one the
+    # block reads `n` from, and the blocks' `let k` must not collide.
+    source = """\
+fun count(n) {
+    if (n < 0) { return 0; }
+    thread {
+        let k = 0;
+        while (k < 20000) { k = k + 1; }
+        print(n);
+    }
+    return count(n - 1);
+}
+let r = count(3);
+"""
+    symtab, output = run_program(source)
+    assert sorted(output.split()) == ["0", "1", "2", "3"]
+
+
+PARALLEL_SOURCE = """\
+let total = 0;
+let best = 0;
+let scratch = 0;
+parallel for i in range(1, 41) reduce(sum: total, max: best) {
+    scratch = i;
+    total = total + i * i;
+    if (i % 7 == 3) { best = i; }
+    if (i % 10 == 0) { print(i); }
+}
+print(total);
+print(best);
+print(scratch);
+"""
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_interpreter_parallel_for_reductions_match_sequential(workers):
+    analyzer = SwiftLangAnalyzer()
+    analyzer.analyze(PARALLEL_SOURCE)
+    ast = Parser(analyzer.get_tokens()).parse_program()
+    symbol_table = SemanticAnalyzer().analyze(ast)
+
+    interpreter = Interpreter(symbol_table, parallel_workers=workers)
+    interpreter.parallel_threshold = 0
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        interpreter.interpret(ast)
+
+    # Per-chunk output keeps iteration order; `scratch` is chunk-private.
+    assert buf.getvalue().splitlines() == ["10", "20", "30", "40", "22140", "38", "0"]
+
+
+def test_interpreter_arrays_index_len_and_elementwise_ops():
+    source = """\
+let a = [1, 2, 3];
+let b = a * 10 + a;
+b[2] = 0;
+let grid = [[1, 2], [3, 4]];
+grid[1][0] = 9;
+print(b);
+print(len(b));
+print(b[0] + grid[1][0]);
+print([1, 2.5, "s", true, null]);
+"""
+    symtab, output = run_program(source)
+    assert symtab["a"]["type"] == "array"
+    assert output.strip().splitlines() == [
+        "[11, 22, 0]",
+        "3",
+        "20",
+        '[1, 2.5, "s", True, None]',
+    ]
+
+
+def test_interpreter_maps_keyed_and_field_access():
+    source = """\
+let config = {"debug": false, "port": 8080};
+let hits = 0;
+while (hits < 3) {
+    hits = hits + config.port - 8079;
+}
+config.port = 9090;
+config["host"] = "localhost";
+print(config.port);
+print(config["host"]);
+print(len(config));
+print(config);
+"""
+    symtab, output = run_program(source)
+    assert symtab["config"]["type"] == "object"
+    assert output.strip().splitlines() == [
+        "9090",
+        "localhost",
+        "3",
+        '{"debug": False, "port": 9090, "host": "localhost"}',
+    ]
+
+
+def test_interpreter_field_site_follows_maps_of_different_shapes():
+    source = """\
+let a = {"port": 1};
+let b = {"host": "h", "port": 20};
+let total = 0;
+let i = 0;
+while (i < 4) {
+    let m = a;
+    if (i % 2 == 1) { m = b; }
+    total = total + m.port;
+    i = i + 1;
+}
+print(total);
+"""
+    _, output = run_program(source)
+    assert output.strip() == "42"
+
+
+def test_interpreter_functions_are_first_class_and_recursive():
+    source = """\
+fun add(a, b) {
+    return a + b;
+}
+fun apply(f, x, y) {
+    return f(x, y);
+}
+fun fib(n) {
+    if (n < 2) { return n; }
+    return fib(n - 1) + fib(n - 2);
+}
+let plus = add;
+print(plus(5, 3));
+print(apply(add, 10, 20));
+print(fib(15));
+print(add);
+"""
+    _, output = run_program(source)
+    assert output.strip().splitlines() == ["8", "30", "610", "<fun add/2>"]
+
+    with pytest.raises(TypeError):
+        run_program("fun f(a) { return a; } print(f(1, 2));")
+
+
+def test_interpreter_calls_as_statements_discard_their_result():
+    source = """\
+fun g(x) { print(x); return 0; }
+g(3);
+let m = {"f": g};
+m.f(1);
+let i = 0;
+while (i < 2) {
+    g(i);
+    i = i + 1;
+}
+"""
+    _, output = run_program(source)
+    assert output.split() == ["3", "1", "0", "1"]
+
+
+def test_interpreter_tail_calls_run_in_constant_stack():
+    source = """\
+fun sumto(n, acc) {
+    if (n == 0) { return acc; }
+    return sumto(n - 1, acc + n);
+}
+print(sumto(100000, 0));
+"""
+    _, output = run_program(source)
+    assert output.strip() == "5000050000"
+
+
+def test_interpreter_for_loops_over_ranges_and_collections():
+    source = """\
+let values = [1, 2, null, 4];
+let count = 0;
+for v in values {
+    if (v == null) { continue; }
+    count = count + v;
+}
+for i in range(10) {
+    if (i == 3) { break; }
+    print(i);
+}
+fun first_key(m) {
+    for k in m { return k; }
+    return null;
+}
+print(first_key({"a": 1, "b": 2}));
+let w = 0;
+while (true) {
+    w = w + 1;
+    if (w == 5) { break; }
+}
+print(count);
+print(w);
+"""
+    symtab, output = run_program(source)
+    assert output.strip().splitlines() == ["0", "1", "2", "a", "7", "5"]
+    assert symtab["i"]["value"] == 3
+
+
+def test_interpreter_operator_sites_specialize_and_fall_back():
+    source = """\
+let total = 0;
+let i = 0;
+while (i < 200) {
+    total = total + i * 2;
+    i = i + 1;
+}
+let mixed = [1, 2.5, "a", "b"];
+let out = "";
+for v in mixed {
+    out = out + "-";
+    print(v + v);
+}
+"""
+    ast, symtab = compile_source(source)
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        Interpreter(symtab).interpret(ast)
+
+    assert symtab["total"]["value"] == 39800
+    assert symtab["out"]["value"] == "----"
+    assert buf.getvalue().splitlines() == ["2", "5.0", "aa", "bb"]
+    stats = inline_cache_stats(ast)
+    assert stats["specialized"] >= 4
+    # `i` is an induction variable, so `i < 200` and `i + 1` run as native
+    # int operations; the body's two operator sites hit on every iteration.
+    assert stats["hits"] > 390
+    assert stats["hit_rate"] > 0.95
+
+
+def test_interpreter_string_building_is_transparent():
+    source = """\
+let s = "";
+let i = 0;
+while (i < 500) {
+    s = s + "ab";
+    i = i + 1;
+}
+let t = "<" + s;
+print(len(s));
+print(s == t);
+print(t[0] + s[999]);
+let seen = {};
+seen[s] = 1;
+for c in "xy" + s { seen[c] = 2; }
+print(len(seen));
+print(len(s * 2) + len(3 * t));
+"""
+    symtab, output = run_program(source)
+    assert output.splitlines() == ["1000", "False", "<b", "5", "5003"]
+    assert str(symtab["s"]["value"]) == "ab" * 500
+
+
+def test_interpreter_switch_dispatch_and_break(monkeypatch):
+    source = """\
+let n = 4;
+let i = 0;
+while (i < 6) {
+    switch (i) {
+        case 0: print("zero");
+        case n - 3, 2:
+            print("one or two");
+            if (i == 2) { break; }
+            print("just one");
+        case n: print("n");
+        case 3:
+        default:
+            print("other");
+            i = i + 1;
+            continue;
+    }
+    i = i + 1;
+}
+let s = "b";
+switch (s + "") { case "a": print(1); case "b": print(2); }
+switch ([1]) { case 1: print(3); default: print("array"); }
+"""
+    _, output = run_program(source)
+    assert output.splitlines() == [
+        "zero", "one or two", "just one", "one or two", "other", "n", "other", "2", "array"]
+
+    # Constant labels are looked up, not compared one by one.
+    arms = " ".join(f"case {k}: print({k});" for k in range(100))
+    ast, symtab = compile_source(f"let k = 99; switch (k) {{ {arms} }}")
+    evaluated = []
+    monkeypatch.setattr(Interpreter, "visit_LiteralExpr",
+                        lambda self, node: evaluated.append(node.literal) or node.literal)
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        Interpreter(symtab).interpret(ast)
+    assert buf.getvalue() == "99\n"
+    assert evaluated == [99, 99]  # the declaration and the printed value
+
+
+def test_interpreter_try_catch_throw_and_error_lines():
+    source = """\
+fun risky(n) {
+    if (n == 3) { throw {"code": n}; }
+    return 10 / n;
+}
+fun first_safe(xs) {
+    for x in xs {
+        try { return risky(x); } catch { continue; }
+    }
+    return -1;
+}
+let i = 0;
+while (i < 4) {
+    try {
+        print(risky(i));
+    } catch (err) {
+        print(err);
+    }
+    i = i + 1;
+}
+try {
+    try { throw "inner"; } catch (e) { throw e + "!"; }
+} catch (e) {
+    print(e);
+}
+print(first_safe([0, 3, 5]));
+"""
+    symtab, output = run_program(source)
+    assert output.splitlines() == [
+        "division by zero (line 3)", "10.0", "5.0", '{"code": 3}', "inner!", "2.0"]
+    assert symtab["err"]["value"].get("code") == 3
+
+    with pytest.raises(PipelineError) as excinfo:
+        run_source("let x = 1;\nif (x > 0) {\n    throw x + 1;\n}\n")
+    assert excinfo.value.label == "Runtime Error"
+    assert str(excinfo.value) == "Uncaught exception: 2 (line 3)"
@@ -0,0 +1,130 @@
+import io
+import os
+import contextlib
+
+import pytest
+
+from src import modules
+from src.optimizer import walk
+from src.parser import ImportStmt, WhileStmt
+from src.pipeline import PipelineError, compile_source, run_source
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    modules.clear_cache()
+    yield
+    modules.clear_cache()
+
+
+def write(path, source):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(source, encoding="utf-8")
+    return str(path)
+
+
+def run(path):
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        run_source(source, path)
+    return out.getvalue().splitlines()
+
+
+def test_modules_have_their_own_globals_and_run_once(tmp_path):
+    write(tmp_path / "lib" / "counter.sl", """\
+let x = 100;
+let calls = 0;
+fun bump() { calls = calls + 1; return x + calls; }
+print("counter loaded");
+""")
+    write(tmp_path / "helpers.sl", """\
+import lib.counter;
+fun twice() { let first = counter.bump(); return counter.bump(); }
+""")
+    main = write(tmp_path / "main.sl", """\
+import helpers;
+import lib.counter as c;
+let x = 1;
+print(helpers.twice());
+print(c.bump());
+print(c.calls);
+print(x);
+""")
+    assert run(main) == ["counter loaded", "102", "103", "3", "1"]
+
+
+def test_compiled_modules_are_cached_until_the_file_changes(tmp_path):
+    lib = write(tmp_path / "util.sl", "let version = 1;")
+    main = write(tmp_path / "main.sl", "import util; print(util.version);")
+
+    assert run(main) == ["1"]
+    first = modules._compiled[os.path.abspath(lib)]
+    assert run(main) == ["1"]
+    assert modules._compiled[os.path.abspath(lib)] is first
+
+    write(tmp_path / "util.sl", "let version = 22;")
+    os.utime(lib, ns=(first.stamp[0] + 10**9, first.stamp[0] + 10**9))
+    assert run(main) == ["22"]
+    assert modules._compiled[os.path.abspath(lib)] is not first
+
+
+def test_preload_parses_independent_imports_in_a_process_pool(tmp_path):
+    for name in ("a", "b", "c"):
+        write(tmp_path / f"{name}.sl", f'let name = "{name}";')
+    loader = modules.ModuleLoader(str(tmp_path), path=[], workers=2)
+    loader.preload([ImportStmt(n, n) for n in ("a", "b", "c")])
+    assert sorted(os.path.basename(p) for p in loader.parsed) == ["a.sl", "b.sl", "c.sl"]
+    assert all(error is None for _, _, error in loader.parsed.values())
+    assert loader.load("b").symbol_table["name"]["type"] == "string"
+
+
+def test_module_errors_are_reported_as_semantic_errors(tmp_path, monkeypatch):
+    write(tmp_path / "shared" / "geo.sl", "let pi = 3.14;")
+    write(tmp_path / "broken.sl", "let = 1;")
+    write(tmp_path / "loop.sl", "import loop2;")
+    write(tmp_path / "loop2.sl", "import loop;")
+    monkeypatch.setenv(modules.PATH_VARIABLE, str(tmp_path / "shared"))
+
+    def error(source):
+        with pytest.raises(PipelineError) as exc:
+            compile_source(source, str(tmp_path / "main.sl"))
+        assert exc.value.label == "Semantic Error"
+        return str(exc.value)
+
+    assert "no member 'tau'" in error("import geo; print(geo.tau);")
+    assert "Module 'missing' not found" in error("import missing;")
+    assert "Syntax Error" in error("import broken;")
+    assert "Circular import: loop -> loop2 -> loop" in error("import loop;")
+    assert "must be at the top level" in error("import geo; fun f() { import geo; }")
+
+
+def test_module_loops_are_safe_to_run_from_several_threads(tmp_path):
+    write(tmp_path / "helper.sl", """\
+fun f(a) {
+    let s = 0;
+    let i = 0;
+    while (i < 20000) {
+        s = s + a * 10;
+        i = i + 1;
+    }
+    return s;
+}
+""")
+    main = write(tmp_path / "main.sl", """\
+import helper;
+let r1 = 0;
+let r2 = 0;
+let t1 = spawn { r1 = helper.f(1); };
+let t2 = spawn { r2 = helper.f(2); };
+join(t1);
+join(t2);
+print(r1);
+print(r2);
+""")
+    assert run(main) == ["200000", "400000"]
+    # the shared tree caches no values; the counter in a frame slot is still optimized
+    [module] = modules._compiled.values()
+    [loop] = [node for node in walk(module.ast) if isinstance(node, WhileStmt)]
+    assert loop.plan.invariants == [] and loop.plan.induction.name == "i"
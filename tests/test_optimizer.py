@@ -0,0 +1,140 @@
+import io
+import contextlib
+
+import pytest
+
+from src.interpreter import Interpreter
+from src.optimizer import optimize, walk
+from src.parser import InvariantExpr, Parser, WhileStmt
+from src.pipeline import tokenize
+from src.semantic_analyzer import SemanticAnalyzer
+
+
+def run(source, optimized=True):
+    """(output lines, symbol table, ast) with or without the loop optimizer."""
+    ast = Parser(tokenize(source)).parse_program()
+    symtab = SemanticAnalyzer().analyze(ast)
+    if optimized:
+        optimize(ast)
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        Interpreter(symtab).interpret(ast)
+    return buf.getvalue().splitlines(), symtab, ast
+
+
+def loops(ast):
+    return [node for node in walk(ast) if isinstance(node, WhileStmt)]
+
+
+PROGRAMS = [
+    # invariant arithmetic, a counted loop and a nested loop
+    """\
+let n = 5;
+let k = 3;
+let total = 0;
+let i = 0;
+while (i < n * 2) {
+    let j = 10;
+    while (j > 0) {
+        total = total + (k * k - 1) + j;
+        j = j - 3;
+    }
+    i = i + 1;
+}
+print(total);
+print(i);
+""",
+    # a float counter fails the guard and runs the ordinary loop
+    """\
+let x = 0.5;
+while (x < 3) {
+    print(x);
+    x = x + 1;
+}
+print(x);
+""",
+    # break, continue and return inside counted loops
+    """\
+fun first_multiple(m, limit) {
+    let i = 1;
+    while (i <= limit) {
+        if (i % m == 0) { return i; }
+        i = i + 1;
+    }
+    return -1;
+}
+let i = 0;
+let odd = 0;
+while (10 > i) {
+    if (i == 7) { break; }
+    if (i % 2 == 0) {
+        i = i + 1;
+        continue;
+    }
+    odd = odd + 1;
+    i = i + 1;
+}
+print(first_multiple(4, 10));
+print(first_multiple(40, 10));
+print(i);
+print(odd);
+""",
+    # invariant expressions that raise, or build new arrays, are not cached early
+    """\
+let zero = 0;
+let base = [1];
+let i = 0;
+let out = [];
+while (i != 3) {
+    if (i > 5) { print(10 / zero); }
+    out = base + [i];
+    i = i + 1;
+}
+print(out);
+print(base);
+""",
+]
+
+
+@pytest.mark.parametrize("source", PROGRAMS)
+def test_optimized_programs_behave_exactly_like_unoptimized_ones(source):
+    expected_output, expected_symtab, _ = run(source, optimized=False)
+    output, symtab, _ = run(source)
+    assert output == expected_output
+    assert {k: str(v["value"]) for k, v in symtab.items()} == \
+        {k: str(v["value"]) for k, v in expected_symtab.items()}
+
+
+def test_invariants_are_hoisted_and_counters_recognized():
+    _, _, ast = run(PROGRAMS[0])
+    outer, inner = sorted(loops(ast), key=lambda loop: loop.plan.induction.name)
+    assert outer.plan.induction.name == "i" and outer.plan.induction.step == 1
+    assert inner.plan.induction.name == "j" and inner.plan.induction.step == -3
+    # `n * 2` and `k * k - 1` are invariant for the outer loop; j's body has
+    # nothing left to hoist.
+    assert [type(w.expr).__name__ for w in outer.plan.invariants] == ["BinaryExpr"] * 2
+    assert inner.plan.invariants == []
+    assert isinstance(outer.cond.right, InvariantExpr)
+
+
+def test_loops_that_call_functions_or_spawn_threads_are_left_alone():
+    calls = """\
+let g = 2;
+fun bump() { g = g + 1; return g; }
+let i = 0;
+let seen = 0;
+while (i < 4) {
+    seen = seen + bump() * (g * 3);
+    i = i + 1;
+}
+print(seen);
+"""
+    output, _, ast = run(calls)
+    assert output == run(calls, optimized=False)[0]
+    # `bump()` may assign any global, `i` included
+    assert loops(ast)[0].plan is None
+
+    threads = "let i = 0; let t = spawn { print(1); }; while (i < 3) { i = i + 1; } join(t);"
+    ast = Parser(tokenize(threads)).parse_program()
+    SemanticAnalyzer().analyze(ast)
+    assert optimize(ast) == 0
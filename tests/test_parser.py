@@ -13,6 +13,27 @@ from src.parser import (
     WhileStmt,
     BlockStmt,
     PrintStmt,
+    SpawnExpr,
+    JoinStmt,
+    LockStmt,
+    UnlockStmt,
+    ParallelForStmt,
+    CallExpr,
+    ArrayExpr,
+    IndexExpr,
+    IndexAssignStmt,
+    MapExpr,
+    MemberExpr,
+    MemberAssignStmt,
+    FunDecl,
+    ReturnStmt,
+    ForStmt,
+    BreakStmt,
+    ContinueStmt,
+    ExprStmt,
+    SwitchStmt,
+    TryStmt,
+    ThrowStmt,
 )
 
 
@@ -93,3 +114,144 @@ def test_parse_invalid_missing_identifier_after_let_raises_syntax_error():
     parser = Parser(tokens)
     with pytest.raises(SyntaxError):
         parser.parse_program()
+
+
+def test_parse_spawn_join_and_locks():
+    ast = parse_source("let t = spawn { lock(m); unlock(m); }; join(t);")
+    decl, join = ast.stmts
+    assert isinstance(decl.expr, SpawnExpr)
+    lock, unlock = decl.expr.body.stmts
+    assert isinstance(lock, LockStmt) and lock.name == "m"
+    assert isinstance(unlock, UnlockStmt) and unlock.name == "m"
+    assert isinstance(join, JoinStmt)
+    assert isinstance(join.expr, VarExpr)
+
+
+def test_parse_parallel_for_with_reductions():
+    ast = parse_source("let t = 0; parallel for i in range(0, 10) reduce(sum: t, max: m) { t = i; }")
+    loop = ast.stmts[1]
+    assert isinstance(loop, ParallelForStmt)
+    assert loop.var == "i"
+    assert isinstance(loop.iterable, CallExpr)
+    assert [a.value for a in loop.iterable.args] == ["0", "10"]
+    assert loop.reductions == [("sum", "t"), ("max", "m")]
+    assert isinstance(loop.body, BlockStmt)
+
+    with pytest.raises(SyntaxError):
+        parse_source("parallel for i in range(3) reduce(avg: t) { }")
+
+
+def test_parse_array_literals_indexing_and_index_assignment():
+    ast = parse_source("let a = [1, [2, 3]]; a[1][0] = a[0];")
+    decl, assign = ast.stmts
+    assert isinstance(decl.expr, ArrayExpr)
+    assert isinstance(decl.expr.elements[1], ArrayExpr)
+    assert isinstance(assign, IndexAssignStmt)
+    assert isinstance(assign.target, IndexExpr)
+    assert assign.target.target.name == "a"
+    assert assign.index.value == "0"
+    assert isinstance(assign.expr, IndexExpr)
+
+
+def test_parse_map_literals_and_member_access():
+    ast = parse_source('let m = {"port": 80, debug: false}; m.port = m.debug; m["k"] = 1;')
+    decl, member_assign, index_assign = ast.stmts
+    assert isinstance(decl.expr, MapExpr)
+    assert [key.value for key, _ in decl.expr.entries] == ['"port"', '"debug"']
+    assert isinstance(member_assign, MemberAssignStmt)
+    assert member_assign.name == "port"
+    assert isinstance(member_assign.expr, MemberExpr)
+    assert member_assign.expr.name == "debug"
+    assert isinstance(index_assign, IndexAssignStmt)
+
+
+def test_parse_function_declaration_return_and_calls():
+    ast = parse_source("fun add(a, b) { return add(a, b); } let x = fs[0](1)(2);")
+    fun, decl = ast.stmts
+    assert isinstance(fun, FunDecl)
+    assert fun.params == ["a", "b"]
+    ret = fun.body.stmts[0]
+    assert isinstance(ret, ReturnStmt)
+    assert ret.tail_call is True
+    assert isinstance(decl.expr, CallExpr)
+    assert isinstance(decl.expr.callee, CallExpr)
+    assert isinstance(decl.expr.callee.callee, IndexExpr)
+    assert not parse_source("fun f() { return 1 + g(); }").stmts[0].body.stmts[0].tail_call
+
+
+def test_parse_call_statements():
+    call, method, chained = parse_source("g(3); m.f(1); fs[0](1)(2);").stmts
+    assert isinstance(call, ExprStmt) and isinstance(call.expr, CallExpr)
+    assert isinstance(call.expr.callee, VarExpr)
+    assert isinstance(method.expr.callee, MemberExpr)
+    assert isinstance(chained.expr.callee, CallExpr)
+    assert isinstance(chained.expr.callee.callee, IndexExpr)
+    # a call is not something to assign to
+    with pytest.raises(SyntaxError):
+        parse_source("g(1) = 2;")
+    # and only a call can stand alone as a statement
+    for source in ("m.f;", "a[0];", "x;"):
+        with pytest.raises(SyntaxError):
+            parse_source(source)
+
+
+def test_parse_for_in_with_break_and_continue():
+    ast = parse_source("for i in range(3) { if (i == 1) { continue; } break; }")
+    loop = ast.stmts[0]
+    assert isinstance(loop, ForStmt)
+    assert loop.var == "i"
+    assert isinstance(loop.iterable, CallExpr)
+    if_stmt, brk = loop.body.stmts
+    assert isinstance(if_stmt.then_body.stmts[0], ContinueStmt)
+    assert isinstance(brk, BreakStmt)
+
+
+def test_parse_switch_with_shared_labels_and_default():
+    ast = parse_source("""\
+switch (x) {
+    case 1, 2: print(1);
+    case 3:
+    default: print(2); break;
+}
+""")
+    switch = ast.stmts[0]
+    assert isinstance(switch, SwitchStmt)
+    first, second = switch.clauses
+    assert [label.literal for label in first.labels] == [1, 2] and not first.is_default
+    assert [label.literal for label in second.labels] == [3] and second.is_default
+    assert isinstance(second.body.stmts[1], BreakStmt)
+
+    for bad in ("switch (x) { print(1); }", "switch (x) { default: default: }"):
+        with pytest.raises(SyntaxError):
+            parse_source(bad)
+
+
+def test_parse_try_catch_and_throw():
+    ast = parse_source('try { throw "bad"; } catch (err) { print(err); } try { } catch { }')
+    first, second = ast.stmts
+    assert isinstance(first, TryStmt) and first.name == "err"
+    assert isinstance(first.body.stmts[0], ThrowStmt)
+    assert first.body.stmts[0].expr.literal == "bad"
+    assert isinstance(first.handler, BlockStmt)
+    assert second.name is None and second.body.stmts == []
+
+    with pytest.raises(SyntaxError):
+        parse_source("try { } print(1);")
+
+
+def test_statements_record_their_source_line():
+    ast = parse_source("""\
+// comment lines and blank lines still count
+
+let x = 1;
+/* a block
+   comment */ let s = "two
+lines";
+if (x > 0) {
+    print(s);
+}
+""")
+    decl_x, decl_s, if_stmt = ast.stmts
+    assert (decl_x.line, decl_s.line, if_stmt.line) == (3, 5, 7)
+    assert if_stmt.then_body.stmts[0].line == 8
+    assert if_stmt.cond.line is None  # only statements carry lines
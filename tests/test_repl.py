@@ -0,0 +1,56 @@
+import io
+
+from src.repl import Repl
+
+
+def session(lines):
+    out = io.StringIO()
+    repl = Repl(out)
+    feed = iter(lines)
+
+    def read(prompt):
+        try:
+            return next(feed)
+        except StopIteration:
+            raise EOFError
+
+    repl.run(read)
+    return repl, out.getvalue().splitlines()[1:]  # drop the banner
+
+
+def test_repl_keeps_state_across_inputs_and_evaluates_expressions():
+    repl, lines = session([
+        "let x = 2;",
+        "fun twice(n) {",
+        "    return n * 2;",
+        "}",
+        "print(twice(x));",
+        "x + 1",
+        '"a" + "b"',
+    ])
+    assert lines == ["4", "3", '"ab"', ""]
+    assert repl.symbol_table["x"]["value"] == 2
+
+
+def test_repl_rolls_back_declarations_of_failed_inputs():
+    repl, lines = session([
+        "let ok = 1; let bad = missing;",
+        "let ok = 5;",
+        "let = 3;",
+        "print(1 / 0);",
+        "ok",
+    ])
+    # `ok` was declared by the failed input too, so declaring it again works.
+    assert lines[0] == "Semantic Error: Undeclared variable: missing"
+    assert lines[1].startswith("Syntax Error")
+    assert lines[2] == "Runtime Error: division by zero"
+    assert lines[3] == "5"
+    assert "bad" not in repl.symbol_table
+
+
+def test_repl_commands_time_and_symbols():
+    _, lines = session([":time let s = \"hi\";", ":symbols", ":nope", ":quit", "print(1);"])
+    assert lines[0].startswith("(") and lines[0].endswith(" ms)")
+    assert lines[1] == '  s : string = "hi"'
+    assert lines[2].startswith("Unknown command ':nope'")
+    assert len(lines) == 3  # nothing runs after :quit
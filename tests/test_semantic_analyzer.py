@@ -47,3 +47,85 @@ def test_semantic_if_condition_must_be_boolean():
     with pytest.raises(SemanticError) as excinfo:
         sem.analyze(ast)
     assert "Condition must be boolean" in str(excinfo.value)
+
+
+def test_semantic_parallel_for_declares_loop_var_and_checks_reductions():
+    sem = SemanticAnalyzer()
+    symbol_table = sem.analyze(build_ast("let t = 0; parallel for i in range(3) reduce(sum: t) { t = i; }"))
+    assert symbol_table["i"]["type"] == "integer"
+
+    with pytest.raises(SemanticError) as excinfo:
+        SemanticAnalyzer().analyze(build_ast("parallel for i in range(3) reduce(sum: t) { }"))
+    assert "Undeclared variable: t" in str(excinfo.value)
+
+    with pytest.raises(SemanticError) as excinfo:
+        SemanticAnalyzer().analyze(build_ast("let x = nope(1);"))
+    assert "Undefined function: nope" in str(excinfo.value)
+
+
+def test_semantic_functions_get_frame_slots_and_are_hoisted():
+    ast = build_ast("print(f(1)); fun f(a) { let b = a + g; return b; } let g = 2;")
+    symbol_table = SemanticAnalyzer().analyze(ast)
+    assert symbol_table["f"]["type"] == "function"
+    assert "a" not in symbol_table and "b" not in symbol_table
+    fun = ast.stmts[1]
+    assert fun.nslots == 2
+    decl, ret = fun.body.stmts
+    assert decl.slot == 1
+    assert decl.expr.left.slot == 0      # parameter a
+    assert decl.expr.right.slot is None  # global g
+    assert ret.expr.slot == 1
+
+
+def test_semantic_function_errors():
+    with pytest.raises(SemanticError) as excinfo:
+        SemanticAnalyzer().analyze(build_ast("return 1;"))
+    assert "'return' outside function" in str(excinfo.value)
+
+    with pytest.raises(SemanticError) as excinfo:
+        SemanticAnalyzer().analyze(build_ast("fun f() { fun g() { } let t = spawn { return 1; }; }"))
+    assert "must be declared at the top level" in str(excinfo.value)
+    assert "'return' outside function" in str(excinfo.value)
+
+
+def test_semantic_for_loop_variable_and_break_placement():
+    symbol_table = SemanticAnalyzer().analyze(build_ast("for i in range(3) { print(i); }"))
+    assert symbol_table["i"]["type"] == "integer"
+
+    ast = build_ast("fun f(xs) { for x in xs { print(x); } }")
+    SemanticAnalyzer().analyze(ast)
+    assert ast.stmts[0].body.stmts[0].slot == 1
+
+    with pytest.raises(SemanticError) as excinfo:
+        SemanticAnalyzer().analyze(build_ast("break; while (true) { let t = spawn { continue; }; }"))
+    assert "'break' outside loop" in str(excinfo.value)
+    assert "'continue' outside loop" in str(excinfo.value)
+
+
+def test_semantic_switch_builds_a_jump_table_for_constant_labels():
+    ast = build_ast("""\
+let x = 2;
+let y = 5;
+switch (x) { case 1, "a": break; case y: print(y); case null: print(0); default: break; }
+""")
+    SemanticAnalyzer().analyze(ast)
+    switch = ast.stmts[2]
+    assert switch.table == {1: 0, "a": 0, None: 2}
+    assert switch.dynamic == ((1, 0),)
+    assert switch.default == 3
+
+    with pytest.raises(SemanticError) as excinfo:
+        SemanticAnalyzer().analyze(build_ast("switch (1) { case 1: case 1: }"))
+    assert "Duplicate case label 1" in str(excinfo.value)
+
+    with pytest.raises(SemanticError) as excinfo:
+        SemanticAnalyzer().analyze(build_ast("switch (1) { case 1: continue; }"))
+    assert "'continue' outside loop" in str(excinfo.value)
+
+
+def test_semantic_catch_variable_is_declared_like_a_loop_variable():
+    ast = build_ast("try { } catch (e) { } fun f() { try { } catch (problem) { print(problem); } }")
+    symbol_table = SemanticAnalyzer().analyze(ast)
+    assert symbol_table["e"]["type"] == "unknown"
+    assert ast.stmts[0].slot is None
+    assert ast.stmts[1].body.stmts[0].slot == 0
@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Cumulative `-X importtime` of src.pipeline (every phase needed to run a
+# program) was about 12ms when the budget was set.
+IMPORT_BUDGET_US = 60_000
+# Wall time of `python -m src.main` on a one-line program (about 90ms).
+RUN_BUDGET_S = 1.0
+
+# Nothing needed to run a single program should pull these in.
+LAZY_MODULES = [
+    "src.batch", "src.checkpoint", "src.concurrency", "src.debugger", "src.frontend",
+    "src.modules",
+    "src.parallel", "src.symbol_table_generator", "src.tiering",
+    "argparse", "concurrent.futures", "copy", "json", "pickle", "threading",
+]
+
+
+def python(*args):
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # time imports from cached bytecode
+    return subprocess.run([sys.executable, *args], cwd=ROOT, env=env,
+                          capture_output=True, text=True, check=True)
+
+
+def loaded_after(statement):
+    out = python("-c", f"import sys; {statement}; print('\\n'.join(sys.modules))").stdout
+    return set(out.split())
+
+
+def test_main_defers_the_pipeline_until_a_program_runs():
+    loaded = loaded_after("import src.main")
+    assert "src.pipeline" not in loaded and "src.parser" not in loaded
+
+
+def test_running_a_program_skips_unused_subsystems():
+    loaded = loaded_after("from src.pipeline import run_source; run_source('print(1);')")
+    assert loaded.isdisjoint(LAZY_MODULES), sorted(loaded & set(LAZY_MODULES))
+
+
+def test_import_time_and_cold_run_stay_within_budget(tmp_path):
+    python("-c", "import src.pipeline")  # write bytecode caches
+    samples = []
+    for _ in range(3):
+        stderr = python("-X", "importtime", "-c", "import src.pipeline").stderr
+        line = next(l for l in stderr.splitlines() if l.endswith("| src.pipeline"))
+        samples.append(int(line.split("|")[1]))
+    assert min(samples) < IMPORT_BUDGET_US, samples
+
+    program = tmp_path / "tiny.sl"
+    program.write_text("let x = 1; print(x);", encoding="utf-8")
+    start = time.perf_counter()
+    python("-m", "src.main", str(program))
+    assert time.perf_counter() - start < RUN_BUDGET_S
@@ -1,8 +1,10 @@
 import io
+import csv
+import json
 import contextlib
 
 from src.tokenizer_analyzer import SwiftLangAnalyzer
-from src.symbol_table_generator import SymbolTableBuilder
+from src.symbol_table_generator import HashTable, SymbolTableBuilder, main
 
 
 def test_symbol_table_builder_decl_and_assign():
@@ -27,3 +29,95 @@ def test_symbol_table_builder_decl_and_assign():
 
     assert entries["y"]["type"] == "integer"
     assert entries["y"]["value"] == 2
+
+
+def test_symbol_table_builder_decodes_literal_arrays_and_maps():
+    analyzer = SwiftLangAnalyzer()
+    analyzer.analyze('let a = [1, 2.5, "x"]; let b = [a, 1]; let c = {"debug": false, port: 8080};')
+    builder = SymbolTableBuilder(analyzer.get_tokens())
+    with contextlib.redirect_stdout(io.StringIO()):
+        builder.build()
+    entries = dict(builder.st.ht.entries())
+    assert entries["a"]["type"] == "array"
+    assert list(entries["a"]["value"]) == [1, 2.5, "x"]
+    assert entries["b"]["value"] == "<array literal>"
+    assert entries["c"]["type"] == "object"
+    assert entries["c"]["value"].items() == [("debug", False), ("port", 8080)]
+
+
+def test_hash_table_grows_and_keeps_alphabetical_order():
+    table = HashTable()
+    names = [f"v{i}" for i in range(5000, 0, -1)]
+    for i, name in enumerate(names):
+        table.insert(name, i)
+    assert len(table) == 5000
+    assert table.get("v1") == 4999 and table.get("missing") is None
+    assert [k for k, _ in table.entries()] == sorted(names)
+
+    table.insert("v1", "updated")  # overwrite: no new key
+    table.insert("a", 0)
+    assert len(table) == 5001
+    entries = table.entries()
+    assert entries[0] == ("a", 0) and dict(entries)["v1"] == "updated"
+
+
+def test_symbol_table_builder_single_pass_keeps_assignments_over_later_decls():
+    analyzer = SwiftLangAnalyzer()
+    analyzer.analyze('x = 5; let x = 1; let s = "__import__(\'os\')"; let n = x + 2; '
+                     'fun f() { let local = true; }')
+    builder = SymbolTableBuilder(analyzer.get_tokens()).collect()
+    initial = dict(builder.initial.ht.entries())
+    updated = dict(builder.st.ht.entries())
+    assert initial["x"] == {"type": "integer", "value": 1}
+    assert updated["x"] == {"type": "integer", "value": 5}
+    assert updated["s"]["value"] == "__import__('os')"  # decoded, never evaluated
+    assert updated["n"] == {"type": "number", "value": "<expression>"}
+    assert "local" not in updated
+
+
+def test_symbol_table_builder_keeps_function_scopes_out_and_tracks_types():
+    analyzer = SwiftLangAnalyzer()
+    analyzer.analyze('let x = 1; let before = x; '
+                     'fun f(x) { let before = "local"; x = "param"; return x; } '
+                     'x = "text"; let after = x;')
+    builder = SymbolTableBuilder(analyzer.get_tokens()).collect()
+    initial = dict(builder.initial.ht.entries())
+    updated = dict(builder.st.ht.entries())
+    # the local `before` and the parameter `x` shadow globals without touching them
+    assert initial["x"] == {"type": "integer", "value": 1}
+    assert updated["x"] == {"type": "string", "value": "text"}
+    assert updated["before"] == {"type": "integer", "value": "<expression>"}
+    # the type of `x` follows the assignment
+    assert updated["after"] == {"type": "string", "value": "<expression>"}
+
+
+def test_symbol_table_builder_skips_malformed_statements_and_keeps_going():
+    analyzer = SwiftLangAnalyzer()
+    analyzer.analyze('let a = 1; if a > 0 { a = 2; } else { a = 3; } let b = "x"; '
+                     'let = ; a = 4;')
+    err = io.StringIO()
+    with contextlib.redirect_stderr(err):
+        builder = SymbolTableBuilder(analyzer.get_tokens()).collect()
+    updated = dict(builder.st.ht.entries())
+    # the unparenthesised `if` and its `else` are skipped whole, with nothing leaking out
+    assert updated["a"] == {"type": "integer", "value": 4}
+    assert updated["b"] == {"type": "string", "value": "x"}
+    assert err.getvalue().count("[WARN] Skipping malformed statement") == 3
+
+
+def test_symbol_table_main_exports_json_lines_and_csv(tmp_path):
+    src = tmp_path / "prog.sl"
+    src.write_text('let a = [1, 2]; let m = {k: "v"}; a = [3];', encoding="utf-8")
+    out = tmp_path / "table.jsonl"
+    assert main([str(src), "--format", "json", "--output", str(out)]) == 0
+    rows = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert rows[0] == {"state": "initial", "name": "a", "type": "array", "value": [1, 2]}
+    assert {"state": "updated", "name": "a", "type": "array", "value": [3]} in rows
+    assert {"state": "updated", "name": "m", "type": "object", "value": {"k": "v"}} in rows
+
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        assert main([str(src), "--format", "csv"]) == 0
+    table = list(csv.reader(io.StringIO(buf.getvalue())))
+    assert table[0] == ["state", "name", "type", "value"]
+    assert ["updated", "m", "object", '{"k": "v"}'] in table
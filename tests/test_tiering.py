@@ -0,0 +1,161 @@
+import io
+import contextlib
+
+import pytest
+
+from src.instrumentation import EventBus, instrument
+from src.interpreter import Interpreter, describe_error
+from src.optimizer import walk
+from src.parser import WhileStmt
+from src.pipeline import compile_source
+
+
+def run(source, threshold):
+    """(output lines, symbol table, interpreter) with loops compiled after `threshold` iterations."""
+    ast, symtab = compile_source(source)
+    interp = Interpreter(symtab)
+    interp.tier_threshold = threshold
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        interp.interpret(ast)
+    return buf.getvalue().splitlines(), symtab, interp
+
+
+PROGRAMS = [
+    # counted and nested loops, strings, floats and an operand that changes type
+    """\
+let total = 0;
+let text = "";
+let x = 1;
+let i = 0;
+while (i < 20) {
+    let j = 0;
+    while (j < i) {
+        total = total + i * j - j % 3;
+        j = j + 1;
+    }
+    text = text + "ab";
+    if (i == 12) { x = 0.5; }
+    x = x + i / 4;
+    i = i + 1;
+}
+print(total);
+print(len(text));
+print(x);
+""",
+    # break, continue and return, in functions with frame slots; call statements
+    """\
+fun note(x) { print(x); return 0; }
+fun find(items, wanted) {
+    let i = 0;
+    while (true) {
+        if (i == len(items)) { return -1; }
+        if (items[i] == wanted) { return i; }
+        i = i + 1;
+    }
+    return -2;
+}
+let seen = 0;
+let k = 0;
+while (k < 30) {
+    k = k + 1;
+    if (k % 2 == 0) { continue; }
+    if (k > 25) { break; }
+    seen = seen + find([5, 7, 9, 11], k);
+    note(seen);
+}
+print(seen);
+print(k);
+""",
+    # statements left to the interpreter: for, switch, try, member assignment
+    """\
+let counts = {"even": 0, "odd": 0};
+let sum = 0;
+let caught = 0;
+let n = 0;
+while (n < 40) {
+    switch (n % 4) {
+        case 0: counts.even = counts.even + 1;
+        case 1, 3: counts.odd = counts.odd + 1;
+        default: break;
+    }
+    for v in [1, 2, 3] {
+        if (v == 2) { continue; }
+        sum = sum + v * n;
+    }
+    try {
+        if (n % 10 == 9) { throw n; }
+    } catch (err) {
+        caught = caught + err;
+    }
+    n = n + 1;
+}
+print(counts.even);
+print(counts.odd);
+print(sum);
+print(caught);
+""",
+]
+
+
+@pytest.mark.parametrize("source", PROGRAMS)
+@pytest.mark.parametrize("threshold", [1, 3, 7])
+def test_compiled_loops_behave_exactly_like_interpreted_ones(source, threshold):
+    expected_output, expected_symtab, _ = run(source, None)
+    output, symtab, interp = run(source, threshold)
+    assert output == expected_output
+    assert {k: str(v["value"]) for k, v in symtab.items()} == \
+        {k: str(v["value"]) for k, v in expected_symtab.items()}
+    assert interp.tier_ups
+
+
+def test_tier_up_happens_mid_loop_and_is_reported():
+    source = "let i = 0;\nlet total = 0;\nwhile (i < 100) {\n    total = total + i;\n    i = i + 1;\n}\n"
+    _, symtab, interp = run(source, 10)
+    assert symtab["total"]["value"] == 4950
+    assert symtab["i"]["value"] == 100
+    [event] = interp.tier_ups
+    assert event["line"] == 3 and event["iterations"] == 10 and event["seconds"] >= 0
+
+    # untouched below the threshold, and not at all when tiering is off
+    assert run(source, 1000)[2].tier_ups == []
+    assert run(source, None)[2].tier_ups == []
+
+
+def test_errors_in_compiled_loops_keep_their_lines():
+    source = """\
+let i = 0;
+let r = 0;
+while (i < 50) {
+    if (i == 40) {
+        r = 10 / (i - 40);
+    }
+    i = i + 1;
+}
+"""
+    ast, symtab = compile_source(source)
+    interp = Interpreter(symtab)
+    interp.tier_threshold = 5
+    with pytest.raises(ZeroDivisionError) as info:
+        interp.interpret(ast)
+    assert describe_error(info.value) == "division by zero (line 5)"
+    assert symtab["i"]["value"] == 40
+    [loop] = [node for node in walk(ast) if isinstance(node, WhileStmt)]
+    assert loop.compiled is not None
+
+
+def test_tier_up_events_reach_the_bus():
+    source = "let i = 0;\nwhile (i < 20) { i = i + 1; }\n"
+    ast, symtab = compile_source(source)
+    bus = EventBus()
+    events = []
+    bus.subscribe("tier_up", lambda event, data: events.append(data))
+    interp = instrument(Interpreter(symtab), bus, ast)
+    interp.tier_threshold = 4
+    interp.interpret(ast)
+    assert [event["line"] for event in events] == [2]
+
+    # tracing statements keeps every loop interpreted, so none are missed
+    bus.subscribe("statement", lambda event, data: None)
+    interp = instrument(Interpreter(symtab), bus, ast)
+    assert interp.tier_threshold is None
@@ -1,6 +1,6 @@
 import pytest
 
-from src.tokenizer_analyzer import SwiftLangAnalyzer, RESERVED_WORDS
+from src.tokenizer_analyzer import SwiftLangAnalyzer, RESERVED_WORDS, decode_literal
 
 
 def test_tokenizer_basic_tokens():
@@ -43,3 +43,28 @@ def test_tokenizer_tracks_variables_and_reserved_words():
     # Sanity check: some known reserved words
     for word in ["if", "else", "while", "let", "print", "true", "false", "null"]:
         assert word in RESERVED_WORDS
+
+
+def test_tokenizer_interns_names_and_pools_decoded_literals():
+    analyzer = SwiftLangAnalyzer()
+    analyzer.analyze('let count = 10; count = count + 10; let s = "a\\"b\\n\\\\"; let t = 2.5;')
+    tokens = analyzer.get_tokens()
+
+    names = [t for t in tokens if t.kind == "IDENTIFIER" and t.value == "count"]
+    assert len(names) == 3
+    assert names[0].value is names[1].value is names[2].value
+    assert len({t.id for t in names}) == 1 and analyzer.names["count"] == names[0].id
+
+    tens = [t for t in tokens if t.kind == "INTEGER"]
+    assert tens[0].id == tens[1].id and tens[0].literal == 10
+    string = next(t for t in tokens if t.kind == "STRING")
+    assert string.literal == 'a"b\n\\'
+    assert analyzer.constants == [10, 'a"b\n\\', 2.5]
+
+
+def test_decode_literal_handles_every_literal_kind():
+    assert decode_literal("INTEGER", "-3") == -3
+    assert decode_literal("FLOAT", "1.5") == 1.5
+    assert decode_literal("STRING", '"tab\\there \\q"') == "tab\there q"
+    assert decode_literal("BOOLEAN", "false") is False
+    assert decode_literal("NULL", "null") is None
@@ -0,0 +1,109 @@
+from array import array
+
+import pytest
+
+import pickle
+
+from src.values import Array, Map, MAX_SHAPE_KEYS, ROPE_MIN_LENGTH, Rope, add, index_get, index_set
+
+
+def test_array_uses_typed_buffers_for_homogeneous_numbers():
+    assert Array([1, 2, 3]).data.typecode == "q"
+    assert Array([1.5, 2.5]).data.typecode == "d"
+    # Mixed, boolean and oversized values keep full Python semantics.
+    assert isinstance(Array([1, 2.5]).data, list)
+    assert isinstance(Array([True, False]).data, list)
+    assert isinstance(Array([2 ** 70]).data, list)
+
+
+def test_array_elementwise_arithmetic_and_broadcasting():
+    a = Array([1, 2, 3])
+    b = Array([10, 20, 30])
+    assert (a + b).data == array("q", [11, 22, 33])
+    assert (b - a) == Array([9, 18, 27])
+    assert (a * 2).data.typecode == "q"
+    assert (b / a).data == array("d", [10.0, 10.0, 10.0])
+    assert (1 - a) == Array([0, -1, -2])
+    assert (a * 0.5).data.typecode == "d"
+    assert (Array([2 ** 62]) * 4) == Array([2 ** 64])
+    with pytest.raises(ValueError):
+        a + Array([1])
+    with pytest.raises(TypeError):
+        a + "x"
+
+
+def test_array_assignment_widens_buffer_and_checks_bounds():
+    a = Array([1, 2, 3])
+    index_set(a, 0, 9)
+    assert a.data.typecode == "q"
+    index_set(a, 1, "two")
+    assert a.data == [9, "two", 3]
+    assert str(a) == '[9, "two", 3]'
+    with pytest.raises(IndexError):
+        index_get(a, 3)
+    with pytest.raises(TypeError):
+        index_get(a, 1.0)
+    assert index_get("abc", 2) == "c"
+
+
+def test_maps_built_alike_share_a_shape():
+    a = Map([("debug", False), ("port", 8080)])
+    b = Map([("debug", True), ("port", 1)])
+    assert a.shape is b.shape
+    assert a.get("port") == 8080 and len(a) == 2
+    a.set_field("host", "x")
+    b.set_field("host", "y")
+    assert a.shape is b.shape
+    assert a.keys() == ["debug", "port", "host"]
+    with pytest.raises(LookupError):
+        a.get("missing")
+
+
+def test_map_dictionary_mode_for_computed_keys_and_large_maps():
+    m = Map([("a", 1)])
+    index_set(m, "b", 2)  # computed key: stop growing shapes
+    assert m.table == {"a": 1, "b": 2}
+    assert index_get(m, "b") == 2
+
+    big = Map([(f"k{i}", i) for i in range(MAX_SHAPE_KEYS + 1)])
+    assert big.table is not None and len(big) == MAX_SHAPE_KEYS + 1
+
+    copy = pickle.loads(pickle.dumps(m))
+    assert copy == m and copy.table is not None
+    assert str(Map([("x", "s"), (1, None)])) == '{"x": "s", 1: None}'
+
+
+def test_rope_appends_share_pieces_and_flatten_on_demand():
+    base = "x" * ROPE_MIN_LENGTH
+    s = add(base, "a")
+    assert type(s) is Rope
+    t = add(s, "b")
+    u = add(s, "c")  # s already extended: this append must copy
+    assert t.parts is s.parts and u.parts is not s.parts
+    assert str(t) == base + "ab" and str(u) == base + "ac"
+    assert len(t) == ROPE_MIN_LENGTH + 2
+    assert t == base + "ab" and base + "ab" == t and t != u and u > t
+    assert index_get(t, ROPE_MIN_LENGTH) == "a"
+    assert hash(t) == hash(base + "ab")
+
+    m = Map()
+    index_set(m, t, 1)
+    assert m.get(base + "ab") == 1 and m.keys() == [base + "ab"]
+    assert type(pickle.loads(pickle.dumps(t))) is str
+    assert add("ab", "cd") == "abcd" and type(add("ab", "cd")) is str
+
+    r = add("xy", Rope.of("z" * ROPE_MIN_LENGTH, "pq"))
+    assert [r.char_at(i) for i in (0, 1, 2, len(r) - 2, len(r) - 1)] == ["x", "y", "z", "p", "q"]
+    assert r._flat is None  # indexing does not join the pieces
+
+
+def test_rope_operators_act_on_the_joined_text():
+    base = "ab" * (ROPE_MIN_LENGTH // 2)
+    s = add(base, "c")
+    assert type(s) is Rope
+    assert s * 2 == (base + "c") * 2 and 2 * s == (base + "c") * 2
+    assert type(s * 2) is str
+    for op in (lambda: s - 1, lambda: 1 - s, lambda: s / 2, lambda: -s, lambda: s % 1):
+        with pytest.raises(TypeError) as info:
+            op()
+        assert "Rope" not in str(info.value)